@@ -1,37 +1,39 @@
 # backend\app\auth\api.py
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.auth.schemas import TokenResponse, UserCreate, UserLogin, Message
 from app.auth.service import signup_user, login_user
-from app.database import get_db
+from app.database import get_async_db
 from app.auth import models
-from app.auth.utils import get_current_user
+from app.auth.utils import get_current_user, invalidate_user, CurrentUser
 
 router = APIRouter()
 # OPTIONS 요청은 CORSMiddleware가 자동으로 처리하므로 별도 핸들러 불필요
 
 @router.post("/signup", response_model=Message)
-def signup(user: UserCreate, db: Session = Depends(get_db)):
-    return signup_user(db, user)
+async def signup(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    return await signup_user(db, user)
 
 @router.post("/login", response_model=TokenResponse)
-def login(user: UserLogin, db: Session = Depends(get_db)):
-    return login_user(db, user)
+async def login(user: UserLogin, db: AsyncSession = Depends(get_async_db)):
+    return await login_user(db, user)
 
 @router.post("/logout", response_model=Message)
 def logout():
     return {"msg": "로그아웃 요청이 수신되었습니다. 클라이언트 측 토큰을 삭제해주세요."}
 
 @router.delete("/delete", response_model=Message)
-def delete_user(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+async def delete_user(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
-    user = db.query(models.User).filter(models.User.id == current_user.id).first()
+    user = await db.get(models.User, current_user.id)
     if not user:
         raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다.")
 
     email = user.email
-    db.delete(user)
-    db.commit()
+    await db.delete(user)
+    await db.commit()
+    # 삭제된 계정의 토큰이 캐시로 계속 통과하지 않도록 제거
+    invalidate_user(current_user.id)
     return {"msg": f"'{email}' 님의 계정이 성공적으로 삭제되었습니다."}
\ No newline at end of file
@@ -1,12 +1,19 @@
 # backend\app\auth\crud.py
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.auth import models
 
-def get_user_by_email(db: Session, email: str):
-    return db.query(models.User).filter(models.User.email == email).first()
+async def get_user_by_email(db: AsyncSession, email: str):
+    result = await db.execute(select(models.User).where(models.User.email == email))
+    return result.scalars().first()
 
-def create_user(db: Session, email: str, password: str):
+async def create_user(db: AsyncSession, email: str, password: str):
     user = models.User(email=email, password=password)
     db.add(user)
-    db.commit()
-    return user
\ No newline at end of file
+    await db.commit()
+    return user
+
+async def update_password(db: AsyncSession, user: models.User, hashed: str):
+    user.password = hashed
+    await db.commit()
+    return user
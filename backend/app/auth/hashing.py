@@ -0,0 +1,97 @@
+# backend/app/auth/hashing.py
+
+"""
+비밀번호 해시/검증 전용 executor.
+
+bcrypt는 요청 하나에 수십~수백 ms CPU를 쓰므로 Starlette 공용 스레드풀에서 돌리면
+로그인 폭주 시 경로 계산 등 다른 요청이 스레드를 못 얻는다.
+- 전용 스레드 PASSWORD_HASH_WORKERS개에서만 실행
+- 실행 + 대기 중인 작업이 PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE_MAX개를 넘으면 즉시 503
+  (로그인 폭주는 로그인 요청만 실패하고 다른 엔드포인트에는 영향 없음)
+"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+
+from app.auth import utils
+
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_QUEUE_MAX = int(os.getenv("PASSWORD_HASH_QUEUE_MAX", "32"))
+
+_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+_lock = threading.Lock()
+_in_flight = 0
+_running = 0
+_stats = {
+    "completed": 0,
+    "rejected": 0,
+    "wait_ms_total": 0.0,
+    "wait_ms_max": 0.0,
+    "run_ms_total": 0.0,
+}
+
+
+async def _run(fn, *args):
+    global _in_flight
+    with _lock:
+        if _in_flight >= PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE_MAX:
+            _stats["rejected"] += 1
+            raise HTTPException(
+                status_code=503,
+                detail="로그인 요청이 많습니다. 잠시 후 다시 시도해주세요.",
+                headers={"Retry-After": "1"},
+            )
+        _in_flight += 1
+    submitted = time.perf_counter()
+
+    def job():
+        global _running
+        started = time.perf_counter()
+        wait_ms = (started - submitted) * 1000.0
+        with _lock:
+            _running += 1
+            _stats["wait_ms_total"] += wait_ms
+            _stats["wait_ms_max"] = max(_stats["wait_ms_max"], wait_ms)
+        try:
+            return fn(*args)
+        finally:
+            with _lock:
+                _running -= 1
+                _stats["completed"] += 1
+                _stats["run_ms_total"] += (time.perf_counter() - started) * 1000.0
+
+    try:
+        return await asyncio.wrap_future(_executor.submit(job))
+    finally:
+        with _lock:
+            _in_flight -= 1
+
+
+async def hash_password(password: str) -> str:
+    return await _run(utils.get_password_hash, password)
+
+
+async def verify_password(plain: str, hashed: str) -> bool:
+    return await _run(utils.verify_password, plain, hashed)
+
+
+def stats() -> dict:
+    with _lock:
+        done = _stats["completed"]
+        return {
+            "workers": PASSWORD_HASH_WORKERS,
+            "queue_max": PASSWORD_HASH_QUEUE_MAX,
+            "running": _running,
+            "queued": _in_flight - _running,
+            "completed": done,
+            "rejected": _stats["rejected"],
+            "avg_wait_ms": _stats["wait_ms_total"] / done if done else 0.0,
+            "max_wait_ms": _stats["wait_ms_max"],
+            "avg_run_ms": _stats["run_ms_total"] / done if done else 0.0,
+            "bcrypt_rounds": utils.BCRYPT_ROUNDS,
+        }
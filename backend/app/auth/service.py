@@ -1,18 +1,22 @@
 # backend\app\auth\service.py
 from fastapi import HTTPException
-from app.auth import crud, utils
+from app.auth import crud, hashing, utils
 
-def signup_user(db, user_create):
-    user = crud.get_user_by_email(db, user_create.email)
+async def signup_user(db, user_create):
+    user = await crud.get_user_by_email(db, user_create.email)
     if user:
         raise HTTPException(status_code=400, detail="이미 존재하는 이메일입니다.")
-    hashed_pw = utils.get_password_hash(user_create.password)
-    crud.create_user(db, user_create.email, hashed_pw)
+    # bcrypt는 전용 executor에서 실행 (공용 스레드풀을 차지하지 않음)
+    hashed_pw = await hashing.hash_password(user_create.password)
+    await crud.create_user(db, user_create.email, hashed_pw)
     return {"msg": "회원가입 성공! 환영합니다."}
 
-def login_user(db, user_login):
-    user = crud.get_user_by_email(db, user_login.email)
-    if not user or not utils.verify_password(user_login.password, user.password):
+async def login_user(db, user_login):
+    user = await crud.get_user_by_email(db, user_login.email)
+    if not user or not await hashing.verify_password(user_login.password, user.password):
         raise HTTPException(status_code=409, detail="로그인 실패")
-    token = utils.create_access_token(data={"sub": user.email})
-    return {"access_token": token, "token_type": "bearer"}
\ No newline at end of file
+    # bcrypt cost 설정이 바뀌었으면 로그인 성공 시 새 cost로 재해시 (평문을 아는 유일한 시점)
+    if utils.needs_rehash(user.password):
+        await crud.update_password(db, user, await hashing.hash_password(user_login.password))
+    token = utils.create_access_token(data={"sub": user.email, "uid": user.id})
+    return {"access_token": token, "token_type": "bearer"}
@@ -1,15 +1,19 @@
 # backend/app/auth/utils.py
 import os
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
 
 from fastapi import Depends, HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth import models
-from app.database import get_db
+from app.database import get_async_db
 
 # .env 로드: python-dotenv가 설치되어 있으면 사용, 없으면 조용히 스킵
 try:
@@ -23,6 +27,9 @@ except Exception:
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "120"))
+# 검증된 토큰 → 사용자 캐시 (워커별). 다른 워커의 계정 삭제는 최대 TTL만큼 늦게 반영됨
+AUTH_CACHE_TTL_S = float(os.getenv("AUTH_CACHE_TTL_S", "60"))
+AUTH_CACHE_MAX = int(os.getenv("AUTH_CACHE_MAX", "10000"))
 
 # 필수 값 검증 (하드코딩 금지)
 if not SECRET_KEY:
@@ -32,14 +39,24 @@ if not SECRET_KEY:
         "'.env' 또는 실행 환경에 SECRET_KEY를 지정해 주세요."
     )
 
+# bcrypt cost (바꾸면 기존 사용자는 다음 로그인 때 새 cost로 재해시됨)
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
 # === 보안 관련 설정 ===
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 oauth2_scheme = HTTPBearer()  # Authorization: Bearer <token>
 
-# === 비밀번호 해시/검증 ===
+# === 비밀번호 해시/검증 (CPU 작업 — 요청 경로에서는 app.auth.hashing 전용 executor로 실행) ===
 def verify_password(plain: str, hashed: str) -> bool:
     return pwd_context.verify(plain, hashed)
 
+def needs_rehash(hashed: str) -> bool:
+    """저장된 해시의 bcrypt cost가 현재 설정(BCRYPT_ROUNDS)과 다른지 ($2b$12$... 형식)"""
+    try:
+        return int(hashed.split("$")[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
@@ -47,6 +64,7 @@ def get_password_hash(password: str) -> str:
 def create_access_token(data: dict) -> str:
     """
     data에는 반드시 'sub' 키(이메일)를 포함시키는 것을 권장.
+    'uid'(사용자 id)를 함께 넣으면 사용자 조회가 기본키 조회로 바뀜.
     만료 계산은 졸업작품 요구사항에 따라 현재 방식 유지.
     """
     to_encode = data.copy()
@@ -54,11 +72,72 @@ def create_access_token(data: dict) -> str:
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
+# === 인증된 사용자 캐시 ===
+class CurrentUser:
+    """요청 처리에 필요한 사용자 식별 정보 (DB 세션과 무관한 값 객체)"""
+
+    __slots__ = ("id", "email")
+
+    def __init__(self, id: int, email: str):
+        self.id = id
+        self.email = email
+
+
+_user_cache: "OrderedDict[str, tuple]" = OrderedDict()  # 토큰 → (CurrentUser, 만료 시각)
+_user_cache_lock = threading.Lock()
+_user_cache_stats = {"hits": 0, "misses": 0, "invalidated": 0}
+
+
+def _cache_get(token: str):
+    now = time.time()
+    with _user_cache_lock:
+        entry = _user_cache.get(token)
+        if entry is None or entry[1] <= now:
+            if entry is not None:
+                del _user_cache[token]
+            _user_cache_stats["misses"] += 1
+            return None
+        _user_cache.move_to_end(token)
+        _user_cache_stats["hits"] += 1
+        return entry[0]
+
+
+def _cache_put(token: str, user: CurrentUser, token_exp) -> None:
+    expires_at = time.time() + AUTH_CACHE_TTL_S
+    if token_exp:
+        expires_at = min(expires_at, float(token_exp))  # 토큰 만료 후에는 캐시도 무효
+    with _user_cache_lock:
+        _user_cache[token] = (user, expires_at)
+        _user_cache.move_to_end(token)
+        while len(_user_cache) > AUTH_CACHE_MAX:
+            _user_cache.popitem(last=False)
+
+
+def invalidate_user(user_id: int) -> int:
+    """계정 삭제 등: 해당 사용자의 캐시된 토큰 제거 (이 워커)"""
+    with _user_cache_lock:
+        targets = [t for t, (u, _) in _user_cache.items() if u.id == user_id]
+        for t in targets:
+            del _user_cache[t]
+        _user_cache_stats["invalidated"] += len(targets)
+        return len(targets)
+
+
+def auth_cache_stats() -> dict:
+    with _user_cache_lock:
+        return {**_user_cache_stats, "entries": len(_user_cache), "ttl_s": AUTH_CACHE_TTL_S}
+
+
 # === 현재 사용자 조회(토큰 검증) ===
-def get_current_user(
+# async 의존성: 동기 엔드포인트에서 써도 사용자 조회는 이벤트 루프에서 실행 (스레드풀 슬롯 사용 안 함)
+async def get_current_user(
     token: HTTPAuthorizationCredentials = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-) -> models.User:
+    db: AsyncSession = Depends(get_async_db),
+) -> CurrentUser:
+    """
+    토큰 검증 후 사용자 식별 정보 반환.
+    같은 토큰은 AUTH_CACHE_TTL_S 동안 캐시 → 대부분의 요청은 users 테이블을 조회하지 않음.
+    """
     # 공통 예외 객체 (중복 제거)
     credentials_exception = HTTPException(
         status_code=401,
@@ -73,8 +152,22 @@ def get_current_user(
     except JWTError:
         raise credentials_exception
 
-    user = db.query(models.User).filter(models.User.email == email).first()
+    cached = _cache_get(token.credentials)
+    if cached is not None:
+        return cached
+
+    # 캐시 미스: uid 클레임이 있으면 기본키로, 없으면(이전 토큰) 이메일로 조회
+    uid = payload.get("uid")
+    if uid is not None:
+        user = await db.get(models.User, int(uid))
+        if user is not None and user.email != email:
+            user = None
+    else:
+        result = await db.execute(select(models.User).where(models.User.email == email))
+        user = result.scalars().first()
     if not user:
         raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다.")
 
-    return user
\ No newline at end of file
+    current = CurrentUser(id=user.id, email=user.email)
+    _cache_put(token.credentials, current, payload.get("exp"))
+    return current
@@ -1,8 +1,12 @@
 #backend\app\database.py
 import os
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
+from app import db_metrics
+
 # === .env 자동 로드 ===
 try:
     from dotenv import load_dotenv
@@ -19,18 +23,68 @@ if not DATABASE_URL:
     )
 
 # === SQL 로그 출력 여부 설정 ===
-# 개발 단계: 기본값 True / 배포 시 .env에서 DB_ECHO=False 설정
-DB_ECHO = os.getenv("DB_ECHO", "True").lower() in ("true", "1", "t")
+# 기본값 False: 모든 SQL 출력은 개발 시에만 DB_ECHO=True로 켬
+# (운영에서는 db_metrics가 DB_SLOW_QUERY_MS 이상 걸린 쿼리만 샘플링해 출력)
+DB_ECHO = os.getenv("DB_ECHO", "False").lower() in ("true", "1", "t")
+
+# === 연결 풀 설정 (워커 프로세스마다 sync/async 풀이 하나씩 생김) ===
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_RECYCLE_S = int(os.getenv("DB_POOL_RECYCLE_S", "1800"))   # 오래된 연결 재생성 (DB/프록시 idle timeout 대비)
+DB_POOL_TIMEOUT_S = float(os.getenv("DB_POOL_TIMEOUT_S", "10"))   # 풀이 가득 찼을 때 연결을 기다리는 최대 시간
+
+
+def _pool_options() -> dict:
+    return {
+        "pool_pre_ping": True,  # 연결 유지
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_recycle": DB_POOL_RECYCLE_S,
+        "pool_timeout": DB_POOL_TIMEOUT_S,
+        "echo": DB_ECHO,        # SQL 출력 (True면 쿼리 출력, False면 비활성화)
+    }
+
 
 # === SQLAlchemy 엔진 생성 ===
 engine = create_engine(
     DATABASE_URL,
-    pool_pre_ping=True,  # 연결 유지
-    echo=DB_ECHO         # SQL 출력 (True면 쿼리 출력, False면 비활성화)
+    poolclass=db_metrics.InstrumentedQueuePool,
+    **_pool_options(),
 )
+db_metrics.instrument_engine(engine, "sync")
+
+# === 비동기 엔진 (요청 경로의 단순 조회/저장용) ===
+# DB 대기 중에도 스레드풀 슬롯을 차지하지 않음 (경로 계산은 계속 스레드풀 사용)
+def _async_url(url: str) -> str:
+    """동기 URL → 비동기 드라이버 URL (postgresql → psycopg 3 async, sqlite → aiosqlite)"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend == "postgresql":
+        parsed = parsed.set(drivername="postgresql+psycopg")
+    elif backend == "sqlite":
+        parsed = parsed.set(drivername="sqlite+aiosqlite")
+    return parsed.render_as_string(hide_password=False)
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _async_url(DATABASE_URL)
+
+try:
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        poolclass=db_metrics.InstrumentedAsyncQueuePool,
+        **_pool_options(),
+    )
+except ImportError as e:
+    raise RuntimeError(
+        f"비동기 DB 드라이버를 불러올 수 없습니다 ({ASYNC_DATABASE_URL.split(':', 1)[0]}): {e}. "
+        "PostgreSQL은 psycopg[binary], SQLite는 aiosqlite가 필요합니다."
+    )
+db_metrics.instrument_engine(async_engine.sync_engine, "async")
 
 # === 세션 및 베이스 설정 ===
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# commit 후에도 객체 속성을 다시 조회하지 않도록 expire_on_commit=False (비동기 세션은 lazy 로딩 불가)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
 Base = declarative_base()
 
 # === DB 세션 의존성 주입 ===
@@ -40,3 +94,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# === 비동기 DB 세션 의존성 주입 ===
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
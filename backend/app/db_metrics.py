@@ -0,0 +1,155 @@
+# backend/app/db_metrics.py
+
+"""
+DB 연결 풀 / 쿼리 계측.
+
+- 풀에서 연결을 받을 때까지 기다린 시간(checkout wait), 타임아웃 횟수, 현재 점유(checked out / overflow)
+- 느린 쿼리(DB_SLOW_QUERY_MS 이상) 개수와 최근 목록 — 로그는 느린 쿼리만 DB_SLOW_QUERY_LOG_SAMPLE 비율로 출력
+- /metrics의 "db" 항목으로 노출 → 풀 고갈이 경로 요청 타임아웃으로 번지기 전에 확인
+"""
+
+import os
+import random
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "200"))
+# 느린 쿼리 로그 샘플링 비율 (1.0 = 모두 출력, 0 = 출력 안 함 — 지표는 항상 집계)
+DB_SLOW_QUERY_LOG_SAMPLE = float(os.getenv("DB_SLOW_QUERY_LOG_SAMPLE", "1.0"))
+# 연결 대기 시간이 이 값을 넘으면 경고 로그 (풀 고갈 징후)
+DB_POOL_WAIT_WARN_MS = float(os.getenv("DB_POOL_WAIT_WARN_MS", "100"))
+
+_RECENT_SLOW = 20
+
+_lock = threading.Lock()
+_pools = {}  # 이름 → 풀 통계
+
+
+def _pool_stats(name: str) -> dict:
+    st = _pools.get(name)
+    if st is None:
+        st = _pools[name] = {
+            "checkouts": 0,
+            "timeouts": 0,
+            "wait_ms_total": 0.0,
+            "wait_ms_max": 0.0,
+            "slow_waits": 0,
+            "queries": 0,
+            "slow_queries": 0,
+            "recent_slow": deque(maxlen=_RECENT_SLOW),
+            "pool": None,
+        }
+    return st
+
+
+def _record_wait(name: str, wait_ms: float, timed_out: bool) -> None:
+    with _lock:
+        st = _pool_stats(name)
+        if timed_out:
+            st["timeouts"] += 1
+        else:
+            st["checkouts"] += 1
+        st["wait_ms_total"] += wait_ms
+        st["wait_ms_max"] = max(st["wait_ms_max"], wait_ms)
+        if wait_ms >= DB_POOL_WAIT_WARN_MS:
+            st["slow_waits"] += 1
+    if timed_out:
+        print(f"❌ DB 연결 풀 타임아웃 ({name}): {wait_ms:.0f}ms 대기")
+    elif wait_ms >= DB_POOL_WAIT_WARN_MS:
+        print(f"⚠️ DB 연결 대기 ({name}): {wait_ms:.0f}ms")
+
+
+class _TimedGetMixin:
+    """풀에서 연결을 꺼낼 때까지 걸린 시간 측정"""
+
+    metrics_name = "db"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            _record_wait(self.metrics_name, (time.perf_counter() - started) * 1000.0, timed_out=True)
+            raise
+        _record_wait(self.metrics_name, (time.perf_counter() - started) * 1000.0, timed_out=False)
+        return conn
+
+
+class InstrumentedQueuePool(_TimedGetMixin, QueuePool):
+    metrics_name = "sync"
+
+
+class InstrumentedAsyncQueuePool(_TimedGetMixin, AsyncAdaptedQueuePool):
+    metrics_name = "async"
+
+
+def instrument_engine(engine, name: str) -> None:
+    """느린 쿼리 집계 + 풀 점유 조회용 등록 (sync_engine 또는 동기 엔진)"""
+    with _lock:
+        _pool_stats(name)["pool"] = engine.pool
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started_list = conn.info.get("query_started")
+        if not started_list:
+            return
+        elapsed_ms = (time.perf_counter() - started_list.pop()) * 1000.0
+        slow = elapsed_ms >= DB_SLOW_QUERY_MS
+        with _lock:
+            st = _pool_stats(name)
+            st["queries"] += 1
+            if slow:
+                st["slow_queries"] += 1
+                st["recent_slow"].append({
+                    "ms": round(elapsed_ms, 1),
+                    "statement": " ".join(statement.split())[:300],
+                    "at": time.time(),
+                })
+        if slow and DB_SLOW_QUERY_LOG_SAMPLE > 0 and random.random() < DB_SLOW_QUERY_LOG_SAMPLE:
+            print(f"🐢 느린 쿼리 ({name}, {elapsed_ms:.0f}ms): {' '.join(statement.split())[:300]}")
+
+
+def stats() -> dict:
+    result = {}
+    with _lock:
+        for name, st in _pools.items():
+            pool = st["pool"]
+            occupancy = {}
+            if isinstance(pool, QueuePool):
+                size = pool.size()
+                checked_out = pool.checkedout()
+                max_conn = size + max(pool._max_overflow, 0)
+                occupancy = {
+                    "size": size,
+                    "checked_out": checked_out,
+                    "idle": pool.checkedin(),
+                    "overflow": max(pool.overflow(), 0),
+                    "max_connections": max_conn,
+                    "occupancy": checked_out / max_conn if max_conn else 0.0,
+                }
+            attempts = st["checkouts"] + st["timeouts"]
+            result[name] = {
+                **occupancy,
+                "checkouts": st["checkouts"],
+                "timeouts": st["timeouts"],
+                "avg_wait_ms": st["wait_ms_total"] / attempts if attempts else 0.0,
+                "max_wait_ms": st["wait_ms_max"],
+                "slow_waits": st["slow_waits"],
+                "queries": st["queries"],
+                "slow_queries": st["slow_queries"],
+                "recent_slow": list(st["recent_slow"]),
+            }
+    return {
+        "slow_query_ms": DB_SLOW_QUERY_MS,
+        "pool_wait_warn_ms": DB_POOL_WAIT_WARN_MS,
+        "pools": result,
+    }
@@ -10,6 +10,9 @@ from pydantic import BaseModel
 from dotenv import load_dotenv
 from pyproj import Transformer
 
+from app.route import prefetch
+from app.route.utils import format_distance, format_duration
+
 # .env 파일 로드
 load_dotenv()
 
@@ -181,6 +184,8 @@ async def geocode(request: GeocodeRequest):
 
             if results:
                 print(f"[SUCCESS] Geocoding success: {len(results)} results")
+                # 곧 경로 탐색에 쓰일 가능성이 높은 좌표 → 주변 그래프 타일 선로딩
+                prefetch.prefetch_points((r.lat, r.lng) for r in results)
                 return results
             else:
                 # Geocoding API 결과가 없으면 네이버 검색 API로 장소 검색 시도
@@ -195,6 +200,7 @@ async def geocode(request: GeocodeRequest):
                 place_results = search_place_database(request.query)
                 if place_results:
                     print(f"[SUCCESS] 장소 데이터베이스에서 검색 성공: {len(place_results)}개")
+                    prefetch.prefetch_points((r.lat, r.lng) for r in place_results)
                     return place_results
 
                 # 모두 실패하면 빈 배열 반환
@@ -403,6 +409,7 @@ async def search_places_using_naver_search(query: str) -> List[GeocodeResult]:
                     traceback.print_exc()
 
             print(f"[DEBUG] 네이버 검색 API 최종 결과: {len(results)}개")
+            prefetch.prefetch_points((r.lat, r.lng) for r in results)
             return results
 
     except httpx.HTTPStatusError as e:
@@ -566,23 +573,6 @@ async def get_directions(request: DirectionsRequest):
             detail="서버 오류가 발생했습니다. 관리자에게 문의해주세요."
         )
 
-def format_distance(meters: int) -> str:
-    """거리를 포맷팅"""
-    if meters < 1000:
-        return f"{meters}m"
-    else:
-        return f"{meters/1000:.1f}km"
-
-def format_duration(seconds: int) -> str:
-    """시간을 포맷팅"""
-    minutes = seconds // 60
-    if minutes < 60:
-        return f"{minutes}분"
-    else:
-        hours = minutes // 60
-        remaining_minutes = minutes % 60
-        return f"{hours}시간 {remaining_minutes}분"
-
 def get_direction_icon(instruction: str) -> str:
     """방향 아이콘 반환"""
     if "직진" in instruction:
@@ -744,6 +734,8 @@ async def generate_placeholder_map(request: StaticMapRequest):
 @router.post("/api/reverse-geocode")
 async def reverse_geocode(request: ReverseGeocodeRequest):
     """좌표를 주소로 변환"""
+    # 역지오코딩 좌표(현재 위치/지도 클릭)는 출발지가 될 가능성이 높음 → 선로딩
+    prefetch.prefetch_point(request.lat, request.lng)
     try:
         async with httpx.AsyncClient() as client:
             url = "https://maps.apigw.ntruss.com/map-reversegeocode/v2/gc"
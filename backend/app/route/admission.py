@@ -0,0 +1,141 @@
+# backend/app/route/admission.py
+
+"""
+경로 계산(/route/find) 입장 제어 (admission control).
+
+- 워커(프로세스)당 동시 실행 개수를 세마포어로 제한
+- 대기열 길이도 제한: 가득 차면 즉시 429 + Retry-After
+- 대기 시간이 ROUTE_QUEUE_TIMEOUT_S를 넘으면 503 + Retry-After
+- 대기열 깊이 / 대기 시간 / 처리 시간 지표를 stats()로 노출
+
+CPU를 많이 쓰는 경로 계산이 스레드풀을 독점하지 않도록,
+엔드포인트는 async로 슬롯을 먼저 얻은 뒤에만 스레드풀로 넘긴다.
+"""
+
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+from fastapi import HTTPException
+
+# === 환경 변수 ===
+ROUTE_MAX_CONCURRENCY = int(os.getenv("ROUTE_MAX_CONCURRENCY", "2"))
+ROUTE_MAX_QUEUE = int(os.getenv("ROUTE_MAX_QUEUE", "8"))
+ROUTE_QUEUE_TIMEOUT_S = float(os.getenv("ROUTE_QUEUE_TIMEOUT_S", "10"))
+ROUTE_RETRY_AFTER_S = int(os.getenv("ROUTE_RETRY_AFTER_S", "5"))
+
+# 지표 계산용 최근 샘플 개수
+_SAMPLE_WINDOW = 1000
+
+
+def _percentile(values, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(math.ceil(q * len(ordered))) - 1)
+    return ordered[max(idx, 0)]
+
+
+class AdmissionController:
+    def __init__(self, name: str, max_concurrency: int, max_queue: int,
+                 queue_timeout_s: float, retry_after_s: int):
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout_s = queue_timeout_s
+        self.retry_after_s = retry_after_s
+
+        # Python 3.10+ 에서는 첫 사용 시 이벤트 루프에 바인딩됨
+        self._sem = asyncio.Semaphore(self.max_concurrency)
+
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self._wait_ms = deque(maxlen=_SAMPLE_WINDOW)
+        self._service_ms = deque(maxlen=_SAMPLE_WINDOW)
+
+    def _retry_after(self) -> int:
+        """평균 처리 시간과 현재 대기열로 재시도 시점(초) 추정"""
+        if not self._service_ms:
+            return self.retry_after_s
+        avg_s = sum(self._service_ms) / len(self._service_ms) / 1000.0
+        estimate = avg_s * (self.waiting + 1) / self.max_concurrency
+        return max(1, int(math.ceil(estimate)))
+
+    def _reject(self, status_code: int, detail: str):
+        raise HTTPException(
+            status_code=status_code,
+            detail=detail,
+            headers={"Retry-After": str(self._retry_after())},
+        )
+
+    @asynccontextmanager
+    async def slot(self):
+        """동시 실행 슬롯 획득 (대기열 초과/대기 시간 초과 시 즉시 거절)"""
+        queued_at = time.perf_counter()
+
+        if self._sem.locked():
+            if self.waiting >= self.max_queue:
+                self.rejected_queue_full += 1
+                self._reject(429, "경로 계산 요청이 많습니다. 잠시 후 다시 시도해주세요.")
+
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._sem.acquire(), timeout=self.queue_timeout_s)
+            except asyncio.TimeoutError:
+                self.rejected_timeout += 1
+                self._reject(503, "경로 계산 대기 시간이 초과되었습니다. 잠시 후 다시 시도해주세요.")
+            finally:
+                self.waiting -= 1
+        else:
+            await self._sem.acquire()
+
+        started_at = time.perf_counter()
+        self._wait_ms.append((started_at - queued_at) * 1000.0)
+        self.admitted += 1
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._service_ms.append((time.perf_counter() - started_at) * 1000.0)
+            self._sem.release()
+
+    def stats(self) -> dict:
+        wait = list(self._wait_ms)
+        service = list(self._service_ms)
+        return {
+            "pid": os.getpid(),
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queue_depth": self.waiting,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+            "wait_ms": {
+                "avg": sum(wait) / len(wait) if wait else 0.0,
+                "p50": _percentile(wait, 0.50),
+                "p95": _percentile(wait, 0.95),
+                "max": max(wait) if wait else 0.0,
+            },
+            "service_ms": {
+                "avg": sum(service) / len(service) if service else 0.0,
+                "p95": _percentile(service, 0.95),
+            },
+        }
+
+
+# 워커당 하나: /route/find 전용
+route_admission = AdmissionController(
+    name="route_find",
+    max_concurrency=ROUTE_MAX_CONCURRENCY,
+    max_queue=ROUTE_MAX_QUEUE,
+    queue_timeout_s=ROUTE_QUEUE_TIMEOUT_S,
+    retry_after_s=ROUTE_RETRY_AFTER_S,
+)
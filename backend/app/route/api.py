@@ -1,15 +1,30 @@
 # backend/app/route/api.py
 
 import threading
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from typing import List, Optional, Union
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.auth.utils import get_current_user
 from app.route import schemas
 from app.route import service
+from app.route import crud
 from app.route.detect_service import detect_folder_and_save
+from app.route.admission import route_admission
+from app.route.multistop import plan_multi_stop_route, MULTI_STOP_MAX_STOPS
+from app.route import poi_routes
+from app.route import prefetch
+from app.route import regions
+from app.route import osm_changes
+from app.route import snapshots
+from app.route import viewport_clusters
+from app.route import obstacle_tiles
+from app.route import obstacle_changes
 
 router = APIRouter()
 
@@ -19,11 +34,15 @@ _is_detecting = False
 
 
 # 1) 경로 계산 (최초 실행 시 이미지 추론 자동 실행)
+# 좌표가 수천 개인 응답: 타입 모델(pydantic-core)로 검증/직렬화 + orjson으로 인코딩
+# (jsonable_encoder + 표준 json 경로를 거치지 않음)
 @router.post(
     "/find",
+    response_model=schemas.RouteResponse,
+    response_class=ORJSONResponse,
     summary="경로 계산 (개별 장애물 성공/실패 분석 v3)"
 )
-def find_route(
+async def find_route(
     request: schemas.RouteRequest,
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user),
@@ -33,42 +52,113 @@ def find_route(
     1. 최초 실행 시 DB에 장애물이 없으면 이미지 추론 후 DB 저장
     2. 이후 실행 시에는 DB에 저장된 장애물 데이터 사용
     3. 사용자가 선택한 장애물 타입을 회피하는 최적 경로 계산
+
+    입장 제어: 워커당 동시 계산 수와 대기열을 제한하고,
+    초과 시 429/503 + Retry-After로 즉시 응답 (가벼운 API 지연 보호)
+    """
+    _ensure_coverage([(request.start_lat, request.start_lng), (request.end_lat, request.end_lng)])
+    async with route_admission.slot():
+        try:
+            return await run_in_threadpool(_find_route_sync, request, db, current_user.id)
+        except regions.OutsideCoverageError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+
+def _ensure_coverage(points):
+    """
+    서비스 지역(지역 그래프 레지스트리) 밖 좌표는 대기열에 넣기 전에 바로 거절.
+    계산 중에 알게 되는 경우(지역 그래프 파일 없음, 도로 없는 영역, 두 지역에 걸친 좌표)는
+    OutsideCoverageError → 각 엔드포인트에서 같은 400으로 응답
     """
+    if not regions.covers_points(points):
+        raise HTTPException(status_code=400, detail="서비스 지역 밖의 좌표입니다.")
+
+
+def _find_route_sync(request: schemas.RouteRequest, db: Session, user_id: int):
     # 최초 경로 찾기 시: DB에 장애물이 없으면 이미지 추론 실행
     # 동시성 문제 방지: Lock을 사용하여 동시에 여러 요청이 추론을 실행하지 않도록 함
     global _is_detecting
     
-    if not service.has_obstacles(db):
+    # 평소에는 워커 메모리의 장애물 스냅샷만 확인 (DB 조회 없음)
+    if snapshots.current().obstacle_count == 0:
         with _detection_lock:
-            # Lock을 획득한 후 다시 한 번 확인 (다른 스레드가 이미 추론 완료했을 수 있음)
+            # Lock을 획득한 후 DB로 다시 한 번 확인 (다른 스레드/워커가 이미 추론 완료했을 수 있음)
             if not service.has_obstacles(db) and not _is_detecting:
                 _is_detecting = True
                 print("📸 최초 경로 찾기: 이미지 추론 시작...")
                 try:
                     detect_folder_and_save(db)
                     print("✅ 이미지 추론 완료: 장애물 데이터가 DB에 저장되었습니다.")
+                    # 폴링을 기다리지 않고 이 워커의 스냅샷에 바로 반영
+                    snapshots.build(snapshots.current().version)
                 except Exception as e:
                     print(f"⚠️ 이미지 추론 실패: {str(e)}")
                     # 추론 실패해도 경로 계산은 진행 (기존 장애물 데이터가 없을 수 있음)
                 finally:
                     _is_detecting = False
     
+    # 캠퍼스 POI 간 + 표준 회피 프로필 요청이면 사전 계산 테이블에서 바로 응답
+    cached = poi_routes.lookup_route(request, db)
+    if cached is not None:
+        return cached
+
     # 경로 계산 (DB에 저장된 장애물 데이터 사용)
     return service.find_path_from_request(
         req=request,
         db=db,
-        user_id=current_user.id
+        user_id=user_id
     )
 
 
+# 1-1) 다중 경유지 경로 계산 (방문 순서 최적화)
+@router.post(
+    "/multi",
+    response_model=schemas.MultiStopRouteResponse,
+    summary="다중 경유지 경로 계산 (방문 순서 최적화)"
+)
+async def find_multi_stop_route(
+    request: schemas.MultiStopRouteRequest,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    """
+    여러 경유지를 한 번에 계산:
+    1. 모든 경유지 간 장애물 반영 비용 행렬을 한 그래프에서 한 번만 계산
+    2. 방문 순서 최적화 (stops[0]은 출발지로 고정)
+    3. 구간별 / 전체 obstacle_stats 반환
+    """
+    if len(request.stops) > MULTI_STOP_MAX_STOPS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"경유지는 최대 {MULTI_STOP_MAX_STOPS}개까지 지정할 수 있습니다.",
+        )
+    _ensure_coverage([(s.lat, s.lng) for s in request.stops])
+
+    async with route_admission.slot():
+        try:
+            return await run_in_threadpool(
+                plan_multi_stop_route,
+                stops=[(s.lat, s.lng) for s in request.stops],
+                db=db,
+                avoid_types=request.avoid_types,
+                radius_m=request.radius_m,
+                penalties=request.penalties,
+                optimize_order=request.optimize_order,
+                keep_last=request.keep_last,
+                round_trip=request.round_trip,
+            )
+        except regions.OutsideCoverageError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+
 # 2) 사용자가 선택한 경로 저장
 @router.post("/save")
-def save_route(
+async def save_route(
     request: schemas.RouteSaveRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(get_current_user),
 ):
-    route_obj = service.save_route(
+    route_obj = await service.save_route(
         req=request,
         db=db,
         user_id=current_user.id
@@ -88,38 +178,89 @@ def save_route(
     }
 
 
-# 조회
-@router.get("/my")
-def get_my_routes(
-    db: Session = Depends(get_db),
+# 조회 (keyset 페이지: 응답의 next_cursor를 다음 요청의 cursor로 전달, 기본은 좌표 제외 요약)
+@router.get(
+    "/my",
+    response_model=schemas.MyRoutesPage,
+    response_model_exclude_unset=True,  # 좌표를 요청하지 않으면 route_points 키 자체를 생략
+    response_class=ORJSONResponse,
+)
+async def get_my_routes(
+    limit: int = service.MY_ROUTES_PAGE_DEFAULT,
+    cursor: Optional[str] = None,
+    include_geometry: bool = False,
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(get_current_user),
 ):
-    routes = service.get_my_routes(db=db, user_id=current_user.id)
+    try:
+        routes, next_cursor = await service.get_my_routes(
+            db=db,
+            user_id=current_user.id,
+            limit=limit,
+            cursor=cursor,
+            include_geometry=include_geometry,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     # created_at을 문자열로 변환하여 딕셔너리 리스트로 반환
-    result = []
+    items = []
     for route_obj in routes:
-        result.append({
+        item = {
             "id": route_obj.id,
             "start_lat": route_obj.start_lat,
             "start_lng": route_obj.start_lng,
             "end_lat": route_obj.end_lat,
             "end_lng": route_obj.end_lng,
-            "route_points": route_obj.route_points,
             "distance_m": route_obj.distance_m,
             "avoided": route_obj.avoided,
             "created_at": route_obj.created_at.isoformat() if isinstance(route_obj.created_at, datetime) else str(route_obj.created_at)
-        })
-    return result
+        }
+        if include_geometry:
+            item["route_points"] = route_obj.route_points
+        items.append(item)
+    return {"items": items, "next_cursor": next_cursor}
+
+
+# 저장된 경로 좌표 일괄 조회 (목록 페이지의 썸네일/상세용)
+@router.get("/my/geometry")
+async def get_my_route_geometries(
+    ids: List[int] = Query(..., max_length=service.MY_ROUTES_PAGE_MAX),
+    encoding: str = Query("points", pattern="^(points|polyline)$"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user),
+):
+    # encoding=polyline: route_polyline(1e-6 encoded polyline 문자열)로 응답 → 좌표 배열보다 훨씬 작음
+    as_polyline = encoding == "polyline"
+    geometries = await service.get_route_geometries(db, current_user.id, ids, as_polyline=as_polyline)
+    field = "route_polyline" if as_polyline else "route_points"
+    return {"routes": [{"id": rid, field: geometry} for rid, geometry in geometries.items()]}
+
+
+# 저장된 경로 하나의 좌표
+@router.get("/my/{route_id}/geometry")
+async def get_my_route_geometry(
+    route_id: int,
+    encoding: str = Query("points", pattern="^(points|polyline)$"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user),
+):
+    as_polyline = encoding == "polyline"
+    geometries = await service.get_route_geometries(db, current_user.id, [route_id], as_polyline=as_polyline)
+    if route_id not in geometries:
+        raise HTTPException(status_code=404, detail="해당 경로를 찾을 수 없습니다.")
+    field = "route_polyline" if as_polyline else "route_points"
+    return {"id": route_id, field: geometries[route_id]}
 
 
 # 저장된 경로 삭제 기능
 @router.delete("/delete/{route_id}")
-def delete_route(
+async def delete_route(
     route_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user),
 ):
-    success = service.delete_route(
+    success = await service.delete_route(
         route_id=route_id,
         db=db,
         user_id=current_user.id
@@ -132,35 +273,207 @@ def delete_route(
 
 
 # 장애물 조회 (지도 영역 내) - 공개 데이터이므로 인증 불필요
-@router.get("/obstacles")
-def get_obstacles_in_bounds(
+@router.get(
+    "/obstacles",
+    response_model=Union[
+        List[schemas.ObstacleResponse],
+        schemas.ObstacleClustersResponse,
+        schemas.ObstaclePointsResponse,
+    ],
+    response_class=ORJSONResponse,
+)
+async def get_obstacles_in_bounds(
     south: float,
     north: float,
     west: float,
     east: float,
-    db: Session = Depends(get_db),
+    zoom: Optional[int] = Query(None, ge=0, le=22),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """지도 영역 내의 장애물 조회 (공개 데이터, 인증 불필요)"""
-    from app.route.models import Obstacle
+    """
+    지도 영역 내의 장애물 조회 (공개 데이터, 인증 불필요)
+    - zoom 생략: 영역 안 장애물 목록 (기존 형식)
+    - zoom < OBSTACLE_CLUSTER_MAX_ZOOM: {"mode": "clusters", "clusters": [...]} (줌별 격자 클러스터)
+    - zoom >= OBSTACLE_CLUSTER_MAX_ZOOM: {"mode": "points", "obstacles": [...]}
+    """
+    if zoom is not None and zoom < viewport_clusters.OBSTACLE_CLUSTER_MAX_ZOOM:
+        return await run_in_threadpool(viewport_clusters.clusters_in_bbox, south, north, west, east, zoom)
 
-    obstacles = (
-        db.query(Obstacle)
-        .filter(Obstacle.lat >= south, Obstacle.lat <= north)
-        .filter(Obstacle.lng >= west, Obstacle.lng <= east)
-        .all()
-    )
+    # 목록보다 먼저 읽은 버전 → 이후 /obstacles/changes?since=이 버전으로 증분 동기화 (중복은 있어도 누락은 없음)
+    dataset_version = await obstacle_changes.get_version_async(db) if zoom is not None else None
+    obstacles = await crud.get_obstacles_in_bbox_async(db, south, north, west, east)
 
-    return [
+    items = [
         {
             "id": obs.id,
             "type": obs.type,
             "lat": obs.lat,
             "lng": obs.lng,
             "confidence": obs.confidence,
+            "detection_count": obs.detection_count,
             "detected_at": obs.detected_at.isoformat() if obs.detected_at else None
         }
         for obs in obstacles
     ]
+    if zoom is None:
+        return items
+    return {"mode": "points", "zoom": zoom, "dataset_version": dataset_version, "obstacles": items}
+
+
+# 장애물 히트맵 (geohash 셀 × 타입별 개수) - 공개 데이터이므로 인증 불필요
+@router.get("/obstacles/heatmap")
+def get_obstacle_heatmap(
+    south: float,
+    north: float,
+    west: float,
+    east: float,
+    precision: int = 6,
+    types: Optional[List[str]] = Query(None),
+    db: Session = Depends(get_db),
+):
+    """precision 자리 geohash 셀별 장애물 수 (셀 중심 좌표 포함)"""
+    try:
+        cells = crud.get_obstacle_cell_counts(db, south, north, west, east, precision, types)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"precision": precision, "cells": cells}
+
+
+def _optional_bbox(south, north, west, east):
+    values = (south, north, west, east)
+    if all(v is None for v in values):
+        return None
+    if any(v is None for v in values):
+        raise HTTPException(status_code=400, detail="south, north, west, east는 함께 지정해야 합니다.")
+    return values
+
+
+# 장애물 증분 동기화: since 버전 이후 추가/수정/삭제만 (reset=true면 영역 전체 다시 조회) - 인증 불필요
+@router.get("/obstacles/changes")
+def get_obstacle_changes(
+    since: int = Query(..., ge=0),
+    south: Optional[float] = None,
+    north: Optional[float] = None,
+    west: Optional[float] = None,
+    east: Optional[float] = None,
+    db: Session = Depends(get_db),
+):
+    return obstacle_changes.get_changes(db, since, _optional_bbox(south, north, west, east))
+
+
+# 장애물 변경 알림 (Server-Sent Events, 영역 지정 가능) - 인증 불필요
+@router.get("/obstacles/stream")
+async def stream_obstacle_changes(
+    request: Request,
+    since: Optional[int] = Query(None, ge=0),
+    south: Optional[float] = None,
+    north: Optional[float] = None,
+    west: Optional[float] = None,
+    east: Optional[float] = None,
+):
+    bbox = _optional_bbox(south, north, west, east)
+    return StreamingResponse(
+        obstacle_changes.event_stream(request, since, bbox),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# 장애물 바이너리 타일 (z/x/y, 형식은 obstacle_tiles 참고) - 공개 데이터이므로 인증 불필요
+# ETag + Cache-Control → 브라우저 / nginx가 타일을 캐시하고 If-None-Match로 재검증 (변경 없으면 304)
+@router.get("/obstacles/tiles/{z}/{x}/{y}.bin")
+async def get_obstacle_tile(
+    z: int,
+    x: int,
+    y: int,
+    if_none_match: Optional[str] = Header(None),
+):
+    if not obstacle_tiles.OBSTACLE_TILE_MIN_ZOOM <= z <= obstacle_tiles.OBSTACLE_TILE_MAX_ZOOM:
+        raise HTTPException(
+            status_code=400,
+            detail=f"타일 줌은 {obstacle_tiles.OBSTACLE_TILE_MIN_ZOOM}~{obstacle_tiles.OBSTACLE_TILE_MAX_ZOOM}만 지원합니다.",
+        )
+    if not (0 <= x < (1 << z) and 0 <= y < (1 << z)):
+        raise HTTPException(status_code=404, detail="타일 범위를 벗어났습니다.")
+
+    data, etag = await run_in_threadpool(obstacle_tiles.get_tile, z, x, y)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={obstacle_tiles.OBSTACLE_TILE_MAX_AGE_S}",
+    }
+    if obstacle_tiles.etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=data, media_type=obstacle_tiles.MEDIA_TYPE, headers=headers)
+
+
+# 그래프 타일 선로딩 (프론트엔드 현재 위치 / 출발·도착지 선택 시)
+# Overpass 다운로드를 일으키므로 로그인 사용자만 + 서비스 지역 안 좌표만
+@router.post("/prefetch")
+def prefetch_tiles(
+    request: schemas.PrefetchRequest,
+    current_user=Depends(get_current_user),
+):
+    """좌표 주변 그래프/장애물 타일을 백그라운드에서 미리 로딩 (즉시 반환)"""
+    _ensure_coverage([(request.lat, request.lng)])
+    queued = prefetch.prefetch_point(request.lat, request.lng)
+    return {"ok": True, "queued_tiles": queued}
+
+
+# POI 간 사전 계산 경로 테이블 재계산 (관리자용)
+@router.post("/poi-routes/refresh")
+def refresh_poi_routes(
+    current_user=Depends(get_current_user),
+):
+    """캠퍼스 POI × 표준 회피 프로필 경로 테이블을 백그라운드에서 다시 계산"""
+    if not poi_routes.load_pois():
+        return {"ok": False, "message": "POI 목록이 없습니다. CAMPUS_POI_FILE을 확인해주세요."}
+
+    poi_routes.refresh_poi_routes_in_background()
+    return {"ok": True, "message": "POI 경로 테이블 재계산을 시작했습니다."}
+
+
+# OSM 변경 파일(.osc) 즉시 적용 (관리자용)
+@router.post("/osm-changes/apply")
+def apply_osm_changes(
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    """
+    OSM_CHANGE_DIR에 새로 추가된 변경 파일을 이 워커의 캐시된 그래프에 바로 적용.
+    (다른 워커는 OSM_CHANGE_POLL_S 주기로 같은 파일을 적용)
+    """
+    results = osm_changes.sync_changes(force=True)
+    if results and poi_routes.load_pois():
+        # 사전 계산 경로는 바뀐 그래프 기준으로 다시 계산
+        poi_routes.invalidate_poi_routes(db)
+        poi_routes.refresh_poi_routes_in_background()
+    return {"ok": True, "applied": results, "stats": osm_changes.stats()}
+
+
+# 경로 스냅샷 재구축 (관리자용)
+@router.post("/snapshots/rebuild")
+async def rebuild_snapshot(
+    request: schemas.SnapshotRebuildRequest,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    """
+    새 스냅샷 버전을 요청하고 즉시 반환.
+    모든 워커가 백그라운드에서 새 스냅샷을 만든 뒤 교체 (진행 중인 요청은 이전 스냅샷으로 완료)
+    """
+    target = await run_in_threadpool(snapshots.request_rebuild, db, request.reload_graphs)
+    return {"ok": True, "target_version": target, "reload_graphs": request.reload_graphs}
+
+
+# 워커별 스냅샷 버전 / 상태
+@router.get("/snapshots")
+def get_snapshots(db: Session = Depends(get_db)):
+    workers = snapshots.list_workers(db)
+    return {
+        "this_worker": snapshots.stats(),
+        "workers": workers,
+        "all_up_to_date": all(w["up_to_date"] for w in workers),
+    }
 
 
 # 이미지 추론 실행 (관리자용)
@@ -0,0 +1,264 @@
+# backend/app/route/cache_governor.py
+
+"""
+워커(프로세스)별 캐시 메모리 관리자.
+
+그래프 타일 / 지역 그래프 / 공간 인덱스 / 장애물 타일 / 경로 결과 캐시를
+하나의 메모리 예산(CACHE_MEMORY_BUDGET_MB) 안에서 관리한다.
+
+- 항목 크기는 객체 그래프를 따라가며 실제 바이트 수를 측정 (deep_sizeof)
+- 예산을 넘으면 GreedyDual-Size 방식으로 해제:
+  우선순위 H = L + cost / size (cost = 다시 만드는 데 걸린 시간 ms)
+  → 오래 안 쓴 항목, 크기에 비해 다시 만들기 싼 항목부터 해제 (LRU + 크기 고려)
+- 고정(pinned) 항목(예: 본 캠퍼스 지역 그래프)은 해제하지 않음
+- 한 항목이 (고정 항목을 뺀) 예산보다 크면 캐시하지 않음 (요청에는 그대로 사용)
+"""
+
+import os
+import sys
+import threading
+import time
+import types
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+import shapely
+from shapely.geometry.base import BaseGeometry
+
+CACHE_MEMORY_BUDGET_MB = float(os.getenv("CACHE_MEMORY_BUDGET_MB", "1024"))
+
+
+# --- 크기 측정 ---
+
+_ATOMIC = (int, float, complex, bool, str, bytes, bytearray, type(None))
+# 따라가지 않는 객체 (공유 코드/모듈)
+_SKIP = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+
+
+def deep_sizeof(obj: Any) -> int:
+    """
+    객체가 참조하는 모든 객체의 크기 합 (같은 객체는 한 번만).
+    dict/list/tuple/set, 일반 객체의 __dict__/__slots__, numpy 배열, shapely geometry 지원.
+    """
+    seen = set()
+    total = 0
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        oid = id(o)
+        if oid in seen:
+            continue
+        seen.add(oid)
+
+        if isinstance(o, _SKIP):
+            continue
+        if isinstance(o, np.ndarray):
+            total += sys.getsizeof(o)
+            if o.base is not None:
+                total += o.nbytes  # view는 getsizeof에 데이터가 포함되지 않음
+            if o.dtype == object:
+                stack.extend(o.ravel().tolist())
+            continue
+        if isinstance(o, BaseGeometry):
+            # GEOS 객체: 좌표(double 2~3개) + 헤더
+            total += sys.getsizeof(o) + int(shapely.get_num_coordinates(o)) * 24 + 64
+            continue
+
+        total += sys.getsizeof(o)
+        if isinstance(o, _ATOMIC):
+            continue
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            stack.extend(o)
+        else:
+            d = getattr(o, "__dict__", None)
+            if d is not None:
+                stack.append(d)
+            for slot in getattr(type(o), "__slots__", ()):
+                if hasattr(o, slot):
+                    stack.append(getattr(o, slot))
+    return total
+
+
+# --- 관리자 ---
+
+class CacheGovernor:
+    def __init__(self, budget_bytes: int):
+        self.budget_bytes = int(budget_bytes)
+        self._lock = threading.RLock()
+        # (namespace, key) → 항목
+        self._entries: Dict[Tuple[str, Hashable], dict] = {}
+        self._used = 0
+        self._clock = 0.0  # GreedyDual-Size의 L
+        self._ns_stats: Dict[str, dict] = {}
+
+    def _ns(self, namespace: str) -> dict:
+        st = self._ns_stats.get(namespace)
+        if st is None:
+            st = {"hits": 0, "misses": 0, "evictions": 0, "rejected_oversize": 0}
+            self._ns_stats[namespace] = st
+        return st
+
+    def get(self, namespace: str, key: Hashable):
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is None:
+                self._ns(namespace)["misses"] += 1
+                return None
+            self._ns(namespace)["hits"] += 1
+            entry["h"] = self._clock + entry["cost"] / entry["size"]
+            entry["last_used"] = time.time()
+            return entry["value"]
+
+    def peek(self, namespace: str, key: Hashable):
+        """접근 기록/통계 없이 조회 (관리 작업용)"""
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            return entry["value"] if entry is not None else None
+
+    def replace(self, namespace: str, key: Hashable, value, meta: Optional[dict] = None) -> bool:
+        """기존 항목의 값만 교체 (cost/pinned 유지, 크기 재측정). 항목이 없으면 False"""
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is None:
+                return False
+            cost, pinned = entry["cost"], entry["pinned"]
+            merged = {**entry["meta"], **(meta or {})}
+        self.put(namespace, key, value, cost=cost, pinned=pinned, meta=merged)
+        return True
+
+    def contains(self, namespace: str, key: Hashable) -> bool:
+        with self._lock:
+            return (namespace, key) in self._entries
+
+    def meta(self, namespace: str, key: Hashable) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            return entry["meta"] if entry is not None else None
+
+    def put(self, namespace: str, key: Hashable, value, size: Optional[int] = None,
+            cost: float = 1.0, pinned: bool = False, meta: Optional[dict] = None):
+        """
+        항목 저장 후 value 반환. size 생략 시 deep_sizeof로 측정.
+        cost: 다시 만드는 비용 (ms) — 클수록 오래 남음
+        """
+        if size is None:
+            size = deep_sizeof(value)
+        size = max(1, int(size))
+
+        with self._lock:
+            self._remove((namespace, key))
+
+            pinned_bytes = sum(e["size"] for e in self._entries.values() if e["pinned"])
+            if not pinned and size > self.budget_bytes - pinned_bytes:
+                self._ns(namespace)["rejected_oversize"] += 1
+                return value
+
+            self._entries[(namespace, key)] = {
+                "value": value,
+                "size": size,
+                "cost": max(float(cost), 1e-3),
+                "pinned": pinned,
+                "meta": meta or {},
+                "h": self._clock + max(float(cost), 1e-3) / size,
+                "created_at": time.time(),
+                "last_used": time.time(),
+            }
+            self._used += size
+            self._evict(keep=(namespace, key))
+            return value
+
+    def _remove(self, full_key) -> Optional[dict]:
+        entry = self._entries.pop(full_key, None)
+        if entry is not None:
+            self._used -= entry["size"]
+        return entry
+
+    def _evict(self, keep) -> None:
+        """예산 이하가 될 때까지 H가 가장 낮은 (고정되지 않은) 항목부터 해제"""
+        while self._used > self.budget_bytes:
+            victims = [
+                (e["h"], k) for k, e in self._entries.items()
+                if not e["pinned"] and k != keep
+            ]
+            if not victims:
+                break
+            h, victim = min(victims, key=lambda x: x[0])
+            self._clock = h
+            entry = self._remove(victim)
+            self._ns(victim[0])["evictions"] += 1
+            if entry["size"] >= 1024 * 1024:
+                print(f"♻️ 캐시 해제: {victim[0]}:{victim[1]} ({entry['size'] / 1024 / 1024:.1f}MB)")
+
+    def remove(self, namespace: str, key: Hashable) -> bool:
+        with self._lock:
+            return self._remove((namespace, key)) is not None
+
+    def remove_where(self, namespace: str, predicate: Callable[[Hashable, dict], bool]) -> int:
+        """조건(key, meta)에 맞는 항목 제거, 제거 개수 반환"""
+        with self._lock:
+            targets = [
+                k for k, e in self._entries.items()
+                if k[0] == namespace and predicate(k[1], e["meta"])
+            ]
+            for k in targets:
+                self._remove(k)
+            return len(targets)
+
+    def clear(self, namespace: str) -> int:
+        return self.remove_where(namespace, lambda key, meta: True)
+
+    def keys(self, namespace: str) -> List[Hashable]:
+        with self._lock:
+            return [k[1] for k in self._entries if k[0] == namespace]
+
+    def set_pinned(self, namespace: str, key: Hashable, pinned: bool = True) -> bool:
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is None:
+                return False
+            entry["pinned"] = pinned
+            if not pinned:
+                self._evict(keep=None)
+            return True
+
+    def namespace_bytes(self, namespace: str) -> int:
+        with self._lock:
+            return sum(e["size"] for k, e in self._entries.items() if k[0] == namespace)
+
+    def stats(self, detail: bool = False) -> dict:
+        with self._lock:
+            namespaces: Dict[str, dict] = {}
+            for (ns, key), e in self._entries.items():
+                st = namespaces.setdefault(ns, {"entries": 0, "bytes": 0, "pinned": 0, "items": []})
+                st["entries"] += 1
+                st["bytes"] += e["size"]
+                st["pinned"] += int(e["pinned"])
+                if detail:
+                    st["items"].append({
+                        "key": str(key),
+                        "bytes": e["size"],
+                        "pinned": e["pinned"],
+                        "age_s": time.time() - e["created_at"],
+                        "idle_s": time.time() - e["last_used"],
+                    })
+            for ns, counters in self._ns_stats.items():
+                namespaces.setdefault(ns, {"entries": 0, "bytes": 0, "pinned": 0, "items": []}).update(counters)
+            for st in namespaces.values():
+                st["mb"] = st["bytes"] / 1024 / 1024
+                if not detail:
+                    st.pop("items")
+
+            return {
+                "pid": os.getpid(),
+                "budget_mb": self.budget_bytes / 1024 / 1024,
+                "used_mb": self._used / 1024 / 1024,
+                "occupancy": self._used / self.budget_bytes if self.budget_bytes else 0.0,
+                "namespaces": namespaces,
+            }
+
+
+# 워커당 하나
+governor = CacheGovernor(budget_bytes=int(CACHE_MEMORY_BUDGET_MB * 1024 * 1024))
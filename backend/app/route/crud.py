@@ -0,0 +1,372 @@
+# backend/app/route/crud.py
+
+"""
+장애물 조회 헬퍼 + 공간 인덱스 준비.
+
+- PostgreSQL + PostGIS: obstacles.geog (lat/lng에서 자동 생성되는 geography 컬럼) + GiST 인덱스
+  → bbox 조회는 geog && envelope 인덱스 스캔 후 lat/lng로 정확히 거름
+- 그 외 (PostGIS 없는 PostgreSQL, SQLite):
+  모든 행에 geohash 셀 키(cell)가 있으면 bbox를 덮는 몇 개의 셀 접두어 범위 조회 ((type, cell) 인덱스),
+  아니면 (type, lat, lng) / (lat, lng) 복합 B-tree 인덱스로 범위 조회
+- 셀 단위 집계(히트맵): GROUP BY substr(cell, 1, n)
+- 기존 행 셀 키 채우기: python -m app.route.crud backfill-cells [--batch 5000]
+- 대량 저장(YOLO 추론 결과): Core INSERT ... RETURNING 배치 (새 id는 변경 기록에 사용)
+- 저장 경로 좌표(routes)는 encoded polyline으로 저장 — 이전 JSON 행 변환:
+  python -m app.route.crud encode-routes [--batch 1000]
+"""
+
+import argparse
+import os
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, insert, inspect, or_, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.schema import CreateTable
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.route import geohash
+from app.route.models import Obstacle, RouteResult
+from app.route.utils import encode_polyline
+
+# 대량 저장 시 한 번에 보내는 행 수
+OBSTACLE_INSERT_BATCH = int(os.getenv("OBSTACLE_INSERT_BATCH", "1000"))
+# auto: PostgreSQL에서 PostGIS 확장을 쓸 수 있으면 사용 / off: 항상 B-tree 인덱스만 사용
+OBSTACLE_POSTGIS = os.getenv("OBSTACLE_POSTGIS", "auto").lower()
+
+# 히트맵 한 번에 집계할 최대 셀 수 (넘으면 셀 목록을 만들기 전에 400)
+HEATMAP_MAX_CELLS = int(os.getenv("HEATMAP_MAX_CELLS", "256"))
+
+_postgis_enabled = False
+# 모든 장애물 행에 cell이 채워져 있는지 (backfill 전에는 셀 조회를 쓰지 않음)
+_cells_ready = False
+
+
+def _add_column(engine, table: str, column_ddl: str) -> bool:
+    """
+    ALTER TABLE ... ADD COLUMN — 여러 워커가 동시에 시작해도 안전하게.
+    PostgreSQL은 IF NOT EXISTS, SQLite는 다른 워커가 먼저 추가한 경우의 duplicate column 오류를 무시.
+    반환: 이 호출에서 컬럼을 추가했는지 (PostgreSQL은 항상 True)
+    """
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column_ddl}"))
+        return True
+    try:
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column_ddl}"))
+    except DBAPIError as e:
+        if "duplicate column" not in str(e.orig).lower():
+            raise
+        return False
+    return True
+
+
+def ensure_obstacle_spatial_index(engine) -> bool:
+    """
+    서버 시작 시 1회: 장애물 공간 인덱스 준비.
+    create_all은 이미 있는 테이블에 인덱스를 추가하지 않으므로 모델의 복합 인덱스도 여기서 생성.
+    반환: PostGIS 사용 여부
+    """
+    global _postgis_enabled, _cells_ready
+
+    # 이전 버전 테이블에 셀 키 컬럼 추가 (값은 backfill 명령으로 채움)
+    columns = {c["name"] for c in inspect(engine).get_columns("obstacles")}
+    if "cell" not in columns and _add_column(engine, "obstacles", "cell VARCHAR(12)"):
+        print("ℹ️ obstacles.cell 컬럼 추가 — 'python -m app.route.crud backfill-cells'로 기존 행을 채워주세요.")
+    if "detection_count" not in columns and _add_column(engine, "obstacles", "detection_count INTEGER NOT NULL DEFAULT 1"):
+        print("ℹ️ obstacles.detection_count 컬럼 추가 — 'python -m app.route.obstacle_clusters recluster'로 기존 중복을 합칠 수 있습니다.")
+
+    for index in Obstacle.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
+
+    with engine.connect() as conn:
+        _cells_ready = conn.execute(text("SELECT 1 FROM obstacles WHERE cell IS NULL LIMIT 1")).first() is None
+
+    if engine.dialect.name != "postgresql" or OBSTACLE_POSTGIS == "off":
+        return False
+
+    try:
+        with engine.begin() as conn:
+            available = conn.execute(
+                text("SELECT 1 FROM pg_available_extensions WHERE name = 'postgis'")
+            ).first()
+            if available is None:
+                print("ℹ️ PostGIS 확장이 없어 장애물 조회는 B-tree 인덱스를 사용합니다.")
+                return False
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS postgis"))
+            conn.execute(text(
+                "ALTER TABLE obstacles ADD COLUMN IF NOT EXISTS geog geography(Point, 4326) "
+                "GENERATED ALWAYS AS (ST_SetSRID(ST_MakePoint(lng, lat), 4326)::geography) STORED"
+            ))
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_obstacles_geog ON obstacles USING GIST (geog)"
+            ))
+    except Exception as e:
+        print(f"⚠️ PostGIS 공간 인덱스 준비 실패 (B-tree 인덱스 사용): {str(e)}")
+        return False
+
+    _postgis_enabled = True
+    print("✅ 장애물 PostGIS 공간 인덱스 사용")
+    return True
+
+
+def ensure_route_indexes(engine) -> None:
+    """서버 시작 시 1회: 기존 routes 테이블에 목록 페이지용 인덱스 생성"""
+    for index in RouteResult.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
+
+
+def ensure_route_geometry_columns(engine) -> None:
+    """
+    서버 시작 시 1회: 이전 버전 routes 테이블에 route_polyline 컬럼 추가.
+    새 행은 JSON 컬럼(route_points)을 비워 두므로 NOT NULL 제약도 해제
+    (PostgreSQL은 ALTER COLUMN, SQLite는 테이블 재생성).
+    """
+    table = inspect(engine).get_columns("routes")
+    columns = {c["name"]: c for c in table}
+    if "route_polyline" not in columns and _add_column(engine, "routes", "route_polyline TEXT"):
+        print("ℹ️ routes.route_polyline 컬럼 추가 — 'python -m app.route.crud encode-routes'로 기존 경로를 변환해주세요.")
+
+    if not columns["route_points"]["nullable"]:
+        if engine.dialect.name == "postgresql":
+            with engine.begin() as conn:
+                conn.execute(text("ALTER TABLE routes ALTER COLUMN route_points DROP NOT NULL"))
+        elif engine.dialect.name == "sqlite":
+            _rebuild_sqlite_routes_table(engine)
+        else:
+            print("⚠️ routes.route_points가 NOT NULL입니다 — 새 경로 저장 전에 제약을 해제해주세요.")
+
+
+def _rebuild_sqlite_routes_table(engine) -> None:
+    """
+    SQLite는 ALTER COLUMN이 없으므로 새 정의로 테이블을 만들고 행을 옮김 (한 트랜잭션).
+    BEGIN IMMEDIATE로 쓰기 잠금을 먼저 잡고 다시 확인 → 여러 워커가 동시에 시작해도 한 번만 재생성.
+    """
+    table = RouteResult.__table__
+    with engine.connect() as conn:
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+        info = conn.exec_driver_sql("PRAGMA table_info(routes)").all()
+        if not any(row[1] == "route_points" and row[3] for row in info):
+            conn.rollback()
+            return
+        common = ", ".join(row[1] for row in info if row[1] in table.c)
+        ddl = str(CreateTable(table).compile(dialect=conn.dialect))
+        conn.exec_driver_sql(ddl.replace("CREATE TABLE routes ", "CREATE TABLE routes_rebuild ", 1))
+        conn.exec_driver_sql(f"INSERT INTO routes_rebuild ({common}) SELECT {common} FROM routes")
+        conn.exec_driver_sql("DROP TABLE routes")
+        conn.exec_driver_sql("ALTER TABLE routes_rebuild RENAME TO routes")
+        for index in table.indexes:
+            index.create(bind=conn)
+        conn.commit()
+    print("ℹ️ routes 테이블 재생성 — route_points NOT NULL 제약 해제")
+
+
+def ensure_obstacle_change_columns(engine) -> None:
+    """서버 시작 시 1회: 이전 버전 obstacle_changes 테이블에 변경 전 위치 컬럼 추가"""
+    columns = {c["name"] for c in inspect(engine).get_columns("obstacle_changes")}
+    for name in ("prev_lat", "prev_lng"):
+        if name not in columns:
+            _add_column(engine, "obstacle_changes", f"{name} FLOAT")
+
+
+def ensure_poi_route_columns(engine) -> None:
+    """서버 시작 시 1회: 이전 버전 poi_routes 테이블에 dataset_version 컬럼 추가 (기존 행은 0 → 다음 재계산까지 무시)"""
+    columns = {c["name"] for c in inspect(engine).get_columns("poi_routes")}
+    if "dataset_version" not in columns and _add_column(engine, "poi_routes", "dataset_version INTEGER NOT NULL DEFAULT 0"):
+        print("ℹ️ poi_routes.dataset_version 컬럼 추가 — 'python -m app.route.poi_routes'로 테이블을 다시 계산해주세요.")
+
+
+def _cell_prefix_filter(cells: List[str]):
+    """셀 접두어 목록 → cell 범위 조건 OR (B-tree 인덱스 범위 스캔)"""
+    return or_(*[
+        Obstacle.cell.between(*geohash.prefix_range(prefix))
+        for prefix in cells
+    ])
+
+
+def _bbox_conditions(south: float, north: float, west: float, east: float) -> list:
+    conditions = []
+    if _postgis_enabled:
+        conditions.append(
+            text("obstacles.geog && ST_MakeEnvelope(:bbox_west, :bbox_south, :bbox_east, :bbox_north, 4326)::geography")
+            .bindparams(bbox_south=south, bbox_north=north, bbox_west=west, bbox_east=east)
+        )
+    elif _cells_ready:
+        conditions.append(_cell_prefix_filter(geohash.covering_cells(south, north, west, east)))
+    # 인덱스 조건은 bbox보다 넓으므로 좌표 범위로 정확히 거름
+    conditions += [Obstacle.lat >= south, Obstacle.lat <= north, Obstacle.lng >= west, Obstacle.lng <= east]
+    return conditions
+
+
+def _obstacles_in_bbox_stmt(south: float, north: float, west: float, east: float,
+                            types: Optional[List[str]]):
+    stmt = select(Obstacle).where(*_bbox_conditions(south, north, west, east))
+    if types is not None:
+        stmt = stmt.where(Obstacle.type.in_(types))
+    return stmt
+
+
+def get_obstacles_in_bbox(db: Session, south: float, north: float, west: float, east: float,
+                          types: Optional[List[str]] = None) -> List[Obstacle]:
+    """영역 안의 장애물 (types가 주어지면 해당 타입만)"""
+    if types is not None and not types:
+        return []
+    return list(db.execute(_obstacles_in_bbox_stmt(south, north, west, east, types)).scalars())
+
+
+async def get_obstacles_in_bbox_async(db: AsyncSession, south: float, north: float, west: float, east: float,
+                                      types: Optional[List[str]] = None) -> List[Obstacle]:
+    """get_obstacles_in_bbox의 비동기 버전 (API 요청 경로용)"""
+    if types is not None and not types:
+        return []
+    result = await db.execute(_obstacles_in_bbox_stmt(south, north, west, east, types))
+    return list(result.scalars())
+
+
+def get_obstacle_points(db: Session) -> List[Tuple[float, float, str, str]]:
+    """전체 장애물 (lat, lng, type, cell) — 경로 스냅샷 구축용 (cell이 비어 있으면 계산)"""
+    return [
+        (lat, lng, t, cell or geohash.encode(lat, lng))
+        for lat, lng, t, cell in db.query(Obstacle.lat, Obstacle.lng, Obstacle.type, Obstacle.cell).all()
+    ]
+
+
+def get_obstacle_cell_counts(db: Session, south: float, north: float, west: float, east: float,
+                             precision: int, types: Optional[List[str]] = None) -> List[dict]:
+    """
+    영역 안의 장애물 수를 precision 자리 셀 × 타입별로 집계 (히트맵).
+    셀 경계 기준이므로 bbox 가장자리 셀에는 bbox 밖 장애물도 포함될 수 있음.
+    """
+    precision = max(1, min(precision, geohash.CELL_PRECISION))
+    cell_col = func.substr(Obstacle.cell, 1, precision)
+    query = db.query(cell_col.label("cell"), Obstacle.type, func.count(Obstacle.id))
+    if types:
+        query = query.filter(Obstacle.type.in_(types))
+    cells = geohash.cells_for_bbox(south, north, west, east, precision, max_cells=HEATMAP_MAX_CELLS)
+    query = query.filter(_cell_prefix_filter(cells)).group_by(cell_col, Obstacle.type)
+
+    result = {}
+    for cell, t, count in query.all():
+        item = result.get(cell)
+        if item is None:
+            lat, lng = geohash.cell_center(cell)
+            item = result[cell] = {"cell": cell, "lat": lat, "lng": lng, "total": 0, "by_type": {}}
+        item["by_type"][t] = count
+        item["total"] += count
+    return sorted(result.values(), key=lambda x: -x["total"])
+
+
+def _prepare_rows(rows: List[Dict]) -> None:
+    for row in rows:
+        row.setdefault("confidence", None)
+        row.setdefault("detected_at", None)
+        row.setdefault("detection_count", 1)
+        row["cell"] = geohash.encode(row["lat"], row["lng"])
+
+
+def insert_obstacles_returning_ids(db: Session, rows: List[Dict]) -> List[int]:
+    """
+    장애물 대량 저장 (ORM 객체를 만들지 않음, OBSTACLE_INSERT_BATCH개씩 INSERT ... RETURNING).
+    rows: {"type", "lat", "lng", "confidence", "detected_at"[, "detection_count"]} 목록 — cell은 여기서 계산.
+    반환: 새 id (rows 순서, 변경 기록용). commit은 호출하는 쪽에서.
+    """
+    if not rows:
+        return []
+    _prepare_rows(rows)
+    table = Obstacle.__table__
+    ids = []
+    for start in range(0, len(rows), OBSTACLE_INSERT_BATCH):
+        batch = rows[start:start + OBSTACLE_INSERT_BATCH]
+        result = db.execute(insert(table).returning(table.c.id, sort_by_parameter_order=True), batch)
+        ids.extend(result.scalars().all())
+    return ids
+
+
+def backfill_obstacle_cells(db: Session, batch_size: int = 5000) -> int:
+    """cell이 비어 있는 장애물 행을 batch_size개씩 채움 (id 순, 배치마다 commit). 반환: 채운 행 수"""
+    global _cells_ready
+    total = 0
+    last_id = 0
+    while True:
+        rows = (
+            db.query(Obstacle.id, Obstacle.lat, Obstacle.lng)
+            .filter(Obstacle.cell.is_(None), Obstacle.id > last_id)
+            .order_by(Obstacle.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            break
+        db.bulk_update_mappings(Obstacle, [
+            {"id": oid, "cell": geohash.encode(lat, lng)} for oid, lat, lng in rows
+        ])
+        db.commit()
+        last_id = rows[-1][0]
+        total += len(rows)
+        print(f"✅ 셀 키 채움: {total}개 (마지막 id {last_id})")
+    _cells_ready = True
+    return total
+
+
+def encode_route_geometries(db: Session, batch_size: int = 1000) -> int:
+    """
+    JSON 좌표로 저장된 경로를 route_polyline으로 변환하고 JSON 컬럼은 비움 (id 순, 배치마다 commit).
+    반환: 변환한 행 수
+    """
+    table = RouteResult.__table__
+    total = 0
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(table.c.id, table.c.route_points)
+            .where(table.c.route_polyline.is_(None), table.c.id > last_id)
+            .order_by(table.c.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        db.bulk_update_mappings(RouteResult, [
+            {"id": rid, "route_polyline": encode_polyline(points or []), "route_points_json": None}
+            for rid, points in rows
+        ])
+        db.commit()
+        last_id = rows[-1][0]
+        total += len(rows)
+        print(f"✅ 경로 좌표 변환: {total}개 (마지막 id {last_id})")
+    return total
+
+
+def is_postgis_enabled() -> bool:
+    return _postgis_enabled
+
+
+def is_cells_ready() -> bool:
+    return _cells_ready
+
+
+if __name__ == "__main__":
+    from app.database import SessionLocal, engine
+
+    parser = argparse.ArgumentParser(description="장애물 테이블 관리")
+    sub = parser.add_subparsers(dest="command", required=True)
+    backfill = sub.add_parser("backfill-cells", help="기존 장애물 행의 geohash 셀 키 채우기")
+    backfill.add_argument("--batch", type=int, default=5000)
+    encode = sub.add_parser("encode-routes", help="JSON 좌표로 저장된 경로를 encoded polyline으로 변환")
+    encode.add_argument("--batch", type=int, default=1000)
+    args = parser.parse_args()
+
+    if args.command == "backfill-cells":
+        ensure_obstacle_spatial_index(engine)
+        session = SessionLocal()
+        try:
+            print(f"🎉 셀 키 채우기 완료: {backfill_obstacle_cells(session, args.batch)}개")
+        finally:
+            session.close()
+    elif args.command == "encode-routes":
+        ensure_route_geometry_columns(engine)
+        session = SessionLocal()
+        try:
+            print(f"🎉 경로 좌표 변환 완료: {encode_route_geometries(session, args.batch)}개")
+        finally:
+            session.close()
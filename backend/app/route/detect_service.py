@@ -4,7 +4,7 @@ import os
 import math
 from pathlib import Path
 from sqlalchemy.orm import Session
-from app.route.models import Obstacle
+from app.route import crud, obstacle_clusters
 from datetime import datetime
 from PIL import Image
 from PIL.ExifTags import TAGS, GPSTAGS
@@ -270,13 +270,30 @@ def get_gps_from_image(img_path):
     return lat, lon
 
 
+def _flush_detections(db: Session, rows) -> int:
+    """모아 둔 감지 결과를 주변 기존 장애물과 병합해 저장 + commit (실패 시 롤백 후 예외 전달)"""
+    if not rows:
+        return 0
+    try:
+        result = obstacle_clusters.merge_detections(db, rows)
+    except Exception as e:
+        print(f"❌ DB 저장 실패: {str(e)}")
+        raise
+    print(
+        f"💾 감지 {result['detections']}개 저장 "
+        f"(새 장애물 {result['inserted']}개, 기존 장애물 갱신 {result['updated']}개, 병합 삭제 {result['removed']}개)"
+    )
+    return result["detections"]
+
+
 # -------------------------------------------------------------
 # 이미지 폴더 전체 추론 후 DB 저장
 # -------------------------------------------------------------
 def detect_folder_and_save(db: Session):
     """
     폴더 안의 모든 이미지를 YOLO로 추론 후 DB에 저장.
-    commit()은 전체 이미지 처리 후 한 번만 실행해 성능 최적화.
+    감지 결과는 메모리에 모았다가 OBSTACLE_INSERT_BATCH개가 차면 저장 + commit
+    (같은 타입의 가까운 감지는 obstacle_clusters로 장애물 하나에 병합).
     """
     # 이미지 디렉토리 확인
     if not os.path.exists(IMAGES_DIR):
@@ -298,6 +315,7 @@ def detect_folder_and_save(db: Session):
     
     count_total, count_success = 0, 0
     total_saved = 0  # 전체 저장된 장애물 개수
+    pending = []     # 아직 저장하지 않은 감지 결과
 
     for filename in image_files:
         img_path = os.path.join(IMAGES_DIR, filename)
@@ -317,7 +335,7 @@ def detect_folder_and_save(db: Session):
             # 모델 로드 (지연 로딩)
             yolo_model = get_model()
             results = yolo_model(img_path)
-            saved = 0
+            detections = []  # 이 이미지의 감지 결과 (이미지 처리가 끝까지 성공해야 pending에 추가)
 
             for r in results:
                 boxes = r.boxes.xyxy
@@ -328,35 +346,41 @@ def detect_folder_and_save(db: Session):
                     label = yolo_model.names[int(labels[i])]
                     conf = confs[i].item()
 
-                    db.add(
-                        Obstacle(
-                            type=label,
-                            lat=gps[0],
-                            lng=gps[1],
-                            confidence=conf,
-                            detected_at=datetime.utcnow()
-                        )
-                    )
-                    saved += 1
-                    total_saved += 1
+                    detections.append({
+                        "type": label,
+                        "lat": gps[0],
+                        "lng": gps[1],
+                        "confidence": conf,
+                        "detected_at": datetime.utcnow(),
+                    })
 
-            print(f"✅ {filename}: {saved}개 감지 저장 예정")
+            print(f"✅ {filename}: {len(detections)}개 감지 저장 예정")
+            pending.extend(detections)
             count_success += 1
-            
+
         except Exception as e:
             print(f"❌ 이미지 처리 실패 ({filename}): {str(e)}")
             import traceback
             traceback.print_exc()
             continue
 
-    # 전체 for-loop 끝난 뒤 1회 commit 실행 (에러 발생 시 롤백)
-    try:
-        db.commit()
-    except Exception as e:
-        db.rollback()
-        print(f"❌ DB 저장 실패: {str(e)}")
-        raise
+        # DB 저장은 이미지 처리 try 밖에서: 실패하면 이미지 실패로 삼키지 않고 그대로 전달
+        # (배치마다 commit하므로 같은 pending을 다음 이미지에서 다시 저장하면 중복 행이 생김)
+        if len(pending) >= crud.OBSTACLE_INSERT_BATCH:
+            total_saved += _flush_detections(db, pending)
+            pending = []
+
+    # 남은 감지 결과 저장
+    total_saved += _flush_detections(db, pending)
 
     print(f"🎉 전체 완료: {count_success}/{count_total}개 처리됨, 총 {total_saved}개 장애물 저장됨")
 
+    # 장애물이 바뀌었으므로 새 경로 스냅샷을 만들어 교체하고 (경로 결과 캐시도 함께 비워짐)
+    # POI 간 사전 계산 경로를 비운 뒤 백그라운드에서 다시 계산
+    if total_saved > 0:
+        from app.route import poi_routes, snapshots
+        snapshots.request_rebuild(db, reload_graphs=False, wait=True)
+        poi_routes.invalidate_poi_routes(db)
+        poi_routes.refresh_poi_routes_in_background()
+
     return {"total": count_total, "processed": count_success, "saved": total_saved}
@@ -0,0 +1,142 @@
+# app/route/geohash.py
+
+"""
+geohash 셀 키 (장애물 버킷 조회 / 집계 / 캐시 키용).
+
+- 장애물마다 CELL_PRECISION(7자리, 약 153m x 153m) geohash를 저장
+- 앞 n자리 = 더 큰 셀 → 접두어 범위 조회(prefix_range)로 상위 셀 검색,
+  GROUP BY substr(cell, 1, n)으로 셀 단위 집계
+"""
+
+from typing import List, Optional, Tuple
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_DECODE = {c: i for i, c in enumerate(_BASE32)}
+
+# DB에 저장하는 자릿수 (바꾸면 backfill 필요)
+CELL_PRECISION = 7
+
+
+def encode(lat: float, lng: float, precision: int = CELL_PRECISION) -> str:
+    lat_lo, lat_hi = -90.0, 90.0
+    lng_lo, lng_hi = -180.0, 180.0
+    chars = []
+    bits = 0
+    value = 0
+    even = True  # 짝수 번째 비트는 경도
+    while len(chars) < precision:
+        if even:
+            mid = (lng_lo + lng_hi) / 2
+            if lng >= mid:
+                value = (value << 1) | 1
+                lng_lo = mid
+            else:
+                value <<= 1
+                lng_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid:
+                value = (value << 1) | 1
+                lat_lo = mid
+            else:
+                value <<= 1
+                lat_hi = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits = 0
+            value = 0
+    return "".join(chars)
+
+
+def prefix_range(prefix: str) -> Tuple[str, str]:
+    """
+    접두어 셀에 속하는 CELL_PRECISION 자리 셀 키의 범위 [lo, hi].
+    base32 문자(숫자 < 소문자)만 쓰므로 DB collation과 관계없이 순서가 같음.
+    """
+    pad = CELL_PRECISION - len(prefix)
+    return prefix + _BASE32[0] * pad, prefix + _BASE32[-1] * pad
+
+
+def cell_bbox(cell: str) -> Tuple[float, float, float, float]:
+    """셀 영역 (south, north, west, east)"""
+    lat_lo, lat_hi = -90.0, 90.0
+    lng_lo, lng_hi = -180.0, 180.0
+    even = True
+    for c in cell:
+        value = _DECODE[c]
+        for shift in range(4, -1, -1):
+            bit = (value >> shift) & 1
+            if even:
+                mid = (lng_lo + lng_hi) / 2
+                if bit:
+                    lng_lo = mid
+                else:
+                    lng_hi = mid
+            else:
+                mid = (lat_lo + lat_hi) / 2
+                if bit:
+                    lat_lo = mid
+                else:
+                    lat_hi = mid
+            even = not even
+    return lat_lo, lat_hi, lng_lo, lng_hi
+
+
+def cell_center(cell: str) -> Tuple[float, float]:
+    south, north, west, east = cell_bbox(cell)
+    return (south + north) / 2, (west + east) / 2
+
+
+def cell_size_deg(precision: int) -> Tuple[float, float]:
+    """자릿수별 셀 크기 (위도 폭, 경도 폭)"""
+    bits = precision * 5
+    lng_bits = (bits + 1) // 2
+    lat_bits = bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lng_bits)
+
+
+def count_cells_for_bbox(south: float, north: float, west: float, east: float, precision: int) -> int:
+    """cells_for_bbox가 만들 셀 수 (목록을 만들지 않고 격자 번호로 계산)"""
+    dlat, dlng = cell_size_deg(precision)
+    rows = int(north // dlat) - int(south // dlat) + 1
+    cols = int(east // dlng) - int(west // dlng) + 1
+    return max(rows, 0) * max(cols, 0)
+
+
+def cells_for_bbox(south: float, north: float, west: float, east: float, precision: int,
+                   max_cells: Optional[int] = None) -> List[str]:
+    """
+    bbox와 겹치는 precision 자리 셀 목록.
+    max_cells를 넘으면 목록을 만들기 전에 ValueError (큰 영역 × 높은 자릿수 요청 방지)
+    """
+    if max_cells is not None and count_cells_for_bbox(south, north, west, east, precision) > max_cells:
+        raise ValueError("집계 셀이 너무 많습니다. precision을 낮추거나 영역을 줄여주세요.")
+    dlat, dlng = cell_size_deg(precision)
+    # 셀 경계에 맞춘 시작점부터 셀 중심을 따라가며 인코딩
+    lat0 = (south // dlat) * dlat + dlat / 2
+    lng0 = (west // dlng) * dlng + dlng / 2
+    cells = []
+    lat = lat0
+    while lat - dlat / 2 <= north:
+        lng = lng0
+        while lng - dlng / 2 <= east:
+            cells.append(encode(lat, lng, precision))
+            lng += dlng
+        lat += dlat
+    return cells
+
+
+def covering_cells(south: float, north: float, west: float, east: float,
+                   max_cells: int = 16, max_precision: int = CELL_PRECISION) -> List[str]:
+    """
+    bbox를 덮는 셀 중 max_cells개 이하가 되는 가장 세밀한 자릿수의 셀 목록.
+    (자릿수가 작을수록 셀이 커져 bbox 밖 영역도 더 포함됨)
+    """
+    best = cells_for_bbox(south, north, west, east, 1)
+    for precision in range(2, max_precision + 1):
+        if count_cells_for_bbox(south, north, west, east, precision) > max_cells:
+            break
+        best = cells_for_bbox(south, north, west, east, precision)
+    return best
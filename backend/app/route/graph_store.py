@@ -0,0 +1,218 @@
+# backend/app/route/graph_store.py
+
+"""
+워커(프로세스)별 OSM 보행 그래프 타일 캐시.
+
+- 지도를 GRAPH_TILE_DEG(기본 0.01도 ≒ 1.1km) 격자 타일로 나눠 타일 단위로 로딩/캐시
+- 경로 요청 bbox를 덮는 타일들을 합성(compose)해 그래프 생성
+  (합성 결과는 새 그래프이므로 요청마다 edge weight를 바꿔도 캐시에 영향 없음)
+- 타일 로딩은 타일별로 한 번만 (동시에 같은 타일을 요청하면 먼저 시작한 로딩을 기다림)
+- 캐시 키는 (그래프 세대, 타일) — 스냅샷 재구축 시 새 세대를 미리 채운 뒤 교체 (snapshots)
+- 저장/해제는 워커 공용 메모리 예산(cache_governor)이 관리
+  (CACHE_PINNED_BBOX 안의 타일은 해제하지 않음 — 예: 본 캠퍼스)
+"""
+
+import math
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import networkx as nx
+import osmnx as ox
+
+from app.route import regions
+from app.route.cache_governor import governor
+
+GRAPH_TILE_DEG = float(os.getenv("GRAPH_TILE_DEG", "0.01"))
+# 해제하지 않을 영역 "south,north,west,east" (비우면 없음)
+CACHE_PINNED_BBOX = os.getenv("CACHE_PINNED_BBOX", "")
+
+TileKey = Tuple[int, int]
+
+# cache_governor 네임스페이스
+NS_GRAPH_TILE = "graph_tile"
+
+_lock = threading.Lock()
+_loading: Dict[Tuple[int, TileKey], threading.Event] = {}
+_generation = 0
+_pinned_tiles: Optional[set] = None
+# 타일별 그래프 버전 (OSM 변경 적용 시 증가)
+_tile_versions: Dict[TileKey, int] = {}
+
+
+def _configure_osmnx():
+    # osmnx 기본 설정
+    ox.settings.use_cache = False #잠시 바꿔둠.
+    ox.settings.log_console = False
+    ox.settings.overpass_rate_limit = True
+    ox.settings.overpass_endpoint = "https://overpass-api.de/api/interpreter"
+
+
+# --- 타일 좌표 ---
+
+def tile_key(lat: float, lng: float) -> TileKey:
+    return int(math.floor(lat / GRAPH_TILE_DEG)), int(math.floor(lng / GRAPH_TILE_DEG))
+
+
+def tile_bbox(key: TileKey) -> Tuple[float, float, float, float]:
+    """(south, north, west, east)"""
+    ti, tj = key
+    return (
+        ti * GRAPH_TILE_DEG,
+        (ti + 1) * GRAPH_TILE_DEG,
+        tj * GRAPH_TILE_DEG,
+        (tj + 1) * GRAPH_TILE_DEG,
+    )
+
+
+def tiles_for_bbox(south: float, north: float, west: float, east: float) -> List[TileKey]:
+    si, wj = tile_key(south, west)
+    ni, ej = tile_key(north, east)
+    return [(i, j) for i in range(si, ni + 1) for j in range(wj, ej + 1)]
+
+
+# --- 그래프 타일 ---
+
+def _download_tile(key: TileKey, network_type: str = "walk") -> nx.MultiDiGraph:
+    """
+    타일 하나를 Overpass에서 로딩.
+    truncate_by_edge=True: 타일 경계를 넘는 간선도 유지 → 인접 타일과 합성하면 끊기지 않음
+    """
+    _configure_osmnx()
+    south, north, west, east = tile_bbox(key)
+    try:
+        return ox.graph_from_bbox(
+            north=north,
+            south=south,
+            east=east,
+            west=west,
+            network_type=network_type,
+            truncate_by_edge=True,
+            retain_all=True,
+        )
+    except ValueError:
+        # 도로가 없는 타일 (바다, 공원 내부 등) → InsufficientResponseError(ValueError 하위 클래스) 등
+        # 네트워크 / Overpass 상태 코드 오류는 그대로 올려 보냄 (빈 타일로 캐시하지 않음)
+        return nx.MultiDiGraph(crs=ox.settings.default_crs)
+
+
+def is_pinned_tile(key: TileKey) -> bool:
+    global _pinned_tiles
+    if _pinned_tiles is None:
+        parts = [float(v) for v in CACHE_PINNED_BBOX.split(",") if v.strip()]
+        _pinned_tiles = set(tiles_for_bbox(*parts)) if len(parts) == 4 else set()
+    return key in _pinned_tiles
+
+
+def new_generation() -> int:
+    """새 그래프 세대 번호 (스냅샷 재구축용)"""
+    global _generation
+    with _lock:
+        _generation += 1
+        return _generation
+
+
+def is_tile_cached(key: TileKey, gen: int) -> bool:
+    return governor.contains(NS_GRAPH_TILE, (gen, key))
+
+
+def ensure_tile(key: TileKey, gen: int) -> nx.MultiDiGraph:
+    """캐시에 있으면 반환, 없으면 로딩 (같은 타일 동시 로딩은 한 번만)"""
+    cache_key = (gen, key)
+    while True:
+        with _lock:
+            G = governor.get(NS_GRAPH_TILE, cache_key)
+            if G is not None:
+                return G
+            event = _loading.get(cache_key)
+            if event is None:
+                event = threading.Event()
+                _loading[cache_key] = event
+                owner = True
+            else:
+                owner = False
+
+        if not owner:
+            # 다른 스레드가 로딩 중 → 끝나길 기다렸다가 캐시 재확인
+            event.wait()
+            continue
+
+        try:
+            from app.route import osm_changes
+
+            started = time.perf_counter()
+            G = _download_tile(key)
+            # 로컬 OSM 변경 저널을 새 타일에도 적용한 뒤 저장
+            return osm_changes.replay_on_graph(
+                G,
+                tile_bbox(key),
+                store=lambda g: governor.put(
+                    NS_GRAPH_TILE, cache_key, g,
+                    cost=(time.perf_counter() - started) * 1000.0,
+                    pinned=is_pinned_tile(key),
+                ),
+            )
+        finally:
+            with _lock:
+                _loading.pop(cache_key, None)
+            event.set()
+
+
+def cached_tile_keys() -> List[Tuple[int, TileKey]]:
+    """캐시된 (세대, 타일) 목록"""
+    return governor.keys(NS_GRAPH_TILE)
+
+
+def peek_tile(gen: int, key: TileKey) -> Optional[nx.MultiDiGraph]:
+    return governor.peek(NS_GRAPH_TILE, (gen, key))
+
+
+def replace_tile(gen: int, key: TileKey, G: nx.MultiDiGraph) -> None:
+    """캐시된 타일 그래프 교체 (진행 중인 요청은 이전 그래프 객체를 계속 사용)"""
+    governor.replace(NS_GRAPH_TILE, (gen, key), G)
+
+
+def drop_generation(gen: int) -> int:
+    """더 이상 쓰지 않는 세대의 타일 제거"""
+    return governor.remove_where(NS_GRAPH_TILE, lambda k, meta: k[0] == gen)
+
+
+def tile_version(key: TileKey) -> int:
+    with _lock:
+        return _tile_versions.get(key, 0)
+
+
+def bump_tile_version(key: TileKey) -> int:
+    with _lock:
+        _tile_versions[key] = _tile_versions.get(key, 0) + 1
+        return _tile_versions[key]
+
+
+def get_graph_for_bbox(south: float, north: float, west: float, east: float, gen: int) -> nx.MultiDiGraph:
+    """bbox를 덮는 타일들을 합성한 그래프 (가장 큰 연결 성분만)"""
+    tiles = [ensure_tile(key, gen) for key in tiles_for_bbox(south, north, west, east)]
+    tiles = [t for t in tiles if len(t)]
+    if not tiles:
+        # 지역 밖 좌표와 같은 400 응답이 되도록 OutsideCoverageError
+        raise regions.OutsideCoverageError("해당 영역에 보행 가능한 도로가 없습니다.")
+
+    G = nx.compose_all(tiles) if len(tiles) > 1 else tiles[0].copy()
+
+    # 가장 큰 연결 성분만 사용 (고립된 조각 제거)
+    return ox.utils_graph.get_largest_component(G, strongly=False)
+
+
+def stats() -> dict:
+    keys = cached_tile_keys()
+    with _lock:
+        loading = len(_loading)
+        updated = len(_tile_versions)
+    return {
+        "graph_tiles": len(keys),
+        "generations": sorted({gen for gen, _ in keys}),
+        "graph_tiles_loading": loading,
+        "graph_tiles_mb": governor.namespace_bytes(NS_GRAPH_TILE) / 1024 / 1024,
+        "updated_tiles": updated,
+        "tile_deg": GRAPH_TILE_DEG,
+    }
@@ -0,0 +1,185 @@
+# backend/app/route/instructions.py
+
+"""
+계산된 경로(path_nodes)로 보행 안내문(turn-by-turn)을 로컬에서 생성.
+
+- 외부 API 호출 없음: 그래프의 노드 좌표로 구간 방위각(bearing)을 계산하고
+  간선의 도로명(name)으로 같은 길을 한 구간으로 묶음
+- 방위각 변화량으로 직진/좌·우회전/유턴 판단
+- unavoidable(경로 반경 내 장애물)은 가장 가까운 구간에 경고로 표시
+- 응답 형식은 /api/directions의 RouteStep과 같은 필드(instruction, distance, duration, icon, warning)
+"""
+
+import math
+import os
+from typing import List, Dict, Optional
+
+from app.route.utils import format_distance, format_duration, haversine_m
+
+# 평균 보행 속도 (m/s) — 4km/h
+WALKING_SPEED_MPS = float(os.getenv("WALKING_SPEED_MPS", "1.11"))
+
+# 이 각도 미만의 방향 변화는 같은 길로 보고 구간을 나누지 않음
+TURN_THRESHOLD_DEG = 30.0
+
+OBSTACLE_NAMES = {
+    "crosswalk": "횡단보도",
+    "curb": "연석",
+    "bollard": "볼라드",
+    "stairs": "계단",
+    "ramp": "경사로",
+}
+
+
+def bearing_deg(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """두 점 사이의 초기 방위각 (북=0°, 시계 방향, 0~360)"""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dlambda = math.radians(lon2 - lon1)
+    x = math.sin(dlambda) * math.cos(phi2)
+    y = math.cos(phi1) * math.sin(phi2) - math.sin(phi1) * math.cos(phi2) * math.cos(dlambda)
+    return (math.degrees(math.atan2(x, y)) + 360.0) % 360.0
+
+
+def _turn(delta: float):
+    """방위각 변화량(-180~180, 양수=오른쪽) → (안내 문구, 아이콘)"""
+    a = abs(delta)
+    if a < TURN_THRESHOLD_DEG:
+        return "직진", "↑"
+    if a >= 150:
+        return "유턴", "↻"
+    side = "우회전" if delta > 0 else "좌회전"
+    icon = "→" if delta > 0 else "←"
+    if a < 60:
+        return f"약간 {side}", icon
+    return side, icon
+
+
+def _compass(bearing: float) -> str:
+    names = ["북", "북동", "동", "남동", "남", "남서", "서", "북서"]
+    return names[int((bearing + 22.5) // 45) % 8]
+
+
+def _edge_name(G, u, v) -> Optional[str]:
+    """u→v 간선 중 가장 짧은 간선의 도로명 (여러 개면 첫 번째)"""
+    edges = G.get_edge_data(u, v) or {}
+    best = None
+    for edata in edges.values():
+        if best is None or edata.get("length", 0) < best.get("length", 0):
+            best = edata
+    if not best:
+        return None
+    name = best.get("name")
+    if isinstance(name, list):
+        name = name[0] if name else None
+    return name or None
+
+
+def _segment_length(G, u, v) -> float:
+    edges = G.get_edge_data(u, v) or {}
+    lengths = [e["length"] for e in edges.values() if e.get("length") is not None]
+    if lengths:
+        return min(lengths)
+    return haversine_m(G.nodes[u]["y"], G.nodes[u]["x"], G.nodes[v]["y"], G.nodes[v]["x"])
+
+
+def build_instructions(G, path_nodes: List, unavoidable: List[Dict] = None) -> List[Dict]:
+    """
+    path_nodes → 안내 단계 목록.
+    각 단계: instruction / distance / duration / icon / warning (+ distance_m, duration_s, lat, lng)
+    """
+    if not path_nodes or len(path_nodes) < 2:
+        return []
+
+    # 1. 간선 단위 정보 (방위각, 도로명, 길이)
+    edges = []
+    for u, v in zip(path_nodes[:-1], path_nodes[1:]):
+        if u == v:
+            continue
+        edges.append({
+            "u": u,
+            "v": v,
+            "bearing": bearing_deg(G.nodes[u]["y"], G.nodes[u]["x"], G.nodes[v]["y"], G.nodes[v]["x"]),
+            "name": _edge_name(G, u, v),
+            "length": _segment_length(G, u, v),
+        })
+    if not edges:
+        return []
+
+    # 2. 회전/도로명 변경 지점에서 구간 분리
+    segments = []
+    for e in edges:
+        if segments:
+            prev = segments[-1]
+            delta = (e["bearing"] - prev["end_bearing"] + 540.0) % 360.0 - 180.0
+            renamed = e["name"] is not None and prev["name"] is not None and e["name"] != prev["name"]
+            if abs(delta) < TURN_THRESHOLD_DEG and not renamed:
+                prev["length"] += e["length"]
+                prev["end_bearing"] = e["bearing"]
+                prev["nodes"].append(e["v"])
+                prev["name"] = prev["name"] or e["name"]
+                continue
+            turn, icon = _turn(delta)
+        else:
+            turn, icon = None, "↑"
+
+        segments.append({
+            "start": e["u"],
+            "nodes": [e["u"], e["v"]],
+            "turn": turn,
+            "icon": icon,
+            "bearing": e["bearing"],
+            "end_bearing": e["bearing"],
+            "name": e["name"],
+            "length": e["length"],
+            "warnings": [],
+        })
+
+    # 3. 장애물 경고: 장애물에서 가장 가까운 구간에 표시 (구간 경계면 먼저 지나는 구간)
+    for obs in unavoidable or []:
+        best_idx, best_d = 0, None
+        for idx, seg in enumerate(segments):
+            for n in seg["nodes"]:
+                d = haversine_m(G.nodes[n]["y"], G.nodes[n]["x"], obs["lat"], obs["lng"])
+                if best_d is None or d < best_d:
+                    best_idx, best_d = idx, d
+        label = OBSTACLE_NAMES.get(obs["type"], obs["type"])
+        if label not in segments[best_idx]["warnings"]:
+            segments[best_idx]["warnings"].append(label)
+
+    # 4. 안내 문구 생성
+    steps: List[Dict] = []
+    for idx, seg in enumerate(segments):
+        road = f"{seg['name']}을(를) 따라 " if seg["name"] else ""
+        if idx == 0:
+            action = f"{_compass(seg['bearing'])}쪽으로 출발"
+        else:
+            action = seg["turn"]
+        distance_m = seg["length"]
+        duration_s = distance_m / WALKING_SPEED_MPS
+
+        steps.append({
+            "instruction": f"{action} 후 {road}{format_distance(int(round(distance_m)))} 이동",
+            "distance": format_distance(int(round(distance_m))),
+            "duration": format_duration(int(round(duration_s))),
+            "icon": seg["icon"],
+            "warning": f"경로 주변 {', '.join(seg['warnings'])} 주의" if seg["warnings"] else "",
+            "distance_m": distance_m,
+            "duration_s": duration_s,
+            "lat": G.nodes[seg["start"]]["y"],
+            "lng": G.nodes[seg["start"]]["x"],
+        })
+
+    last = path_nodes[-1]
+    steps.append({
+        "instruction": "목적지 도착",
+        "distance": format_distance(0),
+        "duration": format_duration(0),
+        "icon": "📍",
+        "warning": "",
+        "distance_m": 0.0,
+        "duration_s": 0.0,
+        "lat": G.nodes[last]["y"],
+        "lng": G.nodes[last]["x"],
+    })
+    return steps
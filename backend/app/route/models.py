@@ -1,23 +1,51 @@
 # app/route/models.py
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, JSON, Text, UniqueConstraint, Boolean, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
+from app.route import geohash
+from app.route.utils import decode_polyline, encode_polyline
+
+
+def _obstacle_cell(context):
+    """INSERT 시 lat/lng로 geohash 셀 키 계산 (ORM / bulk insert 모두 적용)"""
+    params = context.get_current_parameters()
+    return geohash.encode(params["lat"], params["lng"])
+
 
 # ✅ 장애물 데이터 테이블 (YOLO 결과 반영)
 class Obstacle(Base):
     __tablename__ = "obstacles"
+    __table_args__ = (
+        # bbox 범위 조회용 복합 인덱스 (PostGIS가 있으면 crud.ensure_obstacle_spatial_index가 GiST 인덱스 추가)
+        Index("ix_obstacles_type_lat_lng", "type", "lat", "lng"),  # 타입 선택 + 영역
+        Index("ix_obstacles_lat_lng", "lat", "lng"),               # 영역만 (지도 표시)
+        Index("ix_obstacles_type_cell", "type", "cell"),           # 셀 단위 조회 / 집계
+        Index("ix_obstacles_cell", "cell"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     type = Column(String(50))           # 예: "curb", "crosswalk", "ramp"
     lat = Column(Float, nullable=False)
     lng = Column(Float, nullable=False)
-    confidence = Column(Float, nullable=True)
+    confidence = Column(Float, nullable=True)   # 병합된 감지 중 최대 신뢰도
     detected_at = Column(DateTime, default=datetime.utcnow)
+    # 이 장애물로 병합된 감지 수 (obstacle_clusters: 같은 타입, 가까운 감지를 하나로 합침)
+    detection_count = Column(Integer, nullable=False, default=1, server_default="1")
+    # geohash 셀 키 (geohash.CELL_PRECISION자리, INSERT 시 자동 계산 / 기존 행은 crud backfill)
+    cell = Column(String(12), nullable=True, default=_obstacle_cell)
 
 class RouteResult(Base):
     __tablename__ = "routes"
+    __table_args__ = (
+        # 내 경로 목록 keyset 페이지 (user_id, created_at DESC, id DESC)
+        # PostgreSQL은 요약 컬럼을 INCLUDE → 목록 페이지는 인덱스만 읽음 (경로 좌표 제외)
+        Index(
+            "ix_routes_user_created_id", "user_id", "created_at", "id",
+            postgresql_include=["start_lat", "start_lng", "end_lat", "end_lng", "distance_m", "avoided"],
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -30,8 +58,10 @@ class RouteResult(Base):
     end_lat = Column(Float, nullable=False)
     end_lng = Column(Float, nullable=False)
 
-    # 경로 자체 (좌표 리스트 형태)
-    route_points = Column(JSON, nullable=False)
+    # 경로 좌표: encoded polyline (1e-6 정밀도) — 읽기/쓰기는 route_points 속성으로
+    route_polyline = Column(Text, nullable=True)
+    # 이전 형식 (좌표 JSON 배열). 새 행은 비워 두고, 기존 행은 crud encode-routes로 route_polyline으로 옮김
+    route_points_json = Column("route_points", JSON(none_as_null=True), nullable=True)
 
     # 총 거리
     distance_m = Column(Float)
@@ -43,4 +73,99 @@ class RouteResult(Base):
 
     # 유저와 연결
     user = relationship("User", back_populates="routes")
-    
\ No newline at end of file
+
+    @property
+    def route_points(self):
+        """경로 좌표 [[lat, lng], ...] (polyline 디코딩, 아직 옮기지 않은 행은 JSON 그대로)"""
+        return route_points_from(self.route_polyline, self.route_points_json)
+
+    @route_points.setter
+    def route_points(self, points):
+        self.route_polyline = encode_polyline(points)
+        self.route_points_json = None
+
+
+def route_points_from(polyline, points_json):
+    """저장된 컬럼 값 → 경로 좌표 (컬럼만 select한 결과에도 사용)"""
+    if polyline is not None:
+        return [[lat, lng] for lat, lng in decode_polyline(polyline)]
+    return points_json or []
+    
+
+# ✅ 장애물 데이터 버전 (장애물이 바뀔 때마다 1씩 증가, 단일 행 id=1)
+class ObstacleDatasetState(Base):
+    __tablename__ = "obstacle_dataset_state"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+# ✅ 장애물 변경 기록 (버전별 추가/수정/삭제된 장애물 id — 클라이언트 증분 동기화용)
+class ObstacleChange(Base):
+    __tablename__ = "obstacle_changes"
+    __table_args__ = (
+        Index("ix_obstacle_changes_version", "version"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False)       # 이 변경으로 만들어진 데이터 버전
+    obstacle_id = Column(Integer, nullable=False)
+    op = Column(String(10), nullable=False)         # insert / update / delete
+    # 변경 후 값 (delete는 삭제 직전 값) — 영역 필터용
+    type = Column(String(50))
+    lat = Column(Float, nullable=False)
+    lng = Column(Float, nullable=False)
+    detection_count = Column(Integer, nullable=True)
+    # update의 변경 전 위치 — 병합으로 영역 밖으로 옮겨진 장애물도 원래 영역을 보던 클라이언트에 알림
+    prev_lat = Column(Float, nullable=True)
+    prev_lng = Column(Float, nullable=True)
+    changed_at = Column(DateTime, default=datetime.utcnow)
+
+
+# ✅ 캠퍼스 주요 지점(POI) 간 사전 계산 경로 (표준 회피 프로필별)
+class PoiRoute(Base):
+    __tablename__ = "poi_routes"
+    __table_args__ = (
+        UniqueConstraint("profile", "src_poi", "dst_poi", name="uq_poi_routes_profile_src_dst"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    profile = Column(String(50), nullable=False)   # 표준 회피 프로필 이름
+    src_poi = Column(String(50), nullable=False)   # 출발 POI id
+    dst_poi = Column(String(50), nullable=False)   # 도착 POI id
+
+    # 경로 좌표: encoded polyline (1e-6 정밀도)
+    route_polyline = Column(Text, nullable=False)
+    distance_m = Column(Float)
+    risk_factors = Column(JSON)     # 회피 실패 타입 목록
+    avoided_final = Column(JSON)    # 최종 회피 타입 목록
+    obstacle_stats = Column(JSON)   # 타입별 total/success/failed
+    instructions = Column(JSON)     # 보행 안내문 (turn-by-turn)
+    # 계산에 쓴 장애물 데이터 버전 (obstacle_changes) — 현재 버전보다 오래된 행은 조회에서 무시
+    dataset_version = Column(Integer, nullable=False, default=0, server_default="0")
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+# ✅ 경로 탐색 스냅샷 목표 버전 (관리자가 재구축을 요청하면 증가, 단일 행 id=1)
+class RoutingSnapshotState(Base):
+    __tablename__ = "routing_snapshot_state"
+
+    id = Column(Integer, primary_key=True)
+    target_version = Column(Integer, nullable=False, default=0)
+    reload_graphs = Column(Boolean, nullable=False, default=False)  # 그래프도 다시 로딩할지 (False면 장애물만)
+    requested_at = Column(DateTime, default=datetime.utcnow)
+
+
+# ✅ 워커별 현재 스냅샷 버전 (배포 중 모든 워커가 새 버전으로 바뀌었는지 확인용)
+class RoutingWorker(Base):
+    __tablename__ = "routing_workers"
+
+    worker_id = Column(String(100), primary_key=True)  # hostname:pid
+    snapshot_version = Column(Integer, nullable=False, default=0)
+    graph_generation = Column(Integer, nullable=False, default=0)
+    status = Column(String(20), nullable=False, default="ready")  # ready / building / failed
+    last_error = Column(Text, nullable=True)
+    built_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, default=datetime.utcnow)
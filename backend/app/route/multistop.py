@@ -0,0 +1,308 @@
+# backend/app/route/multistop.py
+
+"""
+다중 경유지 경로 계산.
+
+1. 모든 경유지를 포함하는 그래프를 한 번만 로딩하고 edge weight도 한 번만 계산
+2. 경유지마다 one-to-many Dijkstra 1회 → 장애물 반영 비용 행렬 (쌍마다 탐색하지 않음)
+3. 방문 순서 결정: 경유지가 적으면 Held-Karp(정확), 많으면 최근접 이웃 + 2-opt(휴리스틱)
+4. 구간(leg)별 경로를 이어 붙이고 구간별/전체 obstacle_stats 계산
+"""
+
+import math
+import os
+from heapq import heappush, heappop
+from itertools import count
+from typing import List, Dict, Tuple, Optional
+
+import osmnx as ox
+from sqlalchemy.orm import Session
+
+from app.route.pathfinding import (
+    bbox_for_points,
+    load_graph_for_bbox,
+    fetch_obstacles,
+    apply_edge_weights,
+    path_length_m,
+    path_coords,
+    obstacle_stats_for_path,
+    edge_cost,
+    haversine_m,
+)
+from app.route import snapshots
+from app.route.instructions import build_instructions
+
+# 정확한 순서 계산(Held-Karp, O(n^2 * 2^n))을 적용할 최대 경유지 수
+MULTI_STOP_EXACT_MAX = int(os.getenv("MULTI_STOP_EXACT_MAX", "10"))
+# 한 요청에서 허용하는 최대 경유지 수
+MULTI_STOP_MAX_STOPS = int(os.getenv("MULTI_STOP_MAX_STOPS", "25"))
+
+
+# --- 비용 행렬 ---
+
+def one_to_many(G, source, targets, weight: str = "weight"):
+    """
+    source에서 targets까지 Dijkstra (모든 target이 확정되면 조기 종료).
+    반환: (dist, pred) — pred로 경로 복원
+    """
+    remaining = set(targets)
+    remaining.discard(source)
+    dist = {source: 0.0}
+    pred = {source: None}
+    done = set()
+    c = count()
+    queue = [(0.0, next(c), source)]
+
+    while queue and remaining:
+        d, _, u = heappop(queue)
+        if u in done:
+            continue
+        done.add(u)
+        remaining.discard(u)
+
+        for v in G._adj[u]:
+            nd = d + edge_cost(G, u, v, weight)
+            if v not in dist or nd < dist[v]:
+                dist[v] = nd
+                pred[v] = u
+                heappush(queue, (nd, next(c), v))
+
+    return dist, pred
+
+
+def rebuild_path(pred, target) -> List:
+    path = []
+    node = target
+    while node is not None:
+        path.append(node)
+        node = pred[node]
+    path.reverse()
+    return path
+
+
+def build_cost_matrix(G, nodes: List, weight: str = "weight"):
+    """
+    경유지 노드 간 비용 행렬 (도달 불가면 inf).
+    경유지마다 one-to-many 탐색 1회 → 총 n회 탐색.
+    반환: (cost, preds) — preds[i]는 i에서 출발한 탐색의 predecessor
+    """
+    n = len(nodes)
+    cost = [[math.inf] * n for _ in range(n)]
+    preds = []
+    for i, src in enumerate(nodes):
+        dist, pred = one_to_many(G, src, nodes, weight)
+        preds.append(pred)
+        for j, dst in enumerate(nodes):
+            if dst in dist:
+                cost[i][j] = dist[dst]
+    return cost, preds
+
+
+# --- 방문 순서 ---
+
+def _order_cost(cost, order: List[int]) -> float:
+    return sum(cost[a][b] for a, b in zip(order[:-1], order[1:]))
+
+
+def _finite_costs(cost):
+    """
+    도달 불가(inf) 구간을 어떤 정상 경로 합보다 큰 유한 비용으로 바꾼 행렬.
+    inf끼리는 비교가 안 돼 순서 탐색이 경유지를 빠뜨리므로, 대신 도달 불가 구간 수가 가장 적은 순서를 고르게 함
+    (도달 불가 구간은 plan_multi_stop_route에서 직선으로 연결)
+    """
+    finite = [c for row in cost for c in row if math.isfinite(c)]
+    unreachable = (max(finite, default=0.0) + 1.0) * len(cost) * 10.0
+    return [[c if math.isfinite(c) else unreachable for c in row] for row in cost]
+
+
+def _held_karp(cost, start: int, middle: List[int], end: Optional[int]) -> List[int]:
+    """start 고정, (선택) end 고정, middle 전체 방문 최소 비용 순서 (정확해)"""
+    if not middle:
+        return [start] + ([end] if end is not None else [])
+
+    m = len(middle)
+    # dp[(mask, j)] = (비용, 이전 j) : start → middle 부분집합(mask) 방문 후 middle[j]에서 끝남
+    dp = {}
+    for j in range(m):
+        dp[(1 << j, j)] = (cost[start][middle[j]], None)
+
+    for mask in range(1, 1 << m):
+        for j in range(m):
+            if not (mask & (1 << j)) or (mask, j) not in dp:
+                continue
+            base, _ = dp[(mask, j)]
+            for k in range(m):
+                if mask & (1 << k):
+                    continue
+                nmask = mask | (1 << k)
+                cand = base + cost[middle[j]][middle[k]]
+                if (nmask, k) not in dp or cand < dp[(nmask, k)][0]:
+                    dp[(nmask, k)] = (cand, j)
+
+    full = (1 << m) - 1
+    best_j, best_cost = None, math.inf
+    for j in range(m):
+        c = dp[(full, j)][0] + (cost[middle[j]][end] if end is not None else 0.0)
+        if c < best_cost:
+            best_j, best_cost = j, c
+    if best_j is None:
+        # 비교 가능한 비용이 없음 (NaN 등) → 입력 순서 그대로 (경유지를 빠뜨리지 않음)
+        return [start] + list(middle) + ([end] if end is not None else [])
+
+    # 경로 복원
+    seq = []
+    mask, j = full, best_j
+    while j is not None:
+        seq.append(middle[j])
+        _, prev = dp[(mask, j)]
+        mask ^= (1 << j)
+        j = prev
+    seq.reverse()
+    return [start] + seq + ([end] if end is not None else [])
+
+
+def _nearest_neighbor_2opt(cost, start: int, middle: List[int], end: Optional[int]) -> List[int]:
+    """최근접 이웃으로 초기해 → 2-opt로 개선 (start/end 고정)"""
+    order = [start]
+    left = set(middle)
+    while left:
+        cur = order[-1]
+        nxt = min(left, key=lambda k: cost[cur][k])
+        order.append(nxt)
+        left.remove(nxt)
+    if end is not None:
+        order.append(end)
+
+    # 양 끝(start, end)은 고정, 그 사이 구간만 뒤집기
+    last = len(order) - 1 if end is not None else len(order)
+    improved = True
+    while improved:
+        improved = False
+        best = _order_cost(cost, order)
+        for i in range(1, last - 1):
+            for k in range(i + 1, last):
+                cand = order[:i] + order[i:k + 1][::-1] + order[k + 1:]
+                cand_cost = _order_cost(cost, cand)
+                if cand_cost < best - 1e-9:
+                    order, best = cand, cand_cost
+                    improved = True
+    return order
+
+
+def solve_visit_order(cost, keep_last: bool = False, round_trip: bool = False) -> List[int]:
+    """
+    방문 순서 계산 (0번 = 출발지 고정).
+    - keep_last: 마지막 경유지를 도착지로 고정
+    - round_trip: 출발지로 돌아오기
+    """
+    n = len(cost)
+    if n <= 2:
+        order = list(range(n))
+        return order + [0] if round_trip and n > 1 else order
+
+    end = 0 if round_trip else (n - 1 if keep_last else None)
+    middle = [i for i in range(1, n) if i != end]
+    cost = _finite_costs(cost)
+
+    if len(middle) <= MULTI_STOP_EXACT_MAX:
+        return _held_karp(cost, 0, middle, end)
+    return _nearest_neighbor_2opt(cost, 0, middle, end)
+
+
+# --- 메인: 다중 경유지 경로 ---
+
+def plan_multi_stop_route(
+    stops: List[Tuple[float, float]],
+    db: Session,
+    avoid_types: List[str],
+    radius_m: float,
+    penalties: Dict[str, float],
+    optimize_order: bool = True,
+    keep_last: bool = False,
+    round_trip: bool = False,
+):
+    """
+    경유지 목록(stops[0] = 출발지)의 방문 순서를 최적화하고 구간 경로를 이어 붙인다.
+    - order: 방문 순서 (stops 인덱스)
+    - legs: 구간별 route / distance_m / risk_factors / obstacle_stats / unavoidable / instructions
+    - obstacle_stats: 이어 붙인 전체 경로 기준 통계 (구간 간 중복 장애물은 한 번만 집계)
+    """
+    # 1. 그래프 + 장애물 + weight: 모든 경유지를 포함하는 영역에 대해 한 번만 (같은 스냅샷)
+    bbox = bbox_for_points(stops)
+    with snapshots.use():
+        G = load_graph_for_bbox(*bbox, network_type="walk")
+        obs_list = fetch_obstacles(db, avoid_types, bbox)
+    apply_edge_weights(G, obs_list, avoid_types, radius_m, penalties)
+
+    nodes = list(ox.nearest_nodes(
+        G,
+        X=[lng for _, lng in stops],
+        Y=[lat for lat, _ in stops],
+    ))
+
+    # 2. 비용 행렬 (one-to-many n회)
+    cost, preds = build_cost_matrix(G, nodes)
+
+    # 3. 방문 순서
+    if optimize_order:
+        order = solve_visit_order(cost, keep_last=keep_last, round_trip=round_trip)
+    else:
+        order = list(range(len(stops))) + ([0] if round_trip else [])
+
+    # 4. 구간 경로 연결
+    legs = []
+    full_path: List = []
+    unreachable = False
+    for a, b in zip(order[:-1], order[1:]):
+        if math.isinf(cost[a][b]):
+            # 도달 불가 구간: 직선으로 대체하고 모든 선택 타입을 실패로 간주 (단일 경로와 동일한 fallback)
+            unreachable = True
+            legs.append({
+                "from_index": a,
+                "to_index": b,
+                "route": [stops[a], stops[b]],
+                "distance_m": haversine_m(*stops[a], *stops[b]),
+                "risk_factors": list(avoid_types),
+                "obstacle_stats": {},
+                "unavoidable": [],
+                "instructions": [],
+            })
+            continue
+
+        leg_nodes = rebuild_path(preds[a], nodes[b])
+        stats, risk, unavoidable = obstacle_stats_for_path(
+            G, leg_nodes, obs_list, avoid_types, radius_m
+        )
+        legs.append({
+            "from_index": a,
+            "to_index": b,
+            "route": path_coords(G, leg_nodes),
+            "distance_m": path_length_m(G, leg_nodes),
+            "risk_factors": risk,
+            "obstacle_stats": stats,
+            "unavoidable": unavoidable,
+            "instructions": build_instructions(G, leg_nodes, unavoidable),
+        })
+        # 앞 구간 끝과 이어질 때만 첫 노드를 생략 (도달 불가 구간 뒤에는 끊긴 채로 붙음 — 통계는 노드 단위라 무관)
+        full_path.extend(leg_nodes[1:] if full_path and full_path[-1] == leg_nodes[0] else leg_nodes)
+
+    # 5. 전체 통계
+    total_stats, total_risk, total_unavoidable = obstacle_stats_for_path(
+        G, full_path, obs_list, avoid_types, radius_m
+    )
+    if unreachable:
+        total_risk = list(avoid_types)
+
+    route: List[Tuple[float, float]] = []
+    for leg in legs:
+        route.extend(leg["route"][1:] if route and tuple(route[-1]) == tuple(leg["route"][0]) else leg["route"])
+
+    return {
+        "order": order,
+        "route": route,
+        "distance_m": sum(leg["distance_m"] for leg in legs),
+        "risk_factors": total_risk,
+        "obstacle_stats": total_stats,
+        "unavoidable": total_unavoidable,
+        "legs": legs,
+    }
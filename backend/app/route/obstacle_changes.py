@@ -0,0 +1,210 @@
+# backend/app/route/obstacle_changes.py
+
+"""
+장애물 데이터 버전 + 변경 기록 (클라이언트 증분 동기화).
+
+- 장애물을 쓰는 트랜잭션마다 obstacle_dataset_state.version을 1 올리고
+  추가/수정/삭제된 장애물 id를 obstacle_changes에 그 버전으로 기록 (같은 트랜잭션 → 함께 commit/rollback)
+- GET /route/obstacles/changes?since=v: v 이후 변경만 (장애물별 마지막 상태로 합침)
+  bbox를 주면 변경 후 위치 또는 (update의) 변경 전 위치가 영역 안인 변경만,
+  영역 밖으로 옮겨진 장애물은 그 영역 기준으로 delete로 알림
+  변경 기록은 최근 OBSTACLE_CHANGELOG_KEEP개 버전만 보관 → 더 오래된 since는 reset=True (전체 다시 받기)
+- GET /route/obstacles/stream: SSE로 변경을 밀어줌
+  워커마다 스레드 하나가 OBSTACLE_STREAM_POLL_S 간격으로 버전만 확인하고, 바뀌었을 때만 연결별로 변경 조회
+- 경로 스냅샷도 구축 시점의 데이터 버전을 가짐 (타일 헤더 등)
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, delete, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.database import SessionLocal
+from app.route.models import ObstacleChange, ObstacleDatasetState
+
+# 보관하는 변경 기록 버전 수
+OBSTACLE_CHANGELOG_KEEP = int(os.getenv("OBSTACLE_CHANGELOG_KEEP", "1000"))
+# 한 응답의 최대 변경 수 (넘으면 reset → 전체 다시 받기가 더 쌈)
+OBSTACLE_CHANGES_MAX = int(os.getenv("OBSTACLE_CHANGES_MAX", "5000"))
+OBSTACLE_STREAM_POLL_S = float(os.getenv("OBSTACLE_STREAM_POLL_S", "2"))
+OBSTACLE_STREAM_HEARTBEAT_S = float(os.getenv("OBSTACLE_STREAM_HEARTBEAT_S", "15"))
+
+_lock = threading.Lock()
+_poller_started = False
+_latest_version: Optional[int] = None
+
+
+# --- 기록 ---
+
+def record_changes(db: Session, changes: List[Dict]) -> Optional[int]:
+    """
+    변경 목록을 새 데이터 버전으로 기록 (commit은 호출하는 쪽에서).
+    changes: {"op", "obstacle_id", "type", "lat", "lng", "detection_count", "prev_lat", "prev_lng"} 목록
+             (prev_*는 update의 변경 전 위치, 없으면 생략 가능)
+    반환: 새 버전 (변경이 없으면 None)
+    """
+    if not changes:
+        return None
+    state = db.get(ObstacleDatasetState, 1, with_for_update=True)
+    if state is None:
+        state = ObstacleDatasetState(id=1, version=0)
+        db.add(state)
+    state.version = (state.version or 0) + 1
+    state.updated_at = datetime.utcnow()
+    version = state.version
+
+    now = datetime.utcnow()
+    db.bulk_insert_mappings(ObstacleChange, [{**c, "version": version, "changed_at": now} for c in changes])
+    # 오래된 기록 정리
+    db.execute(delete(ObstacleChange).where(ObstacleChange.version <= version - OBSTACLE_CHANGELOG_KEEP))
+    return version
+
+
+# --- 조회 ---
+
+def get_version(db: Session) -> int:
+    state = db.get(ObstacleDatasetState, 1)
+    return state.version if state is not None else 0
+
+
+async def get_version_async(db: AsyncSession) -> int:
+    state = await db.get(ObstacleDatasetState, 1)
+    return state.version if state is not None else 0
+
+
+def get_changes(db: Session, since: int,
+                bbox: Optional[Tuple[float, float, float, float]] = None) -> dict:
+    """
+    since 이후의 변경 (bbox가 주어지면 그 영역만).
+    reset=True면 변경 기록으로는 따라잡을 수 없으므로 클라이언트는 영역 전체를 다시 받아야 함.
+    """
+    current = get_version(db)
+    result = {"version": current, "since": since, "reset": False, "changes": []}
+    if since == current:
+        return result
+
+    oldest = db.execute(select(func.min(ObstacleChange.version))).scalar()
+    if since > current or oldest is None or since < oldest - 1:
+        result["reset"] = True
+        return result
+
+    stmt = select(ObstacleChange).where(ObstacleChange.version > since)
+    if bbox is not None:
+        south, north, west, east = bbox
+        stmt = stmt.where(or_(
+            and_(
+                ObstacleChange.lat >= south, ObstacleChange.lat <= north,
+                ObstacleChange.lng >= west, ObstacleChange.lng <= east,
+            ),
+            and_(
+                ObstacleChange.prev_lat >= south, ObstacleChange.prev_lat <= north,
+                ObstacleChange.prev_lng >= west, ObstacleChange.prev_lng <= east,
+            ),
+        ))
+    rows = db.execute(stmt.order_by(ObstacleChange.id).limit(OBSTACLE_CHANGES_MAX + 1)).scalars().all()
+    if len(rows) > OBSTACLE_CHANGES_MAX:
+        result["reset"] = True
+        return result
+
+    # 장애물별 마지막 상태로 합침 (구간 안에서 새로 생긴 장애물은 삭제 전까지 insert로 표시)
+    merged = {}
+    for row in rows:
+        prev = merged.get(row.obstacle_id)
+        op = row.op
+        if prev is not None and prev["op"] == "insert" and op == "update":
+            op = "insert"
+        merged[row.obstacle_id] = {
+            "id": row.obstacle_id,
+            "op": op,
+            "type": row.type,
+            "lat": row.lat,
+            "lng": row.lng,
+            "detection_count": row.detection_count,
+            "version": row.version,
+        }
+    if bbox is not None:
+        # 마지막 위치가 영역 밖이면 (병합으로 옮겨짐) 이 영역 기준으로는 삭제
+        for change in merged.values():
+            if change["op"] != "delete" and not (south <= change["lat"] <= north and west <= change["lng"] <= east):
+                change["op"] = "delete"
+    result["changes"] = list(merged.values())
+    return result
+
+
+def changes_since(since: int, bbox: Optional[Tuple[float, float, float, float]] = None) -> dict:
+    db = SessionLocal()
+    try:
+        return get_changes(db, since, bbox)
+    finally:
+        db.close()
+
+
+# --- 변경 알림 (SSE) ---
+
+def _read_version() -> Optional[int]:
+    db = SessionLocal()
+    try:
+        return get_version(db)
+    except Exception as e:
+        print(f"⚠️ 장애물 데이터 버전 조회 실패: {str(e)}")
+        return None
+    finally:
+        db.close()
+
+
+def _poll_loop() -> None:
+    global _latest_version
+    while True:
+        version = _read_version()
+        if version is not None:
+            _latest_version = version
+        time.sleep(OBSTACLE_STREAM_POLL_S)
+
+
+def _start_poller() -> None:
+    global _poller_started
+    with _lock:
+        if _poller_started:
+            return
+        _poller_started = True
+    threading.Thread(target=_poll_loop, name="obstacle-version-poller", daemon=True).start()
+
+
+def _event(name: str, payload: dict) -> str:
+    return f"event: {name}\ndata: {json.dumps(payload)}\n\n"
+
+
+async def event_stream(request, since: Optional[int],
+                       bbox: Optional[Tuple[float, float, float, float]] = None):
+    """
+    SSE 본문. 연결 직후 현재 버전(version 이벤트), since가 있으면 그 이후 변경부터 보내고
+    이후 버전이 오를 때마다 changes 이벤트 (reset=True면 클라이언트가 전체 다시 받기)
+    """
+    _start_poller()
+    if since is None:
+        version = await run_in_threadpool(_read_version) or 0
+        yield _event("version", {"version": version})
+    else:
+        version = since
+
+    last_sent = time.monotonic()
+    while not await request.is_disconnected():
+        latest = _latest_version
+        if latest is not None and latest != version:
+            payload = await run_in_threadpool(changes_since, version, bbox)
+            if payload["changes"] or payload["reset"]:
+                yield _event("changes", payload)
+                last_sent = time.monotonic()
+            version = payload["version"]
+        elif time.monotonic() - last_sent >= OBSTACLE_STREAM_HEARTBEAT_S:
+            yield ": ping\n\n"
+            last_sent = time.monotonic()
+        await asyncio.sleep(OBSTACLE_STREAM_POLL_S)
@@ -0,0 +1,264 @@
+# backend/app/route/obstacle_clusters.py
+
+"""
+감지된 장애물 공간 병합 (중복 제거).
+
+- 사진 한 장의 박스 여러 개, 같은 지점을 여러 번 찍은 사진 → 같은 좌표에 같은 타입 행이 여러 개 쌓임
+- 같은 타입끼리 OBSTACLE_MERGE_RADIUS_M 이내 감지를 묶어 장애물 하나로 저장
+  1) DBSCAN(haversine, min_samples=1)으로 이어지는 감지끼리 후보 묶음
+  2) 묶음 안을 complete linkage(모든 쌍 거리 ≤ 반경)로 다시 나눔
+     → 5m 간격 볼라드 열 / 연석 선처럼 길게 이어진 감지가 중심점 하나로 뭉개지지 않음
+  위치 = detection_count 가중 평균, detection_count = 합, confidence = 최대, detected_at = 최근
+- 증분: 새 배치 주변(반경만큼 넓힌 bbox)의 기존 장애물과 함께 클러스터링
+  → 기존 장애물에 합쳐지면 그 행을 갱신, 기존 장애물 여러 개가 이어지면 가장 오래된 행(id 최소)에 합치고 나머지 삭제
+- 추가/수정/삭제한 장애물은 obstacle_changes에 새 데이터 버전으로 기록 (같은 트랜잭션)
+- 기존 데이터 전체 재병합: python -m app.route.obstacle_clusters recluster (끝나면 POI 경로 테이블도 다시 계산)
+"""
+
+import argparse
+import math
+import os
+from collections import defaultdict
+from typing import Dict, List
+
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+
+from app.route import crud, geohash, obstacle_changes
+from app.route.models import Obstacle
+
+# 같은 타입 감지를 하나로 합치는 거리 (미터) — 합쳐진 감지끼리는 모두 이 거리 이내
+OBSTACLE_MERGE_RADIUS_M = float(os.getenv("OBSTACLE_MERGE_RADIUS_M", "5"))
+# complete linkage 한 번에 다루는 최대 감지 수 (쌍 거리 행렬이 n^2) — 넘는 묶음은 위도순으로 잘라서 처리
+OBSTACLE_MERGE_LINKAGE_MAX = int(os.getenv("OBSTACLE_MERGE_LINKAGE_MAX", "2000"))
+
+EARTH_RADIUS_M = 6371000.0
+_M_PER_DEG_LAT = 111320.0
+
+
+def _cluster_labels(points: List[tuple]) -> List[int]:
+    """
+    (lat, lng) 목록 → 클러스터 번호.
+    같은 번호의 점끼리는 모두 반경 이내 (클러스터 지름 ≤ 반경 → 중심점도 모든 감지에서 반경 이내)
+    """
+    if len(points) <= 1:
+        return [0] * len(points)
+    # scikit-learn은 병합할 때만 로드 (서버 시작 시간에 영향 없음)
+    import numpy as np
+    from sklearn.cluster import DBSCAN
+
+    coords = np.radians(np.asarray(points, dtype=float))
+    dbscan = DBSCAN(
+        eps=OBSTACLE_MERGE_RADIUS_M / EARTH_RADIUS_M,
+        min_samples=1,
+        metric="haversine",
+        algorithm="ball_tree",
+    )
+    components = defaultdict(list)
+    for idx, label in enumerate(dbscan.fit(coords).labels_.tolist()):
+        components[label].append(idx)
+
+    # DBSCAN은 반경 안에서 이어지기만 하면 한 묶음 → 묶음마다 지름을 제한해 다시 나눔
+    labels = [0] * len(points)
+    next_label = 0
+    for members in components.values():
+        if len(members) <= 1:
+            sub_labels = [0] * len(members)
+        else:
+            members.sort(key=lambda i: points[i][0])
+            sub_labels = []
+            for start in range(0, len(members), OBSTACLE_MERGE_LINKAGE_MAX):
+                chunk = members[start:start + OBSTACLE_MERGE_LINKAGE_MAX]
+                offset = max(sub_labels, default=-1) + 1
+                sub_labels.extend(offset + label for label in _complete_linkage(coords[chunk]))
+        for idx, sub in zip(members, sub_labels):
+            labels[idx] = next_label + sub
+        next_label += max(sub_labels, default=0) + 1
+    return labels
+
+
+def _complete_linkage(coords) -> List[int]:
+    """라디안 좌표 → 모든 쌍 거리가 반경 이내인 클러스터 번호"""
+    if len(coords) <= 1:
+        return [0] * len(coords)
+    from sklearn.cluster import AgglomerativeClustering
+    from sklearn.metrics.pairwise import haversine_distances
+
+    distances = haversine_distances(coords) * EARTH_RADIUS_M
+    model = AgglomerativeClustering(
+        n_clusters=None,
+        metric="precomputed",
+        linkage="complete",
+        distance_threshold=OBSTACLE_MERGE_RADIUS_M,
+    )
+    return model.fit(distances).labels_.tolist()
+
+
+def _member(obs: Obstacle) -> dict:
+    return {
+        "id": obs.id,
+        "type": obs.type,
+        "lat": obs.lat,
+        "lng": obs.lng,
+        "confidence": obs.confidence,
+        "detected_at": obs.detected_at,
+        "detection_count": obs.detection_count or 1,
+    }
+
+
+def _merge_members(members: List[dict]) -> dict:
+    total = sum(m["detection_count"] for m in members)
+    confidences = [m["confidence"] for m in members if m["confidence"] is not None]
+    detected = [m["detected_at"] for m in members if m["detected_at"] is not None]
+    return {
+        "lat": sum(m["lat"] * m["detection_count"] for m in members) / total,
+        "lng": sum(m["lng"] * m["detection_count"] for m in members) / total,
+        "detection_count": total,
+        "confidence": max(confidences) if confidences else None,
+        "detected_at": max(detected) if detected else None,
+    }
+
+
+def _consolidate(db: Session, obstacle_type: str, existing: List[dict], new: List[dict],
+                 changes: List[dict]) -> Dict[str, int]:
+    """
+    한 타입의 기존 장애물 + 새 감지를 클러스터링해 반영 (commit은 호출하는 쪽에서).
+    반영한 변경은 changes에 추가 (obstacle_changes 기록용).
+    반환: inserted / updated / removed 개수
+    """
+    members = existing + new
+    groups = defaultdict(list)
+    for member, label in zip(members, _cluster_labels([(m["lat"], m["lng"]) for m in members])):
+        groups[label].append(member)
+
+    inserts, updates, removed = [], [], []
+    previous = {}  # 갱신하는 장애물의 변경 전 값
+    for group in groups.values():
+        olds = sorted((m for m in group if m["id"] is not None), key=lambda m: m["id"])
+        if len(group) == 1 and olds:
+            continue  # 합쳐진 것이 없는 기존 장애물
+        merged = _merge_members(group)
+        if not olds:
+            inserts.append({"type": obstacle_type, **merged})
+        else:
+            updates.append({"id": olds[0]["id"], "cell": geohash.encode(merged["lat"], merged["lng"]), **merged})
+            previous[olds[0]["id"]] = olds[0]
+            removed.extend(olds[1:])
+
+    inserted_ids = crud.insert_obstacles_returning_ids(db, inserts)
+    if updates:
+        db.bulk_update_mappings(Obstacle, updates)
+    if removed:
+        db.execute(delete(Obstacle).where(Obstacle.id.in_([m["id"] for m in removed])))
+
+    for obstacle_id, row in zip(inserted_ids, inserts):
+        changes.append(_change("insert", obstacle_id, obstacle_type, row))
+    for row in updates:
+        changes.append(_change("update", row["id"], obstacle_type, row, previous[row["id"]]))
+    for m in removed:
+        changes.append(_change("delete", m["id"], obstacle_type, m))
+    return {"inserted": len(inserts), "updated": len(updates), "removed": len(removed)}
+
+
+def _change(op: str, obstacle_id: int, obstacle_type: str, row: dict, prev: dict = None) -> dict:
+    return {
+        "op": op,
+        "obstacle_id": obstacle_id,
+        "type": obstacle_type,
+        "lat": row["lat"],
+        "lng": row["lng"],
+        "detection_count": row["detection_count"],
+        "prev_lat": prev["lat"] if prev is not None else None,
+        "prev_lng": prev["lng"] if prev is not None else None,
+    }
+
+
+def merge_detections(db: Session, rows: List[Dict], commit: bool = True) -> Dict[str, int]:
+    """
+    새 감지 결과를 주변 기존 장애물과 병합해 저장.
+    rows: {"type", "lat", "lng", "confidence", "detected_at"} 목록 (crud.insert_obstacles_returning_ids와 같은 형식)
+    반환: detections(받은 감지 수) / inserted / updated / removed / version(새 데이터 버전)
+    """
+    summary = {"detections": len(rows), "inserted": 0, "updated": 0, "removed": 0, "version": None}
+    if not rows:
+        return summary
+
+    by_type = defaultdict(list)
+    for row in rows:
+        by_type[row["type"]].append({
+            "id": None,
+            "lat": row["lat"],
+            "lng": row["lng"],
+            "confidence": row.get("confidence"),
+            "detected_at": row.get("detected_at"),
+            "detection_count": row.get("detection_count", 1),
+        })
+
+    changes = []
+    try:
+        for obstacle_type, new in by_type.items():
+            south = min(m["lat"] for m in new)
+            north = max(m["lat"] for m in new)
+            west = min(m["lng"] for m in new)
+            east = max(m["lng"] for m in new)
+            # 병합 반경만큼 넓힌 영역의 기존 장애물 (경도 1도 거리는 위도에 따라 줄어듦)
+            dlat = OBSTACLE_MERGE_RADIUS_M / _M_PER_DEG_LAT
+            dlng = dlat / max(math.cos(math.radians(max(abs(south), abs(north)))), 0.01)
+            existing = [
+                _member(obs)
+                for obs in crud.get_obstacles_in_bbox(
+                    db, south - dlat, north + dlat, west - dlng, east + dlng, [obstacle_type]
+                )
+            ]
+            result = _consolidate(db, obstacle_type, existing, new, changes)
+            for key, value in result.items():
+                summary[key] += value
+        summary["version"] = obstacle_changes.record_changes(db, changes)
+        if commit:
+            db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return summary
+
+
+def recluster_all(db: Session) -> Dict[str, int]:
+    """기존 장애물 전체를 타입별로 다시 병합 (타입마다 commit)"""
+    summary = {"inserted": 0, "updated": 0, "removed": 0}
+    types = [t for (t,) in db.query(Obstacle.type).distinct().all()]
+    for obstacle_type in types:
+        existing = [_member(obs) for obs in db.query(Obstacle).filter(Obstacle.type == obstacle_type).all()]
+        changes = []
+        try:
+            result = _consolidate(db, obstacle_type, existing, [], changes)
+            obstacle_changes.record_changes(db, changes)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        for key, value in result.items():
+            summary[key] += value
+        print(f"✅ {obstacle_type}: {len(existing)}개 → {len(existing) - result['removed']}개")
+    return summary
+
+
+if __name__ == "__main__":
+    from app.database import SessionLocal, engine
+
+    parser = argparse.ArgumentParser(description="장애물 공간 병합")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("recluster", help="기존 장애물 전체를 타입별로 다시 병합")
+    args = parser.parse_args()
+
+    if args.command == "recluster":
+        from app.route import poi_routes
+
+        crud.ensure_obstacle_spatial_index(engine)
+        session = SessionLocal()
+        try:
+            print(f"🎉 장애물 병합 완료: {recluster_all(session)}")
+            # 사전 계산 경로는 이전 장애물 기준 (새 데이터 버전보다 오래돼 조회에서 무시됨) → 다시 계산
+            if poi_routes.load_pois():
+                print(f"🎉 POI 경로 테이블 갱신 완료: {poi_routes.precompute_poi_routes(session)}")
+        finally:
+            session.close()
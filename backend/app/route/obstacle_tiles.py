@@ -0,0 +1,105 @@
+# backend/app/route/obstacle_tiles.py
+
+"""
+장애물 z/x/y 바이너리 타일 (GET /route/obstacles/tiles/{z}/{x}/{y}.bin).
+
+- 웹 메르카토르 타일 (XYZ, 좌상단 원점). 타일 안 좌표는 TILE_EXTENT(4096) 격자로 양자화
+- 같은 격자 점 + 같은 타입 장애물은 개수와 함께 하나로 합침
+- 형식 (little-endian):
+    b"WFOT", u8 형식 버전, u8 z, u16 extent, u32 장애물 데이터 버전 (obstacle_changes),
+    u8 타입 수, [u8 길이 + UTF-8 타입 이름] * 타입 수,
+    u32 n, u16 x[n], u16 y[n], u8 타입 번호[n], u16 개수[n]
+- 경로 스냅샷의 장애물 인덱스로 만들고 (DB 조회 없음) 스냅샷별(seq)로 cache_governor에 캐시
+- 약한 ETag (W/) = 헤더(데이터 버전)를 뺀 내용 해시 → 다른 곳의 장애물만 바뀐 타일은 ETag가 그대로라 304
+  (바이트는 헤더만 다르고 내용은 같으므로 강한 ETag가 아님, 워커가 달라도 같은 데이터면 같은 ETag)
+"""
+
+import hashlib
+import math
+import os
+import struct
+from typing import Optional, Tuple
+
+from app.route import snapshots
+from app.route.cache_governor import governor
+
+OBSTACLE_TILE_MIN_ZOOM = int(os.getenv("OBSTACLE_TILE_MIN_ZOOM", "14"))
+OBSTACLE_TILE_MAX_ZOOM = int(os.getenv("OBSTACLE_TILE_MAX_ZOOM", "18"))
+# 브라우저 / nginx가 타일을 재검증 없이 쓰는 시간 (초)
+OBSTACLE_TILE_MAX_AGE_S = int(os.getenv("OBSTACLE_TILE_MAX_AGE_S", "60"))
+
+TILE_EXTENT = 4096
+TILE_FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sBBHI")
+MEDIA_TYPE = "application/vnd.wayfriend.obstacle-tile"
+
+NS_OBSTACLE_TILES = "obstacle_tiles"
+
+
+def tile_bbox(z: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """타일 영역 (south, north, west, east)"""
+    n = 1 << z
+    west = x / n * 360.0 - 180.0
+    east = (x + 1) / n * 360.0 - 180.0
+    north = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+    south = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (y + 1) / n))))
+    return south, north, west, east
+
+
+def _world_xy(lat: float, lng: float, z: int) -> Tuple[float, float]:
+    """위경도 → 줌 z의 타일 좌표 (실수, 정수부 = 타일 번호)"""
+    n = 1 << z
+    lat_rad = math.radians(lat)
+    return (lng + 180.0) / 360.0 * n, (1 - math.asinh(math.tan(lat_rad)) / math.pi) / 2 * n
+
+
+def _encode(snap, z: int, x: int, y: int) -> bytes:
+    south, north, west, east = tile_bbox(z, x, y)
+    points = {}
+    for lat, lng, t in snap.obstacles_in_bbox(None, (south, north, west, east)):
+        wx, wy = _world_xy(lat, lng, z)
+        px = min(TILE_EXTENT - 1, max(0, int((wx - x) * TILE_EXTENT)))
+        py = min(TILE_EXTENT - 1, max(0, int((wy - y) * TILE_EXTENT)))
+        key = (px, py, t)
+        points[key] = points.get(key, 0) + 1
+
+    types = sorted({t for _, _, t in points})
+    type_index = {t: i for i, t in enumerate(types)}
+    keys = sorted(points)
+
+    parts = [_HEADER.pack(b"WFOT", TILE_FORMAT_VERSION, z, TILE_EXTENT, snap.dataset_version)]
+    parts.append(struct.pack("<B", len(types)))
+    for t in types:
+        name = t.encode("utf-8")[:255]
+        parts.append(struct.pack("<B", len(name)) + name)
+    n = len(keys)
+    parts.append(struct.pack("<I", n))
+    parts.append(struct.pack(f"<{n}H", *(k[0] for k in keys)))
+    parts.append(struct.pack(f"<{n}H", *(k[1] for k in keys)))
+    parts.append(struct.pack(f"<{n}B", *(type_index[k[2]] for k in keys)))
+    parts.append(struct.pack(f"<{n}H", *(min(points[k], 0xFFFF) for k in keys)))
+    return b"".join(parts)
+
+
+def get_tile(z: int, x: int, y: int) -> Tuple[bytes, str]:
+    """(타일 바이트, ETag) — 현재 스냅샷 기준으로 캐시"""
+    snap = snapshots.current()
+    key = (snap.seq, z, x, y)
+    cached = governor.get(NS_OBSTACLE_TILES, key)
+    if cached is not None:
+        return cached
+    data = _encode(snap, z, x, y)
+    etag = 'W/"' + hashlib.blake2b(data[_HEADER.size:], digest_size=16).hexdigest() + '"'
+    return governor.put(NS_OBSTACLE_TILES, key, (data, etag), size=len(data) + 128)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 약한 비교 (W/ 접두어는 무시하고 태그 값만 비교)"""
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    return "*" in candidates or etag.removeprefix("W/") in (c.removeprefix("W/") for c in candidates)
+
+
+def drop_snapshot(seq: int) -> int:
+    return governor.remove_where(NS_OBSTACLE_TILES, lambda key, meta: key[0] == seq)
@@ -0,0 +1,375 @@
+# backend/app/route/osm_changes.py
+
+"""
+OSM 변경 파일(osmChange, .osc)로 캐시된 보행 그래프를 부분 갱신.
+
+- 변경 파일은 OSM_CHANGE_DIR에 파일명 순서대로 쌓임 (= 변경 저널, 네트워크 사용 없음)
+- 새 파일이 생기면 워커마다 OSM_CHANGE_POLL_S 간격으로 확인해 적용
+- 적용 대상: 캐시된 그래프 타일(graph_store) / 로딩된 지역 그래프(regions)
+  - 노드 생성/수정: 좌표 갱신 (연결 간선 길이 재계산), 삭제: 노드와 연결 간선 제거
+  - 보행 가능 way 생성/수정: 노드 순서대로 모든 구간을 다시 만들 수 있으면 기존 간선(같은 osmid) 제거 후
+    양방향 간선 추가, 아니면 기존 간선은 그대로 두고 태그만 갱신 (아래 참고)
+  - way 삭제 / 보행 불가로 바뀐 way: 간선 제거
+- 그래프는 copy-on-write로 교체 → 진행 중인 요청은 이전 그래프로 끝까지 계산
+- 바뀐 타일만 버전 증가, 그 영역과 겹치는 경로 캐시만 무효화
+- 이후 새로 로딩되는 타일/지역 그래프에도 저널 전체를 다시 적용 (Overpass 원본에는 없는 변경)
+
+참고: osmnx 단순화 그래프는 way 중간 노드가 빠져 있고, 태그만 바뀐 way 수정에는 노드 좌표가 없음.
+좌표를 모르는 구간이 있거나 기존 간선이 여러 way가 합쳐진 간선(osmid 목록)이면 다시 만들 수 없으므로
+기존 간선을 유지하고 (합쳐지지 않은 간선의) 태그만 갱신 → 일상적인 태그 수정으로 길이 끊기지 않음.
+새 way(기존 간선 없음)는 좌표를 아는 구간만 추가
+
+적용: python -m app.route.osm_changes apply <file.osc>   (backend 디렉토리에서, 저널에 복사 후 적용)
+"""
+
+import os
+import shutil
+import sys
+import threading
+import time
+import xml.etree.ElementTree as ET
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import networkx as nx
+
+from app.route.utils import haversine_m
+
+BASE_DIR = Path(__file__).parent
+OSM_CHANGE_DIR = os.getenv("OSM_CHANGE_DIR", str(BASE_DIR / "data" / "osm_changes"))
+OSM_CHANGE_POLL_S = float(os.getenv("OSM_CHANGE_POLL_S", "5"))
+
+# osmnx network_type="walk" 필터와 같은 기준
+_EXCLUDED_HIGHWAYS = {
+    "abandoned", "bus_guideway", "construction", "cycleway", "motor", "no", "planned",
+    "platform", "proposed", "raceway", "razed", "motorway", "motorway_link",
+}
+
+_lock = threading.Lock()
+_journal: List[Tuple[str, List[dict]]] = []  # (파일명, 변경 목록) — 적용 순서
+_node_coords: Dict[int, Tuple[float, float]] = {}  # 변경 파일에서 본 노드 좌표
+_last_poll = 0.0
+# 변경 적용 / 새 그래프 저장 직렬화
+_apply_lock = threading.Lock()
+_stats = {"files_applied": 0, "ops_applied": 0, "tiles_updated": 0, "regions_updated": 0,
+          "route_cache_invalidated": 0, "replays": 0}
+
+
+# --- 파싱 ---
+
+def parse_osc(path: str) -> List[dict]:
+    """
+    osmChange XML → 변경 목록 (문서 순서).
+    각 항목: {"action", "kind"(node/way), "id", "lat", "lng", "tags", "nodes"}
+    """
+    ops = []
+    root = ET.parse(path).getroot()
+    for block in root:
+        action = block.tag  # create / modify / delete
+        if action not in ("create", "modify", "delete"):
+            continue
+        for el in block:
+            if el.tag not in ("node", "way"):
+                continue  # relation은 보행 그래프에 영향 없음
+            op = {
+                "action": action,
+                "kind": el.tag,
+                "id": int(el.get("id")),
+                "tags": {t.get("k"): t.get("v") for t in el.findall("tag")},
+            }
+            if el.tag == "node":
+                lat, lon = el.get("lat"), el.get("lon")
+                op["lat"] = float(lat) if lat is not None else None
+                op["lng"] = float(lon) if lon is not None else None
+            else:
+                op["nodes"] = [int(nd.get("ref")) for nd in el.findall("nd")]
+            ops.append(op)
+    return ops
+
+
+def is_walkable(tags: Dict[str, str]) -> bool:
+    hw = tags.get("highway")
+    if not hw or hw in _EXCLUDED_HIGHWAYS:
+        return False
+    if tags.get("area") == "yes" or tags.get("foot") == "no":
+        return False
+    if tags.get("access") == "private" or tags.get("service") == "private":
+        return False
+    return True
+
+
+# --- 그래프 적용 ---
+
+def _edges_by_osmid(G: nx.MultiDiGraph) -> Dict[int, List[Tuple]]:
+    index = defaultdict(list)
+    for u, v, k, data in G.edges(keys=True, data=True):
+        osmid = data.get("osmid")
+        for oid in (osmid if isinstance(osmid, list) else [osmid]):
+            if oid is not None:
+                index[int(oid)].append((u, v, k))
+    return index
+
+
+def _in_bbox(coord, bbox) -> bool:
+    south, north, west, east = bbox
+    return south <= coord[0] <= north and west <= coord[1] <= east
+
+
+def _coord_of(G, node) -> Optional[Tuple[float, float]]:
+    if node in G.nodes:
+        return G.nodes[node]["y"], G.nodes[node]["x"]
+    return _node_coords.get(node)
+
+
+def apply_ops_to_graph(G: nx.MultiDiGraph, ops: List[dict],
+                       bbox: Tuple[float, float, float, float]) -> Set[Tuple[float, float]]:
+    """
+    변경 목록을 G에 적용 (G를 직접 수정하므로 사본에 호출).
+    bbox: 이 그래프가 담당하는 영역 — way 구간은 한쪽 끝이라도 영역 안이면 추가
+    반환: 실제로 바뀐 위치 좌표 집합 (타일 버전 갱신용, 비어 있으면 변경 없음)
+    """
+    changed: Set[Tuple[float, float]] = set()
+    by_osmid = _edges_by_osmid(G)
+
+    for op in ops:
+        if op["kind"] == "node":
+            nid = op["id"]
+            if nid not in G.nodes:
+                continue
+            old = (G.nodes[nid]["y"], G.nodes[nid]["x"])
+            if op["action"] == "delete":
+                G.remove_node(nid)
+                changed.add(old)
+                continue
+            if op["lat"] is None:
+                continue
+            new = (op["lat"], op["lng"])
+            if new == old:
+                continue
+            G.nodes[nid]["y"], G.nodes[nid]["x"] = new
+            # 좌표가 바뀌면 연결 간선의 geometry는 더 이상 맞지 않음 → 직선 길이로 재계산
+            for u, v, data in list(G.in_edges(nid, data=True)) + list(G.out_edges(nid, data=True)):
+                data.pop("geometry", None)
+                data["length"] = haversine_m(G.nodes[u]["y"], G.nodes[u]["x"], G.nodes[v]["y"], G.nodes[v]["x"])
+            changed.update((old, new))
+            continue
+
+        # way
+        wid = op["id"]
+        existing = [(u, v, k) for u, v, k in by_osmid.get(wid, []) if G.has_edge(u, v, k)]
+
+        if op["action"] == "delete" or not is_walkable(op["tags"]):
+            for u, v, k in by_osmid.pop(wid, []):
+                if G.has_edge(u, v, k):
+                    changed.add(_coord_of(G, u))
+                    changed.add(_coord_of(G, v))
+                    G.remove_edge(u, v, k)
+            continue
+
+        refs = op["nodes"]
+        segments, complete = [], len(refs) >= 2
+        for a, b in zip(refs[:-1], refs[1:]):
+            if a == b:
+                continue
+            ca, cb = _coord_of(G, a), _coord_of(G, b)
+            if ca is None or cb is None:
+                complete = False  # 좌표를 모르는 구간 (단순화로 빠진 중간 노드, 태그만 바뀐 수정 등)
+                continue
+            if _in_bbox(ca, bbox) or _in_bbox(cb, bbox):
+                segments.append((a, b, ca, cb))
+
+        merged = any(isinstance(G.edges[u, v, k].get("osmid"), list) for u, v, k in existing)
+        if existing and (not complete or merged):
+            # 다시 만들 수 없음 → 기존 간선 유지, 이 way만의 간선은 태그 갱신
+            for u, v, k in existing:
+                data = G.edges[u, v, k]
+                if isinstance(data.get("osmid"), list):
+                    continue
+                tags = {"highway": op["tags"].get("highway"), "name": op["tags"].get("name")}
+                if any(data.get(key) != value for key, value in tags.items()):
+                    data.update(tags)
+                    changed.add(_coord_of(G, u))
+                    changed.add(_coord_of(G, v))
+            continue
+
+        for u, v, k in by_osmid.pop(wid, []):
+            if G.has_edge(u, v, k):
+                changed.add(_coord_of(G, u))
+                changed.add(_coord_of(G, v))
+                G.remove_edge(u, v, k)
+
+        for a, b, ca, cb in segments:
+            for n, c in ((a, ca), (b, cb)):
+                if n not in G.nodes:
+                    G.add_node(n, y=c[0], x=c[1], street_count=0)
+            length = haversine_m(ca[0], ca[1], cb[0], cb[1])
+            attrs = {
+                "osmid": wid,
+                "highway": op["tags"].get("highway"),
+                "name": op["tags"].get("name"),
+                "oneway": False,
+                "length": length,
+            }
+            k1 = G.add_edge(a, b, reversed=False, **attrs)
+            k2 = G.add_edge(b, a, reversed=True, **attrs)
+            by_osmid[wid].extend([(a, b, k1), (b, a, k2)])
+            changed.update((ca, cb))
+
+    changed.discard(None)
+    return changed
+
+
+def _remember_nodes(ops: List[dict]) -> None:
+    for op in ops:
+        if op["kind"] != "node":
+            continue
+        if op["action"] == "delete":
+            _node_coords.pop(op["id"], None)
+        elif op["lat"] is not None:
+            _node_coords[op["id"]] = (op["lat"], op["lng"])
+
+
+def replay_on_graph(G: nx.MultiDiGraph, bbox: Tuple[float, float, float, float], store):
+    """
+    새로 로딩한 그래프(타일/지역)에 지금까지의 저널 전체를 적용한 뒤 store(G)로 캐시에 저장.
+    저장까지 적용 잠금 안에서 수행 → 그 사이에 도착한 변경 파일을 놓치지 않음
+    """
+    sync_changes()
+    with _apply_lock:
+        if _journal:
+            for _, ops in _journal:
+                apply_ops_to_graph(G, ops, bbox)
+            with _lock:
+                _stats["replays"] += 1
+        return store(G)
+
+
+# --- 저널 동기화 ---
+
+def _pending_files() -> List[str]:
+    if not os.path.isdir(OSM_CHANGE_DIR):
+        return []
+    with _lock:
+        applied = {name for name, _ in _journal}
+    return sorted(
+        name for name in os.listdir(OSM_CHANGE_DIR)
+        if name.endswith(".osc") and name not in applied
+    )
+
+
+def _apply_file(name: str) -> dict:
+    """저널 파일 하나를 캐시된 타일/지역 그래프에 적용"""
+    from app.route import graph_store, regions, route_cache
+
+    ops = parse_osc(os.path.join(OSM_CHANGE_DIR, name))
+    with _lock:
+        _remember_nodes(ops)
+
+    changed_points: Set[Tuple[float, float]] = set()
+
+    # 1) 그래프 타일 (모든 세대)
+    tiles_updated = 0
+    for gen, key in graph_store.cached_tile_keys():
+        G = graph_store.peek_tile(gen, key)
+        if G is None:
+            continue
+        G2 = G.copy()
+        points = apply_ops_to_graph(G2, ops, graph_store.tile_bbox(key))
+        if points:
+            graph_store.replace_tile(gen, key, G2)
+            changed_points |= points
+            tiles_updated += 1
+
+    # 2) 지역 그래프 (모든 세대)
+    regions_updated = 0
+    by_id = {r["id"]: r for r in regions.load_regions()}
+    for gen, rid in regions.loaded_region_keys():
+        region = by_id.get(rid)
+        G = regions.peek_region_graph(gen, rid)
+        if region is None or G is None:
+            continue
+        G2 = G.copy()
+        points = apply_ops_to_graph(G2, ops, region["bbox"])
+        if points:
+            regions.replace_region_graph(gen, region, G2)
+            changed_points |= points
+            regions_updated += 1
+
+    # 3) 바뀐 타일 버전 증가 + 그 영역의 경로 캐시만 무효화
+    changed_tiles = {graph_store.tile_key(lat, lng) for lat, lng in changed_points}
+    invalidated = 0
+    for key in changed_tiles:
+        graph_store.bump_tile_version(key)
+        invalidated += route_cache.invalidate_bbox(*graph_store.tile_bbox(key))
+
+    with _lock:
+        _journal.append((name, ops))
+        _stats["files_applied"] += 1
+        _stats["ops_applied"] += len(ops)
+        _stats["tiles_updated"] += tiles_updated
+        _stats["regions_updated"] += regions_updated
+        _stats["route_cache_invalidated"] += invalidated
+
+    print(f"🛠️ OSM 변경 적용: {name} ({len(ops)}건, 타일 {len(changed_tiles)}개, 경로 캐시 {invalidated}건 무효화)")
+    return {
+        "file": name,
+        "ops": len(ops),
+        "changed_tiles": sorted(changed_tiles),
+        "regions_updated": regions_updated,
+        "route_cache_invalidated": invalidated,
+    }
+
+
+def sync_changes(force: bool = False) -> List[dict]:
+    """
+    저널 디렉토리의 새 변경 파일 적용 (워커별, OSM_CHANGE_POLL_S 간격으로만 확인).
+    반환: 이번에 적용한 파일별 결과
+    """
+    global _last_poll
+    now = time.monotonic()
+    if not force and now - _last_poll < OSM_CHANGE_POLL_S:
+        return []
+    _last_poll = now
+
+    results = []
+    with _apply_lock:
+        for name in _pending_files():
+            try:
+                results.append(_apply_file(name))
+            except Exception as e:
+                # 잘못된 파일(파싱/속성/입출력 오류)은 저널에 빈 변경으로 기록해 반복 시도하지 않음
+                print(f"⚠️ OSM 변경 파일 적용 실패 {name}: {str(e)}")
+                with _lock:
+                    _journal.append((name, []))
+                    _stats["files_applied"] += 1
+    return results
+
+
+def add_change_file(src_path: str) -> str:
+    """변경 파일을 저널에 추가 (파일명 앞에 시각을 붙여 적용 순서 보장)"""
+    os.makedirs(OSM_CHANGE_DIR, exist_ok=True)
+    name = f"{time.strftime('%Y%m%d%H%M%S')}_{os.path.basename(src_path)}"
+    if not name.endswith(".osc"):
+        name += ".osc"
+    shutil.copyfile(src_path, os.path.join(OSM_CHANGE_DIR, name))
+    return name
+
+
+def stats() -> dict:
+    with _lock:
+        return {
+            **_stats,
+            "journal_files": len(_journal),
+            "change_dir": OSM_CHANGE_DIR,
+        }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] != "apply":
+        print("사용법: python -m app.route.osm_changes apply <file.osc>")
+        sys.exit(1)
+
+    for path in sys.argv[2:]:
+        print(f"✅ 저널에 추가: {add_change_file(path)}")
+    print("실행 중인 워커는 다음 확인 주기에 적용합니다. (즉시 적용: POST /route/osm-changes/apply)")
@@ -2,117 +2,92 @@
 
 from __future__ import annotations
 
-import math
-from typing import List, Dict, Tuple
+import time
+from heapq import heappush, heappop
+from itertools import count
+from typing import List, Dict, Tuple, Optional
 from collections import defaultdict  # ✅ 추가
 
 import osmnx as ox
 import networkx as nx
 from sqlalchemy.orm import Session
 
-from app.route.models import Obstacle
+from app.route import graph_store, osm_changes, regions, snapshots
+from app.route.utils import haversine_m
+from app.route.instructions import build_instructions
 
 
-# --- 내부 유틸: 거리 계산 (meter) ---
+# --- 그래프 로딩 ---
 
-def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+def bbox_for_points(points: List[Tuple[float, float]], margin_deg: float = 0.01):
     """
-    위도/경도 두 점 사이의 거리(m)를 계산.
+    좌표들을 모두 포함하는 bounding box (south, north, west, east).
+    margin_deg 0.01 ≒ 위도/경도 ~1.1km 정도
     """
-    R = 6371000  # 지구 반지름(m)
-    phi1 = math.radians(lat1)
-    phi2 = math.radians(lat2)
-    dphi = math.radians(lat2 - lat1)
-    dlambda = math.radians(lon2 - lon1)
+    lats = [p[0] for p in points]
+    lngs = [p[1] for p in points]
+    return (
+        min(lats) - margin_deg,
+        max(lats) + margin_deg,
+        min(lngs) - margin_deg,
+        max(lngs) + margin_deg,
+    )
 
-    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
-    return 2 * R * math.asin(math.sqrt(a))
 
+def load_graph_for_bbox(south: float, north: float, west: float, east: float,
+                        network_type: str = "walk"):
+    """
+    bounding box 영역의 OSM 보행 그래프.
+    - 지역 레지스트리(regions)가 있으면 해당 지역의 사전 구축 그래프에서 잘라냄
+    - 없으면 워커별 타일 캐시(graph_store)로 on-demand 로딩
+    반환 그래프는 요청 전용 사본이라 edge weight를 기록해도 캐시에 영향 없음.
+    그래프 세대는 이 요청이 잡은 스냅샷(snapshots.current())을 따름.
+    """
+    # 로컬 OSM 변경 파일이 새로 들어왔으면 캐시된 그래프에 먼저 반영 (확인 주기 제한)
+    osm_changes.sync_changes()
+
+    gen = snapshots.current().graph_gen
+    if regions.is_enabled():
+        region = regions.find_region_for_bbox(south, north, west, east)
+        if region is not None:
+            return regions.graph_for_bbox(region, south, north, west, east, gen=gen)
+        if not regions.REGION_FALLBACK_ON_DEMAND:
+            raise regions.OutsideCoverageError("서비스 지역 밖의 좌표입니다.")
+    return graph_store.get_graph_for_bbox(south, north, west, east, gen=gen)
 
-# --- 그래프 로딩 ---
 
 def load_graph_for_route(start: Tuple[float, float],
                          end: Tuple[float, float],
                          network_type: str = "walk"):
     """
     start ~ end 영역을 포함하는 OSM 그래프 로딩.
-    Overpass 엔드포인트는 외부 설정값 사용.
     """
-    lat1, lon1 = start
-    lat2, lon2 = end
-
-    # osmnx 기본 설정
-    ox.settings.use_cache = False #잠시 바꿔둠.
-    ox.settings.log_console = False
-    ox.settings.overpass_rate_limit = True
-    ox.settings.overpass_endpoint = "https://overpass-api.de/api/interpreter"
-
     # start/end 를 모두 포함하는 bounding box (약 1km 마진)
-    margin_deg = 0.01  # 위도/경도 ~1.1km 정도
-    north = max(lat1, lat2) + margin_deg
-    south = min(lat1, lat2) - margin_deg
-    east = max(lon1, lon2) + margin_deg
-    west = min(lon1, lon2) - margin_deg
-
-    G = ox.graph_from_bbox(
-        north=north,
-        south=south,
-        east=east,
-        west=west,
-        network_type=network_type,
-    )
-
-    # 가장 큰 연결 성분만 사용 (고립된 조각 제거)
-    G = ox.utils_graph.get_largest_component(G, strongly=False)
+    south, north, west, east = bbox_for_points([start, end])
+    G = load_graph_for_bbox(south, north, west, east, network_type=network_type)
     return G, (south, north, west, east)
 
 
-# --- 메인: A* + 장애물 패널티 + 회피 통계 계산 ---
+# --- 장애물 조회 / edge weight ---
 
-def astar_path_with_penalty(
-    start: Tuple[float, float],
-    end: Tuple[float, float],
-    db: Session,
-    avoid_types: List[str],
-    radius_m: float,
-    penalties: Dict[str, float],
-):
+def fetch_obstacles(db: Session, avoid_types: List[str],
+                    bbox: Tuple[float, float, float, float]) -> List[Tuple[float, float, str]]:
     """
-    - OSM 그래프 기반 A* 경로 탐색
-    - YOLO 장애물(Obstacle) 테이블을 반영해 edge weight에 패널티 적용
-    - 개별 장애물 단위로 회피 성공/실패 개수를 집계
-    - risk_factors: 선택한 타입 중 하나라도 실패한 타입 목록 (타입 단위)
-    - obstacle_stats: 타입별 total / success / failed 개수
-    - unavoidable: 실제 경로 반경 내에 포함된 장애물 목록
+    회피 대상 장애물 조회 (체크박스에서 선택한 타입만).
+    (lat, lng, type) 형태로 단순화해 반환. 이 요청이 잡은 스냅샷의 장애물 인덱스에서 조회.
     """
+    if not avoid_types:
+        return []
+    return snapshots.current().obstacles_in_bbox(avoid_types, bbox)
 
-    # 0. 그래프 로딩
-    G, (south, north, west, east) = load_graph_for_route(start, end, network_type="walk")
 
-    # 1. 시작/끝 노드 매핑
-    start_lat, start_lng = start
-    end_lat, end_lng = end
-
-    start_node = ox.nearest_nodes(G, X=start_lng, Y=start_lat)
-    end_node = ox.nearest_nodes(G, X=end_lng, Y=end_lat)
-
-    # 2. 회피 대상 장애물 조회 (체크박스에서 선택한 타입만)
-    obstacles: List[Obstacle] = []
-    if avoid_types:
-        q = (
-            db.query(Obstacle)
-            .filter(Obstacle.type.in_(avoid_types))
-            .filter(Obstacle.lat >= south, Obstacle.lat <= north)
-            .filter(Obstacle.lng >= west, Obstacle.lng <= east)
-        )
-        obstacles = q.all()
-
-    # (lat, lng, type) 형태로 단순화
-    obs_list: List[Tuple[float, float, str]] = [
-        (o.lat, o.lng, o.type) for o in obstacles
-    ]
-
-    # 3. edge weight 계산: 거리 + 장애물 패널티
+def apply_edge_weights(G, obs_list: List[Tuple[float, float, str]],
+                       avoid_types: List[str], radius_m: float,
+                       penalties: Dict[str, float]) -> None:
+    """
+    edge weight 계산: 거리 + 장애물 패널티 + 차도 패널티.
+    결과는 각 edge의 "weight" 속성에 기록.
+    """
     for u, v, key, data in G.edges(keys=True, data=True):
         # 기본 길이 계산
         length = data.get("length")
@@ -159,21 +134,10 @@ def astar_path_with_penalty(
         data["weight"] = length + penalty_total
 
 
-    # 4. A* 경로 탐색
-    try:
-        path_nodes = nx.astar_path(G, start_node, end_node, weight="weight")
-    except nx.NetworkXNoPath:
-        # 경로 자체가 없으면 직선 + 모든 선택 타입을 실패로 간주 (임시 fallback)
-        fallback_distance = haversine_m(start_lat, start_lng, end_lat, end_lng)
-        return {
-            "route": [start, end],
-            "distance_m": fallback_distance,
-            "risk_factors": avoid_types,  # 전부 실패
-            "obstacle_stats": {},         # 통계 없음
-            "unavoidable": [],            # 알 수 있는 장애물 없음
-        }
+# --- 경로 결과 가공 ---
 
-    # 5. 경로 길이 계산 (m)
+def path_length_m(G, path_nodes: List) -> float:
+    """경로 길이 계산 (m): 평행 간선 중 가장 짧은 length 사용"""
     total_distance = 0.0
     for u, v in zip(path_nodes[:-1], path_nodes[1:]):
         edges = G.get_edge_data(u, v)
@@ -193,13 +157,21 @@ def astar_path_with_penalty(
                 min_len = l
         if min_len:
             total_distance += min_len
+    return total_distance
 
-    # 6. 경로 좌표 리스트 (lat, lng) 형태로 변환
-    route_coords: List[Tuple[float, float]] = [
-        (G.nodes[n]["y"], G.nodes[n]["x"]) for n in path_nodes
-    ]
 
-    # 7. 개별 장애물 단위로 회피 성공/실패 집계
+def path_coords(G, path_nodes: List) -> List[Tuple[float, float]]:
+    """경로 좌표 리스트 (lat, lng) 형태로 변환"""
+    return [(G.nodes[n]["y"], G.nodes[n]["x"]) for n in path_nodes]
+
+
+def obstacle_stats_for_path(G, path_nodes: List,
+                            obs_list: List[Tuple[float, float, str]],
+                            avoid_types: List[str], radius_m: float):
+    """
+    개별 장애물 단위로 회피 성공/실패 집계.
+    반환: (obstacle_stats, risk_factors, unavoidable_list)
+    """
     type_total = defaultdict(int)
     type_failed = defaultdict(int)
     type_success = defaultdict(int)
@@ -231,7 +203,7 @@ def astar_path_with_penalty(
             else:
                 type_success[obs_type] += 1
 
-    # 8. 타입별 통계 및 risk_factors 생성
+    # 타입별 통계 및 risk_factors 생성
     obstacle_stats: Dict[str, Dict[str, int]] = {}
     risk_factors: List[str] = []
 
@@ -247,10 +219,203 @@ def astar_path_with_penalty(
         if failed > 0:
             risk_factors.append(t)
 
+    return obstacle_stats, risk_factors, unavoidable_list
+
+
+# --- Anytime A* (bounded-suboptimal, 마감 시간 지원) ---
+
+def edge_cost(G, u, v, weight: str) -> float:
+    """u→v 간 최소 가중치 (멀티그래프면 평행 간선 중 최소값)."""
+    data = G._adj[u][v]
+    if G.is_multigraph():
+        return min(d.get(weight, 1) for d in data.values())
+    return data.get(weight, 1)
+
+
+def _weighted_astar(G, source, target, heuristic, w: float, weight: str,
+                    deadline: Optional[float]):
+    """
+    가중 A* (f = g + w*h) 1회 실행.
+    - 경로를 찾으면 (path_nodes, cost) 반환
+    - deadline(time.monotonic 기준)을 넘기면 None 반환
+    - 경로가 없으면 nx.NetworkXNoPath 발생
+    구조는 networkx.astar_path와 동일하게 유지.
+    """
+    c = count()
+    queue = [(0.0, next(c), source, 0.0, None)]
+    enqueued = {}
+    explored = {}
+    expansions = 0
+
+    while queue:
+        # 마감 확인은 256회 확장마다 한 번만 (time 호출 비용 절감)
+        expansions += 1
+        if deadline is not None and (expansions & 0xFF) == 0 and time.monotonic() > deadline:
+            return None
+
+        _, __, curnode, dist, parent = heappop(queue)
+
+        if curnode == target:
+            path = [curnode]
+            node = parent
+            while node is not None:
+                path.append(node)
+                node = explored[node]
+            path.reverse()
+            return path, dist
+
+        if curnode in explored:
+            if explored[curnode] is None:
+                continue
+            qcost, h = enqueued[curnode]
+            if qcost < dist:
+                continue
+
+        explored[curnode] = parent
+
+        for neighbor in G._adj[curnode]:
+            ncost = dist + edge_cost(G, curnode, neighbor, weight)
+            if neighbor in enqueued:
+                qcost, h = enqueued[neighbor]
+                if qcost <= ncost:
+                    continue
+            else:
+                h = heuristic(neighbor)
+            enqueued[neighbor] = ncost, h
+            heappush(queue, (ncost + w * h, next(c), neighbor, ncost, curnode))
+
+    raise nx.NetworkXNoPath(f"Node {target} not reachable from {source}")
+
+
+def anytime_astar_path(G, source, target, weight: str = "weight",
+                       epsilon: float = 0.0,
+                       deadline: Optional[float] = None):
+    """
+    Anytime Repairing A* 방식의 경로 탐색.
+    - 첫 탐색은 w = 1 + epsilon 으로 끝까지 실행 (항상 해를 확보)
+    - deadline이 있으면 남은 시간 동안 w를 절반씩 줄이며 재탐색해 해를 개선
+    - 반환: (path_nodes, cost, bound)
+      bound: 마지막으로 완료된 탐색의 w → cost <= bound * 최적 비용 보장
+    휴리스틱은 직선 거리(haversine)이므로 weight >= length 인 한 admissible.
+    """
+    ty = G.nodes[target]["y"]
+    tx = G.nodes[target]["x"]
+
+    def heuristic(n):
+        return haversine_m(G.nodes[n]["y"], G.nodes[n]["x"], ty, tx)
+
+    w = 1.0 + max(epsilon, 0.0)
+    best_path, best_cost, bound = None, None, None
+
+    while True:
+        # 첫 탐색은 마감 없이 실행, 이후 개선 탐색만 마감 적용
+        res = _weighted_astar(
+            G, source, target, heuristic, w, weight,
+            deadline if best_path is not None else None,
+        )
+        if res is None:
+            break
+
+        path, cost = res
+        if best_cost is None or cost < best_cost:
+            best_path, best_cost = path, cost
+        bound = w
+
+        if w <= 1.0 or deadline is None or time.monotonic() >= deadline:
+            break
+
+        # inflation 감소 스케줄: 1에 충분히 가까워지면 최적 탐색으로 마무리
+        w = 1.0 + (w - 1.0) / 2
+        if w - 1.0 < 0.01:
+            w = 1.0
+
+    return best_path, best_cost, bound
+
+
+# --- 메인: A* + 장애물 패널티 + 회피 통계 계산 ---
+
+def astar_path_with_penalty(
+    start: Tuple[float, float],
+    end: Tuple[float, float],
+    db: Session,
+    avoid_types: List[str],
+    radius_m: float,
+    penalties: Dict[str, float],
+    epsilon: Optional[float] = None,
+    deadline: Optional[float] = None,
+):
+    """
+    - OSM 그래프 기반 A* 경로 탐색
+    - epsilon/deadline이 주어지면 anytime A*로 탐색 (bounded-suboptimal)
+    - YOLO 장애물(Obstacle) 테이블을 반영해 edge weight에 패널티 적용
+    - 개별 장애물 단위로 회피 성공/실패 개수를 집계
+    - risk_factors: 선택한 타입 중 하나라도 실패한 타입 목록 (타입 단위)
+    - obstacle_stats: 타입별 total / success / failed 개수
+    - unavoidable: 실제 경로 반경 내에 포함된 장애물 목록
+    - suboptimality_bound: 최적 대비 비용 상한 배수 (1.0이면 최적)
+    - build_instructions: 경로 기준 보행 안내문(turn-by-turn)을 만드는 함수
+      (회피 타입을 줄여가며 재탐색하는 경우 실제로 반환할 경로에 대해서만 만들도록 지연 생성)
+    """
+
+    # 0. 그래프 로딩
+    G, bbox = load_graph_for_route(start, end, network_type="walk")
+
+    # 1. 시작/끝 노드 매핑
+    start_lat, start_lng = start
+    end_lat, end_lng = end
+
+    start_node = ox.nearest_nodes(G, X=start_lng, Y=start_lat)
+    end_node = ox.nearest_nodes(G, X=end_lng, Y=end_lat)
+
+    # 2. 회피 대상 장애물 조회 (체크박스에서 선택한 타입만)
+    obs_list = fetch_obstacles(db, avoid_types, bbox)
+
+    # 3. edge weight 계산: 거리 + 장애물 패널티
+    apply_edge_weights(G, obs_list, avoid_types, radius_m, penalties)
+
+    # 4. A* 경로 탐색
+    bound = 1.0
+    try:
+        if epsilon is None and deadline is None:
+            path_nodes = nx.astar_path(G, start_node, end_node, weight="weight")
+        else:
+            path_nodes, _, bound = anytime_astar_path(
+                G, start_node, end_node,
+                weight="weight",
+                epsilon=epsilon or 0.0,
+                deadline=deadline,
+            )
+    except nx.NetworkXNoPath:
+        # 경로 자체가 없으면 직선 + 모든 선택 타입을 실패로 간주 (임시 fallback)
+        fallback_distance = haversine_m(start_lat, start_lng, end_lat, end_lng)
+        return {
+            "route": [start, end],
+            "distance_m": fallback_distance,
+            "risk_factors": avoid_types,  # 전부 실패
+            "obstacle_stats": {},         # 통계 없음
+            "unavoidable": [],            # 알 수 있는 장애물 없음
+            "suboptimality_bound": 1.0,
+            "build_instructions": lambda: [],
+        }
+
+    # 5. 경로 길이 계산 (m)
+    total_distance = path_length_m(G, path_nodes)
+
+    # 6. 경로 좌표 리스트 (lat, lng) 형태로 변환
+    route_coords = path_coords(G, path_nodes)
+
+    # 7~8. 개별 장애물 단위 회피 성공/실패 집계 + 타입별 통계 / risk_factors
+    obstacle_stats, risk_factors, unavoidable_list = obstacle_stats_for_path(
+        G, path_nodes, obs_list, avoid_types, radius_m
+    )
+
     return {
         "route": route_coords,
         "distance_m": total_distance,
         "risk_factors": risk_factors,   # 장애물 타입 단위 실패 여부
         "obstacle_stats": obstacle_stats,  # 타입별 total/success/failed
         "unavoidable": unavoidable_list,   # 실제 경로 반경 내 장애물 목록
+        "suboptimality_bound": bound,      # 최적 대비 비용 상한 배수
+        # 보행 안내문: 실제 계산된 경로 기준으로 로컬 생성 (외부 API 호출 없음)
+        "build_instructions": lambda: build_instructions(G, path_nodes, unavoidable_list),
     }
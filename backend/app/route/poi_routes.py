@@ -0,0 +1,337 @@
+# backend/app/route/poi_routes.py
+
+"""
+캠퍼스 주요 지점(POI) 간 경로 사전 계산 테이블.
+
+- POI 목록: CAMPUS_POI_FILE(JSON) — [{"id": "main_gate", "name": "정문", "lat": .., "lng": ..}, ...]
+- 표준 회피 프로필(STANDARD_PROFILES)마다 모든 POI 쌍의 경로/거리/타입별 장애물 통계를
+  poi_routes 테이블에 저장 (경로는 encoded polyline)
+- /route/find: 출발/도착이 모두 POI 근처(POI_SNAP_RADIUS_M)이고 요청이 표준 프로필과
+  같으면 테이블에서 바로 응답, 그 외(임의 좌표)는 기존 탐색 그대로
+- 행마다 계산에 쓴 장애물 데이터 버전(obstacle_changes)을 저장하고, 이 워커 스냅샷의 데이터 버전보다
+  오래된 행은 조회에서 무시 → 어떤 경로(추론 / 재병합 / 다른 워커)로 장애물이 바뀌어도 오래된 통계로 응답하지 않음
+- 장애물이 바뀌면(이미지 추론) 테이블을 비우고 백그라운드에서 다시 계산
+  (계산 중에 또 요청되면 끝난 뒤 최신 스냅샷으로 한 번 더 계산)
+
+실행: python -m app.route.poi_routes   (backend 디렉토리에서)
+"""
+
+import json
+import math
+import os
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import List, Dict, Tuple, Optional
+
+import osmnx as ox
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal, engine
+from app.route import crud, snapshots
+from app.route.models import PoiRoute
+from app.route.pathfinding import (
+    bbox_for_points,
+    load_graph_for_bbox,
+    fetch_obstacles,
+    apply_edge_weights,
+    path_length_m,
+    path_coords,
+    obstacle_stats_for_path,
+    haversine_m,
+)
+from app.route.instructions import build_instructions
+from app.route.multistop import one_to_many, rebuild_path
+from app.route.service import route_hit_stats
+from app.route.utils import encode_polyline, decode_polyline
+
+BASE_DIR = Path(__file__).parent
+CAMPUS_POI_FILE = os.getenv("CAMPUS_POI_FILE", str(BASE_DIR / "data" / "campus_pois.json"))
+POI_SNAP_RADIUS_M = float(os.getenv("POI_SNAP_RADIUS_M", "25"))
+
+# 프론트엔드(RouteCalculator)와 같은 기본값
+DEFAULT_RADIUS_M = 5.0
+DEFAULT_PENALTIES: Dict[str, float] = {
+    "crosswalk": 1000,
+    "curb": 1500,
+    "bollard": 2000,
+    "stairs": 3000,
+    "ramp": 500,
+}
+
+# 표준 회피 프로필: 이름 → 회피 타입 목록
+STANDARD_PROFILES: Dict[str, List[str]] = {
+    "shortest": [],
+    "wheelchair": ["curb", "stairs", "bollard"],
+    "stroller": ["curb", "stairs"],
+    "all": ["crosswalk", "curb", "bollard", "stairs", "ramp"],
+}
+
+# 스냅용 격자 크기 (도) — 약 100m, 스냅 반경보다 커야 3x3 이웃만 보면 됨
+_GRID_DEG = 0.001
+
+_pois: Optional[List[dict]] = None
+_poi_grid: Dict[Tuple[int, int], List[dict]] = {}
+_refresh_lock = threading.Lock()
+_refresh_running = False
+_refresh_pending = False
+
+
+# --- POI 로딩 / 스냅 ---
+
+def load_pois() -> List[dict]:
+    """POI 목록 로딩 (파일이 없으면 빈 목록 → 기능 비활성)"""
+    global _pois, _poi_grid
+    if _pois is not None:
+        return _pois
+
+    pois: List[dict] = []
+    if os.path.exists(CAMPUS_POI_FILE):
+        with open(CAMPUS_POI_FILE, encoding="utf-8") as f:
+            pois = [
+                {"id": str(p["id"]), "name": p.get("name", ""), "lat": float(p["lat"]), "lng": float(p["lng"])}
+                for p in json.load(f)
+            ]
+
+    grid = defaultdict(list)
+    for p in pois:
+        grid[_cell(p["lat"], p["lng"])].append(p)
+
+    _pois, _poi_grid = pois, dict(grid)
+    return _pois
+
+
+def _cell(lat: float, lng: float) -> Tuple[int, int]:
+    return int(math.floor(lat / _GRID_DEG)), int(math.floor(lng / _GRID_DEG))
+
+
+def snap_to_poi(lat: float, lng: float) -> Optional[dict]:
+    """POI_SNAP_RADIUS_M 이내의 가장 가까운 POI (격자 3x3만 확인 → O(1))"""
+    load_pois()
+    ci, cj = _cell(lat, lng)
+    best, best_d = None, POI_SNAP_RADIUS_M
+    for di in (-1, 0, 1):
+        for dj in (-1, 0, 1):
+            for p in _poi_grid.get((ci + di, cj + dj), ()):
+                d = haversine_m(lat, lng, p["lat"], p["lng"])
+                if d <= best_d:
+                    best, best_d = p, d
+    return best
+
+
+def match_profile(avoid_types: List[str], radius_m: float, penalties: dict) -> Optional[str]:
+    """요청이 표준 프로필과 같으면 프로필 이름 반환"""
+    if radius_m != DEFAULT_RADIUS_M:
+        return None
+    requested = sorted(set(avoid_types))
+    for name, types in STANDARD_PROFILES.items():
+        if sorted(types) != requested:
+            continue
+        if all(float(penalties.get(t, 0.0)) == float(DEFAULT_PENALTIES[t]) for t in types):
+            return name
+    return None
+
+
+# --- 조회 (/route/find) ---
+
+def lookup_route(req, db: Session) -> Optional[dict]:
+    """
+    사전 계산 테이블에서 경로 조회.
+    POI 스냅 실패, 표준 프로필 아님, 테이블에 없음 → None (기존 탐색 사용)
+    """
+    if not load_pois():
+        return None
+
+    profile = match_profile(req.avoid_types, req.radius_m, req.penalties)
+    if profile is None:
+        return None
+
+    src = snap_to_poi(req.start_lat, req.start_lng)
+    dst = snap_to_poi(req.end_lat, req.end_lng)
+    if src is None or dst is None or src["id"] == dst["id"]:
+        return None
+
+    row = (
+        db.query(PoiRoute)
+        .filter(
+            PoiRoute.profile == profile,
+            PoiRoute.src_poi == src["id"],
+            PoiRoute.dst_poi == dst["id"],
+        )
+        .first()
+    )
+    if row is None or (row.dataset_version or 0) < snapshots.current().dataset_version:
+        return None
+
+    return {
+        "route": decode_polyline(row.route_polyline),
+        "distance_m": row.distance_m,
+        "risk_factors": row.risk_factors or [],
+        "avoided_final": row.avoided_final or [],
+        "obstacle_stats": row.obstacle_stats or {},
+        "suboptimality_bound": 1.0,
+        "deadline_exceeded": False,
+        "instructions": row.instructions or [],
+    }
+
+
+# --- 사전 계산 ---
+
+def _compute_profile(G, nodes, points, obs_all, types: List[str]):
+    """
+    한 프로필의 모든 POI 쌍 경로 계산.
+    find_best_path와 같은 규칙: 회피 실패 타입을 빼고 재탐색, 남은 타입이 없으면 최단 경로.
+    같은 회피 집합을 쓰는 쌍들을 모아 weight를 한 번만 계산하고, 출발지마다 one-to-many 1회.
+    """
+    n = len(nodes)
+    obs_types = [o for o in obs_all if o[2] in types]
+    pending = {frozenset(types): [(i, j) for i in range(n) for j in range(n) if i != j]}
+    results = {}
+
+    while pending:
+        avoid_set, pairs = pending.popitem()
+        avoid = [t for t in types if t in avoid_set]
+        obs_avoid = [o for o in obs_all if o[2] in avoid_set]
+        apply_edge_weights(G, obs_avoid, avoid, DEFAULT_RADIUS_M, DEFAULT_PENALTIES)
+
+        by_src = defaultdict(list)
+        for i, j in pairs:
+            by_src[i].append(j)
+
+        for i, js in by_src.items():
+            dist, pred = one_to_many(G, nodes[i], [nodes[j] for j in js])
+            for j in js:
+                if nodes[j] not in dist:
+                    continue  # 도달 불가 쌍은 저장하지 않음 (요청 시 기존 탐색)
+
+                path_nodes = rebuild_path(pred, nodes[j])
+                _, failed, unavoidable = obstacle_stats_for_path(
+                    G, path_nodes, obs_avoid, avoid, DEFAULT_RADIUS_M
+                )
+                remaining = avoid_set.difference(failed)
+                if failed and remaining:
+                    pending.setdefault(frozenset(remaining), []).append((i, j))
+                    continue
+                if failed:
+                    pending.setdefault(frozenset(), []).append((i, j))
+                    continue
+
+                # 통계 대상 영역은 /route/find와 같이 출발/도착 기준 bbox
+                coords = path_coords(G, path_nodes)
+                south, north, west, east = bbox_for_points([points[i], points[j]])
+                obs_pair = [
+                    o for o in obs_types
+                    if south <= o[0] <= north and west <= o[1] <= east
+                ]
+                stats = route_hit_stats(coords, obs_pair, types, DEFAULT_RADIUS_M)
+                results[(i, j)] = {
+                    "route": coords,
+                    "distance_m": path_length_m(G, path_nodes),
+                    "risk_factors": [t for t in types if stats.get(t, {}).get("failed", 0) > 0],
+                    "avoided_final": avoid,
+                    "obstacle_stats": stats,
+                    "instructions": build_instructions(G, path_nodes, unavoidable),
+                }
+
+    return results
+
+
+def precompute_poi_routes(db: Session) -> dict:
+    """모든 표준 프로필 × POI 쌍 경로를 계산해 poi_routes 테이블을 교체"""
+    pois = load_pois()
+    if len(pois) < 2:
+        print("⚠️ POI가 2개 미만이라 사전 계산을 건너뜁니다.")
+        return {"pois": len(pois), "routes": 0}
+
+    points = [(p["lat"], p["lng"]) for p in pois]
+    bbox = bbox_for_points(points)
+    all_types = sorted({t for types in STANDARD_PROFILES.values() for t in types})
+    with snapshots.use() as snap:
+        G = load_graph_for_bbox(*bbox, network_type="walk")
+        obs_all = fetch_obstacles(db, all_types, bbox)
+        dataset_version = snap.dataset_version
+    nodes = list(ox.nearest_nodes(G, X=[p[1] for p in points], Y=[p[0] for p in points]))
+
+    rows = []
+    for profile, types in STANDARD_PROFILES.items():
+        results = _compute_profile(G, nodes, points, obs_all, types)
+        for (i, j), res in results.items():
+            rows.append(PoiRoute(
+                profile=profile,
+                src_poi=pois[i]["id"],
+                dst_poi=pois[j]["id"],
+                route_polyline=encode_polyline(res["route"]),
+                distance_m=res["distance_m"],
+                risk_factors=res["risk_factors"],
+                avoided_final=res["avoided_final"],
+                obstacle_stats=res["obstacle_stats"],
+                instructions=res["instructions"],
+                dataset_version=dataset_version,
+            ))
+        print(f"✅ POI 경로 사전 계산: {profile} → {len(results)}개")
+
+    try:
+        db.query(PoiRoute).delete()
+        db.add_all(rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return {"pois": len(pois), "routes": len(rows), "dataset_version": dataset_version}
+
+
+def invalidate_poi_routes(db: Session) -> None:
+    """장애물이 바뀌면 기존 테이블은 즉시 비움 (오래된 통계로 응답하지 않도록)"""
+    try:
+        db.query(PoiRoute).delete()
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
+def refresh_poi_routes_in_background() -> None:
+    """
+    별도 세션으로 백그라운드 재계산.
+    이미 실행 중이면 다시 계산하도록 표시만 함 (실행 중인 계산은 이전 장애물로 시작했을 수 있으므로)
+    """
+    global _refresh_running, _refresh_pending
+    if not load_pois():
+        return
+    with _refresh_lock:
+        _refresh_pending = True
+        if _refresh_running:
+            return
+        _refresh_running = True
+    threading.Thread(target=_refresh_loop, daemon=True).start()
+
+
+def _refresh_loop() -> None:
+    global _refresh_running, _refresh_pending
+    while True:
+        with _refresh_lock:
+            if not _refresh_pending:
+                _refresh_running = False
+                return
+            _refresh_pending = False
+        db = SessionLocal()
+        try:
+            # 폴링을 기다리지 않고 최신 장애물 데이터로 스냅샷을 맞춘 뒤 계산 (바뀐 것이 없으면 그대로)
+            snapshots.build(snapshots.current().version)
+            result = precompute_poi_routes(db)
+            print(f"🎉 POI 경로 테이블 갱신 완료: {result}")
+        except Exception as e:
+            print(f"⚠️ POI 경로 테이블 갱신 실패: {str(e)}")
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    PoiRoute.__table__.create(bind=engine, checkfirst=True)
+    crud.ensure_poi_route_columns(engine)
+    session = SessionLocal()
+    try:
+        print(precompute_poi_routes(session))
+    finally:
+        session.close()
@@ -0,0 +1,168 @@
+# backend/app/route/prefetch.py
+
+"""
+그래프 타일 예측 선로딩 (prefetch).
+
+사용자는 보통 주소 검색(geocode) / 장소 검색 / 현재 위치 확인 직후에 /route/find를 호출한다.
+그 좌표 주변 타일(graph_store)을 미리 백그라운드에서 로딩해 두면
+첫 경로 요청이 Overpass 다운로드를 기다리지 않는다.
+
+- 좌표 하나당 주변 PREFETCH_RING 반경(기본 1 → 3x3) 타일, 요청당 최대 PREFETCH_TILES_PER_POINT개
+- 이미 캐시된 타일 / 이미 대기 중인 타일은 건너뜀
+- 대기열 크기 제한(PREFETCH_QUEUE_MAX): 가득 차면 버림 (선로딩은 best-effort)
+- 워커 스레드 PREFETCH_WORKERS개 (Overpass rate limit을 고려해 기본 1개)
+- 현재 경로 스냅샷(snapshots)의 그래프 세대로 로딩 (장애물은 스냅샷에 이미 메모리로 올라가 있음)
+- 지역 그래프 레지스트리(regions)가 있으면 타일 대신 좌표가 속한 지역 그래프를 로딩
+"""
+
+import os
+import queue
+import threading
+import time
+from typing import Iterable, Tuple
+
+from app.route import graph_store, regions, snapshots
+
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "true").lower() == "true"
+PREFETCH_QUEUE_MAX = int(os.getenv("PREFETCH_QUEUE_MAX", "32"))
+PREFETCH_WORKERS = int(os.getenv("PREFETCH_WORKERS", "1"))
+PREFETCH_RING = int(os.getenv("PREFETCH_RING", "1"))
+PREFETCH_TILES_PER_POINT = int(os.getenv("PREFETCH_TILES_PER_POINT", "9"))
+
+# 대기열 항목: ("tile", TileKey) 또는 ("region", region dict)
+_queue: queue.Queue = queue.Queue(maxsize=PREFETCH_QUEUE_MAX)
+_pending = set()
+_lock = threading.Lock()
+_workers_started = False
+
+_stats = {
+    "requested": 0,
+    "enqueued": 0,
+    "skipped_cached": 0,
+    "dropped_queue_full": 0,
+    "loaded": 0,
+    "failed": 0,
+    "load_ms_total": 0.0,
+}
+
+
+def _ensure_workers() -> None:
+    global _workers_started
+    with _lock:
+        if _workers_started:
+            return
+        _workers_started = True
+    for i in range(max(1, PREFETCH_WORKERS)):
+        threading.Thread(target=_worker, name=f"graph-prefetch-{i}", daemon=True).start()
+
+
+def _worker() -> None:
+    while True:
+        kind, item = _queue.get()
+        key = (kind, item["id"] if kind == "region" else item)
+        started = time.perf_counter()
+        try:
+            gen = snapshots.current().graph_gen
+            if kind == "region":
+                regions.get_region_graph(item, gen=gen)
+            else:
+                graph_store.ensure_tile(item, gen=gen)
+            with _lock:
+                _stats["loaded"] += 1
+                _stats["load_ms_total"] += (time.perf_counter() - started) * 1000.0
+        except Exception as e:
+            with _lock:
+                _stats["failed"] += 1
+            print(f"⚠️ 타일 선로딩 실패 {key}: {str(e)}")
+        finally:
+            with _lock:
+                _pending.discard(key)
+            _queue.task_done()
+
+
+def _ring_tiles(lat: float, lng: float):
+    """좌표가 속한 타일부터 가까운 순서로 주변 타일"""
+    ci, cj = graph_store.tile_key(lat, lng)
+    keys = [
+        (ci + di, cj + dj)
+        for di in range(-PREFETCH_RING, PREFETCH_RING + 1)
+        for dj in range(-PREFETCH_RING, PREFETCH_RING + 1)
+    ]
+    keys.sort(key=lambda k: abs(k[0] - ci) + abs(k[1] - cj))
+    return keys[:PREFETCH_TILES_PER_POINT]
+
+
+def _enqueue(kind: str, item) -> bool:
+    """대기열에 추가 (이미 대기 중이면 건너뜀, 가득 차면 버림)"""
+    key = (kind, item["id"] if kind == "region" else item)
+    with _lock:
+        if key in _pending:
+            return False
+        try:
+            _queue.put_nowait((kind, item))
+        except queue.Full:
+            _stats["dropped_queue_full"] += 1
+            return False
+        _pending.add(key)
+        _stats["enqueued"] += 1
+    return True
+
+
+def prefetch_point(lat: float, lng: float) -> int:
+    """
+    좌표 주변 타일(또는 지역 그래프) 선로딩 예약 (즉시 반환).
+    반환: 새로 대기열에 넣은 항목 수
+    """
+    if not PREFETCH_ENABLED:
+        return 0
+
+    _ensure_workers()
+    with _lock:
+        _stats["requested"] += 1
+
+    gen = snapshots.current().graph_gen
+    if regions.is_enabled():
+        region = regions.find_region_for_points([(lat, lng)])
+        if region is not None:
+            if regions.is_region_loaded(region["id"], gen=gen):
+                with _lock:
+                    _stats["skipped_cached"] += 1
+                return 0
+            return int(_enqueue("region", region))
+        if not regions.REGION_FALLBACK_ON_DEMAND:
+            return 0  # 서비스 지역 밖
+
+    added = 0
+    for key in _ring_tiles(lat, lng):
+        if graph_store.is_tile_cached(key, gen=gen):
+            with _lock:
+                _stats["skipped_cached"] += 1
+            continue
+        if _enqueue("tile", key):
+            added += 1
+        elif _queue.full():
+            break
+    return added
+
+
+def prefetch_points(points: Iterable[Tuple[float, float]], limit: int = 3) -> int:
+    """검색 결과 등 여러 좌표 중 앞쪽 limit개만 선로딩 (상위 결과일수록 선택될 가능성이 높음)"""
+    added = 0
+    for idx, (lat, lng) in enumerate(points):
+        if idx >= limit:
+            break
+        added += prefetch_point(lat, lng)
+    return added
+
+
+def stats() -> dict:
+    with _lock:
+        loaded = _stats["loaded"]
+        return {
+            **_stats,
+            "avg_load_ms": _stats["load_ms_total"] / loaded if loaded else 0.0,
+            "queue_depth": _queue.qsize(),
+            "pending": len(_pending),
+            "queue_max": PREFETCH_QUEUE_MAX,
+            "enabled": PREFETCH_ENABLED,
+        }
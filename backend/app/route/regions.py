@@ -0,0 +1,312 @@
+# backend/app/route/regions.py
+
+"""
+지역(도시/캠퍼스)별 사전 구축 그래프 레지스트리.
+
+- 지역 목록: REGION_REGISTRY_FILE(JSON)
+  [{"id": "seoul_campus", "name": "서울캠퍼스", "bbox": [south, north, west, east], "version": "2025-06-01"}, ...]
+  (graph_file 생략 시 REGION_GRAPH_DIR/<id>.graphml)
+- 지역 범위로 R-tree(shapely STRtree)를 만들어 요청 좌표 → 지역 그래프로 분배
+- 서비스 지역 밖 좌표는 그래프를 로딩하지 않고 즉시 거절
+- 지역 그래프는 처음 요청될 때 로딩(lazy), 워커 공용 메모리 예산(cache_governor)을 넘으면
+  오래 쓰지 않은 지역부터 해제 (CACHE_PINNED_REGIONS에 적은 지역은 해제하지 않음)
+- 지역별 노드 좌표 배열(공간 인덱스)로 요청 bbox 부분 그래프를 빠르게 잘라냄
+- 레지스트리 파일이 없으면 비활성 → 기존 타일 단위 on-demand 로딩(graph_store) 사용
+
+그래프 구축: python -m app.route.regions build [region_id ...]   (backend 디렉토리에서)
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import networkx as nx
+import numpy as np
+import osmnx as ox
+from shapely.geometry import MultiPoint, Point, box
+from shapely.strtree import STRtree
+
+from app.route.cache_governor import governor
+
+BASE_DIR = Path(__file__).parent
+REGION_REGISTRY_FILE = os.getenv("REGION_REGISTRY_FILE", str(BASE_DIR / "data" / "regions.json"))
+REGION_GRAPH_DIR = os.getenv("REGION_GRAPH_DIR", str(BASE_DIR / "data" / "graphs"))
+# 메모리 예산과 무관하게 항상 유지할 지역 id (쉼표 구분, 예: 본 캠퍼스)
+CACHE_PINNED_REGIONS = {r.strip() for r in os.getenv("CACHE_PINNED_REGIONS", "").split(",") if r.strip()}
+# 레지스트리가 있어도 지역 밖 좌표를 타일 on-demand 로딩으로 처리할지 여부
+REGION_FALLBACK_ON_DEMAND = os.getenv("REGION_FALLBACK_ON_DEMAND", "false").lower() == "true"
+
+# cache_governor 네임스페이스
+NS_REGION_GRAPH = "region_graph"
+NS_REGION_INDEX = "region_index"
+
+
+class OutsideCoverageError(ValueError):
+    """요청 좌표가 어느 지역 그래프에도 속하지 않음"""
+
+
+_regions: Optional[List[dict]] = None
+_tree: Optional[STRtree] = None
+_extents: List = []
+
+_lock = threading.Lock()
+_loading: Dict[str, threading.Event] = {}
+_stats = {"loads": 0, "rejected": 0, "load_ms_total": 0.0}
+
+
+# --- 레지스트리 ---
+
+def load_regions() -> List[dict]:
+    """지역 목록 + R-tree 로딩 (파일이 없으면 빈 목록 → 기능 비활성)"""
+    global _regions, _tree, _extents
+    if _regions is not None:
+        return _regions
+
+    regions: List[dict] = []
+    if os.path.exists(REGION_REGISTRY_FILE):
+        with open(REGION_REGISTRY_FILE, encoding="utf-8") as f:
+            for r in json.load(f):
+                south, north, west, east = (float(v) for v in r["bbox"])
+                regions.append({
+                    "id": str(r["id"]),
+                    "name": r.get("name", ""),
+                    "bbox": (south, north, west, east),
+                    "version": str(r.get("version", "")),
+                    "graph_file": r.get("graph_file") or os.path.join(REGION_GRAPH_DIR, f"{r['id']}.graphml"),
+                })
+
+    extents = [box(r["bbox"][2], r["bbox"][0], r["bbox"][3], r["bbox"][1]) for r in regions]
+    _extents = extents
+    _tree = STRtree(extents) if extents else None
+    _regions = regions
+    return _regions
+
+
+def reload_regions() -> List[dict]:
+    """레지스트리 파일 다시 읽기 (지도 배포 후 스냅샷 재구축 시)"""
+    global _regions
+    _regions = None
+    return load_regions()
+
+
+def is_enabled() -> bool:
+    return bool(load_regions())
+
+
+def find_region_for_points(points: List[Tuple[float, float]]) -> Optional[dict]:
+    """모든 좌표(lat, lng)를 포함하는 지역 (여러 개면 가장 작은 지역)"""
+    if not load_regions() or not points:
+        return None
+    geom = MultiPoint([(lng, lat) for lat, lng in points]) if len(points) > 1 else Point(points[0][1], points[0][0])
+    idx = _tree.query(geom, predicate="covered_by")
+    if len(idx) == 0:
+        return None
+    best = min(idx, key=lambda i: _extents[i].area)
+    return _regions[int(best)]
+
+
+def find_region_for_bbox(south: float, north: float, west: float, east: float) -> Optional[dict]:
+    """bbox와 가장 많이 겹치는 지역 (겹치는 지역이 없으면 None)"""
+    if not load_regions():
+        return None
+    geom = box(west, south, east, north)
+    idx = _tree.query(geom, predicate="intersects")
+    if len(idx) == 0:
+        return None
+    best = max(idx, key=lambda i: _extents[i].intersection(geom).area)
+    return _regions[int(best)]
+
+
+def covers_points(points: List[Tuple[float, float]]) -> bool:
+    """요청을 처리할 수 있는지 (레지스트리 비활성 / on-demand 허용이면 항상 True)"""
+    if not is_enabled() or REGION_FALLBACK_ON_DEMAND:
+        return True
+    if find_region_for_points(points) is not None:
+        return True
+    with _lock:
+        _stats["rejected"] += 1
+    return False
+
+
+# --- 지역 그래프 로딩 / LRU ---
+
+def _load_region_graph(region: dict) -> nx.MultiDiGraph:
+    if not os.path.exists(region["graph_file"]):
+        raise OutsideCoverageError(f"지역 그래프 파일이 없습니다: {region['graph_file']}")
+    return ox.load_graphml(region["graph_file"])
+
+
+def _build_index(G: nx.MultiDiGraph) -> dict:
+    """노드 id / 위도 / 경도 배열 (bbox 잘라내기용)"""
+    ids = list(G.nodes)
+    return {
+        "ids": np.array(ids, dtype=object),
+        "lat": np.fromiter((G.nodes[n]["y"] for n in ids), dtype=np.float64, count=len(ids)),
+        "lng": np.fromiter((G.nodes[n]["x"] for n in ids), dtype=np.float64, count=len(ids)),
+    }
+
+
+def get_region_graph(region: dict, gen: int) -> nx.MultiDiGraph:
+    """지역 그래프 (처음 요청 시 로딩, 같은 지역 동시 로딩은 한 번만)"""
+    return _get_region(region, gen)[0]
+
+
+def _get_region(region: dict, gen: int):
+    """(지역 그래프, 노드 좌표 인덱스) — 캐시 키는 (그래프 세대, 지역 id)"""
+    rid = region["id"]
+    cache_key = (gen, rid)
+    while True:
+        with _lock:
+            G = governor.get(NS_REGION_GRAPH, cache_key)
+            index = governor.get(NS_REGION_INDEX, cache_key)
+            if G is not None and index is not None:
+                return G, index
+            event = _loading.get(cache_key)
+            if event is None:
+                event = threading.Event()
+                _loading[cache_key] = event
+                owner = True
+            else:
+                owner = False
+
+        if not owner:
+            event.wait()
+            continue
+
+        try:
+            from app.route import osm_changes
+
+            started = time.perf_counter()
+            pinned = rid in CACHE_PINNED_REGIONS
+
+            def _store(g):
+                load_ms = (time.perf_counter() - started) * 1000.0
+                governor.put(NS_REGION_GRAPH, cache_key, g, cost=load_ms, pinned=pinned,
+                             meta={"version": region["version"]})
+                idx = _build_index(g)
+                governor.put(NS_REGION_INDEX, cache_key, idx, cost=load_ms, pinned=pinned,
+                             meta={"version": region["version"]})
+                return g, idx
+
+            if G is None:
+                # 파일에서 새로 읽은 그래프에는 로컬 OSM 변경 저널을 다시 적용
+                G, index = osm_changes.replay_on_graph(_load_region_graph(region), region["bbox"], store=_store)
+            else:
+                G, index = _store(G)
+            load_ms = (time.perf_counter() - started) * 1000.0
+            with _lock:
+                _stats["loads"] += 1
+                _stats["load_ms_total"] += load_ms
+            print(f"🗺️ 지역 그래프 로딩: {rid} v{region['version']} ({load_ms:.0f}ms)")
+            return G, index
+        finally:
+            with _lock:
+                _loading.pop(cache_key, None)
+            event.set()
+
+
+def loaded_region_keys() -> List[Tuple[int, str]]:
+    """로딩된 (세대, 지역 id) 목록"""
+    return governor.keys(NS_REGION_GRAPH)
+
+
+def peek_region_graph(gen: int, region_id: str) -> Optional[nx.MultiDiGraph]:
+    return governor.peek(NS_REGION_GRAPH, (gen, region_id))
+
+
+def replace_region_graph(gen: int, region: dict, G: nx.MultiDiGraph) -> None:
+    """로딩된 지역 그래프 교체 (노드 좌표 인덱스도 다시 생성)"""
+    cache_key = (gen, region["id"])
+    if governor.replace(NS_REGION_GRAPH, cache_key, G):
+        index = _build_index(G)
+        if not governor.replace(NS_REGION_INDEX, cache_key, index):
+            governor.put(NS_REGION_INDEX, cache_key, index, pinned=region["id"] in CACHE_PINNED_REGIONS)
+
+
+def drop_generation(gen: int) -> int:
+    """더 이상 쓰지 않는 세대의 지역 그래프/인덱스 제거"""
+    removed = governor.remove_where(NS_REGION_GRAPH, lambda k, meta: k[0] == gen)
+    governor.remove_where(NS_REGION_INDEX, lambda k, meta: k[0] == gen)
+    return removed
+
+
+def is_region_loaded(region_id: str, gen: int) -> bool:
+    return governor.contains(NS_REGION_GRAPH, (gen, region_id))
+
+
+def graph_for_bbox(region: dict, south: float, north: float, west: float, east: float,
+                   gen: int) -> nx.MultiDiGraph:
+    """
+    지역 그래프에서 bbox 부분만 잘라낸 요청 전용 그래프 (가장 큰 연결 성분만).
+    사본이므로 edge weight를 기록해도 지역 그래프에 영향 없음.
+    """
+    G, index = _get_region(region, gen)
+    mask = (
+        (index["lat"] >= south) & (index["lat"] <= north)
+        & (index["lng"] >= west) & (index["lng"] <= east)
+    )
+    nodes = index["ids"][mask].tolist()
+    if not nodes:
+        raise OutsideCoverageError("해당 영역에 보행 가능한 도로가 없습니다.")
+    sub = G.subgraph(nodes).copy()
+    return ox.utils_graph.get_largest_component(sub, strongly=False)
+
+
+def stats() -> dict:
+    load_regions()
+    with _lock:
+        counters = dict(_stats)
+    return {
+        "enabled": bool(_regions),
+        "graphs_mb": governor.namespace_bytes(NS_REGION_GRAPH) / 1024 / 1024,
+        "index_mb": governor.namespace_bytes(NS_REGION_INDEX) / 1024 / 1024,
+        "loads": counters["loads"],
+        "rejected": counters["rejected"],
+        "avg_load_ms": counters["load_ms_total"] / counters["loads"] if counters["loads"] else 0.0,
+        "loaded": [f"{rid}@{gen}" for gen, rid in loaded_region_keys()],
+        "regions": [
+            {
+                "id": r["id"],
+                "version": r["version"],
+                "pinned": r["id"] in CACHE_PINNED_REGIONS,
+            }
+            for r in _regions or []
+        ],
+    }
+
+
+# --- 그래프 구축 (오프라인) ---
+
+def build_region_graph(region: dict, network_type: str = "walk") -> str:
+    """지역 bbox 전체를 Overpass에서 받아 graphml로 저장"""
+    ox.settings.log_console = False
+    ox.settings.overpass_rate_limit = True
+    south, north, west, east = region["bbox"]
+    G = ox.graph_from_bbox(
+        north=north,
+        south=south,
+        east=east,
+        west=west,
+        network_type=network_type,
+    )
+    G.graph["region_id"] = region["id"]
+    G.graph["region_version"] = region["version"]
+    os.makedirs(os.path.dirname(region["graph_file"]) or ".", exist_ok=True)
+    ox.save_graphml(G, filepath=region["graph_file"])
+    return region["graph_file"]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "build":
+        print("사용법: python -m app.route.regions build [region_id ...]")
+        sys.exit(1)
+
+    targets = set(sys.argv[2:])
+    for r in load_regions():
+        if targets and r["id"] not in targets:
+            continue
+        print(f"✅ {r['id']} → {build_region_graph(r)}")
@@ -0,0 +1,74 @@
+# backend/app/route/route_cache.py
+
+"""
+경로 계산 결과 캐시 (워커별, cache_governor 메모리 예산 안에서 관리).
+
+- 키: 경로 스냅샷(seq) + 출발/도착 좌표(약 1m 단위 반올림) + 회피 타입 + 반경 + 패널티
+  (스냅샷 교체 전에 시작한 계산이 교체 후에 저장돼도 새 스냅샷 요청에는 쓰이지 않음)
+- 준최적 경로(anytime 탐색)는 요청한 허용 비율(1 + epsilon) 이내일 때만 재사용
+- 마감 시간 초과로 끊긴 결과는 저장하지 않음
+- 항목마다 경로 계산에 쓴 영역(bbox)을 같이 저장 → 영역 단위 무효화
+"""
+
+import os
+from typing import Optional, Tuple
+
+from app.route.cache_governor import governor
+
+ROUTE_CACHE_ENABLED = os.getenv("ROUTE_CACHE_ENABLED", "true").lower() == "true"
+# 좌표 반올림 자릿수 (5 → 약 1m)
+ROUTE_CACHE_COORD_DIGITS = int(os.getenv("ROUTE_CACHE_COORD_DIGITS", "5"))
+
+NS_ROUTE = "route_result"
+
+
+def cache_key(req, snapshot_seq: int) -> Tuple:
+    d = ROUTE_CACHE_COORD_DIGITS
+    avoid = tuple(sorted(set(req.avoid_types)))
+    return (
+        snapshot_seq,
+        round(req.start_lat, d), round(req.start_lng, d),
+        round(req.end_lat, d), round(req.end_lng, d),
+        avoid,
+        float(req.radius_m),
+        tuple(sorted((t, float(req.penalties.get(t, 0.0))) for t in avoid)),
+    )
+
+
+def _allowed_bound(req, default_epsilon: float) -> float:
+    """요청이 허용하는 준최적 비율 (epsilon/deadline 없으면 최적 경로만)"""
+    epsilon = req.epsilon
+    if epsilon is None and req.deadline_ms:
+        epsilon = default_epsilon
+    return 1.0 + (epsilon or 0.0)
+
+
+def get(req, default_epsilon: float, snapshot_seq: int) -> Optional[dict]:
+    if not ROUTE_CACHE_ENABLED:
+        return None
+    result = governor.get(NS_ROUTE, cache_key(req, snapshot_seq))
+    if result is None:
+        return None
+    if result.get("suboptimality_bound", 1.0) > _allowed_bound(req, default_epsilon) + 1e-9:
+        return None
+    return result
+
+
+def put(req, result: dict, bbox: Tuple[float, float, float, float], compute_ms: float,
+        snapshot_seq: int) -> None:
+    if not ROUTE_CACHE_ENABLED or result.get("deadline_exceeded"):
+        return
+    governor.put(NS_ROUTE, cache_key(req, snapshot_seq), result, cost=compute_ms, meta={"bbox": bbox})
+
+
+def invalidate_bbox(south: float, north: float, west: float, east: float) -> int:
+    """영역과 겹치는 경로 계산 결과만 제거"""
+    def overlaps(key, meta):
+        s, n, w, e = meta["bbox"]
+        return not (n < south or s > north or e < west or w > east)
+    return governor.remove_where(NS_ROUTE, overlaps)
+
+
+def drop_snapshot(seq: int) -> int:
+    """정리된 스냅샷의 경로 결과 제거 (다른 스냅샷 결과는 키가 달라 교체 시 지울 필요 없음)"""
+    return governor.remove_where(NS_ROUTE, lambda key, meta: key[0] == seq)
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, field_serializer
-from typing import List, Tuple, Optional, Dict
+from pydantic import BaseModel, Field, field_serializer
+from typing import List, Literal, Tuple, Optional, Dict
 from datetime import datetime
 
 
@@ -14,6 +14,30 @@ class RouteRequest(BaseModel):
     avoid_types: List[str]
     radius_m: float
     penalties: dict
+    # 부하 시 성능 저하 대응 (선택)
+    # - deadline_ms: 경로 탐색에 쓸 시간 예산 (ms). 넘기면 그때까지 찾은 최선의 경로 반환
+    # - epsilon: 허용 준최적 비율 (0.1 → 최적 대비 최대 10% 비용 증가 허용)
+    deadline_ms: Optional[int] = Field(default=None, gt=0)
+    epsilon: Optional[float] = Field(default=None, ge=0)
+
+
+# -----------------------------------------------------
+# 다중 경유지 경로 계산 요청
+# -----------------------------------------------------
+class Waypoint(BaseModel):
+    lat: float
+    lng: float
+    name: Optional[str] = None
+
+
+class MultiStopRouteRequest(BaseModel):
+    stops: List[Waypoint] = Field(min_length=2)  # stops[0] = 출발지
+    avoid_types: List[str]
+    radius_m: float
+    penalties: dict
+    optimize_order: bool = True  # False면 입력 순서 그대로 방문
+    keep_last: bool = False      # True면 마지막 경유지를 도착지로 고정
+    round_trip: bool = False     # True면 출발지로 돌아옴
 
 
 # -----------------------------------------------------
@@ -32,6 +56,19 @@ class UnavoidableItem(BaseModel):
     lng: float
 
 
+# 보행 안내문 한 단계 (/api/directions의 RouteStep과 같은 필드 + 수치값)
+class RouteInstruction(BaseModel):
+    instruction: str
+    distance: str
+    duration: str
+    icon: str
+    warning: str = ""
+    distance_m: float
+    duration_s: float
+    lat: float
+    lng: float
+
+
 # -----------------------------------------------------
 # v3: 경로 계산 결과 (A* 1회 + 상세 리포트)
 # -----------------------------------------------------
@@ -40,7 +77,48 @@ class RouteResponse(BaseModel):
     distance_m: float
     risk_factors: List[str]
     avoided_final: List[str]
+    obstacle_stats: Dict[str, ObstacleStats] = {}  # 원래 선택한 타입별 통계
     message: Optional[str] = None  # 회피 실패 시 보여줄 문구
+    suboptimality_bound: float = 1.0  # 최적 대비 비용 상한 배수 (1.0이면 최적)
+    deadline_exceeded: bool = False   # 마감 시간 초과로 탐색을 조기 종료했는지
+    instructions: List[RouteInstruction] = []  # 경로 기준 보행 안내문
+
+
+# -----------------------------------------------------
+# 다중 경유지 경로 계산 결과
+# -----------------------------------------------------
+class RouteLeg(BaseModel):
+    from_index: int
+    to_index: int
+    route: List[Tuple[float, float]]
+    distance_m: float
+    risk_factors: List[str]
+    obstacle_stats: Dict[str, ObstacleStats]
+    unavoidable: List[UnavoidableItem]
+    instructions: List[RouteInstruction] = []
+
+
+class MultiStopRouteResponse(BaseModel):
+    order: List[int]  # 방문 순서 (stops 인덱스)
+    route: List[Tuple[float, float]]
+    distance_m: float
+    risk_factors: List[str]
+    obstacle_stats: Dict[str, ObstacleStats]  # 전체 경로 기준
+    unavoidable: List[UnavoidableItem]
+    legs: List[RouteLeg]
+
+
+# -----------------------------------------------------
+# 그래프 타일 선로딩 요청
+# -----------------------------------------------------
+class PrefetchRequest(BaseModel):
+    lat: float
+    lng: float
+
+
+# 경로 스냅샷 재구축 요청 (reload_graphs=True면 그래프도 새 세대로 다시 로딩)
+class SnapshotRebuildRequest(BaseModel):
+    reload_graphs: bool = False
 
 
 # -----------------------------------------------------
@@ -78,8 +156,26 @@ class RouteStored(BaseModel):
         from_attributes = True
 
 
+# 저장된 경로 목록 한 항목 (include_geometry=True일 때만 route_points 포함)
+class RouteSummary(BaseModel):
+    id: int
+    start_lat: float
+    start_lng: float
+    end_lat: float
+    end_lng: float
+    distance_m: Optional[float] = None
+    avoided: Optional[str] = None
+    created_at: str
+    route_points: Optional[List[Tuple[float, float]]] = None
+
+
+class MyRoutesPage(BaseModel):
+    items: List[RouteSummary]
+    next_cursor: Optional[str] = None
+
+
 # -----------------------------------------------------
-# 장애물 조회 응답 모델 (변경 없음)
+# 장애물 조회 응답 모델
 # -----------------------------------------------------
 class ObstacleResponse(BaseModel):
     id: int
@@ -87,7 +183,31 @@ class ObstacleResponse(BaseModel):
     lat: float
     lng: float
     confidence: Optional[float]
-    detected_at: str
+    detection_count: int = 1
+    detected_at: Optional[str] = None
 
     class Config:
         from_attributes = True
+
+
+# 줌 단계별 격자 클러스터 (/route/obstacles?zoom= 낮은 줌)
+class ObstacleCluster(BaseModel):
+    lat: float
+    lng: float
+    count: int
+    by_type: Dict[str, int]
+
+
+class ObstacleClustersResponse(BaseModel):
+    mode: Literal["clusters"]
+    zoom: int
+    version: int
+    dataset_version: int
+    clusters: List[ObstacleCluster]
+
+
+class ObstaclePointsResponse(BaseModel):
+    mode: Literal["points"]
+    zoom: int
+    dataset_version: int
+    obstacles: List[ObstacleResponse]
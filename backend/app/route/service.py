@@ -1,26 +1,59 @@
 # backend/app/route/service.py
 
+import base64
 import math
+import os
+import time
+from datetime import datetime
 from typing import List, Dict, Tuple
 from collections import defaultdict
 
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, load_only
 
-from app.route.pathfinding import astar_path_with_penalty, haversine_m
-from app.route.models import RouteResult, Obstacle
+from app.route.pathfinding import astar_path_with_penalty, bbox_for_points, haversine_m
+from app.route import route_cache, snapshots
+from app.route.models import RouteResult, Obstacle, route_points_from
+from app.route.utils import encode_polyline
+
+# deadline_ms만 지정하고 epsilon을 생략했을 때 사용할 기본 허용 준최적 비율
+DEFAULT_ROUTE_EPSILON = float(os.getenv("DEFAULT_ROUTE_EPSILON", "0.1"))
+
+# 내 경로 목록 페이지 크기
+MY_ROUTES_PAGE_DEFAULT = 20
+MY_ROUTES_PAGE_MAX = 100
 
 
 # ---------------------------------------------------------
 # 1) 경로 계산 (DB 저장 없음)
 # ---------------------------------------------------------
 def find_path_from_request(req, db: Session, user_id: int):
-    return find_best_path(req, db, user_id)
+    # 요청이 끝날 때까지 같은 스냅샷(그래프 세대 + 장애물)으로 계산
+    with snapshots.use() as snap:
+        # 같은 스냅샷에서 계산한 최근 결과가 있으면 재사용 (장애물/그래프 변경 시 무효화됨)
+        cached = route_cache.get(req, DEFAULT_ROUTE_EPSILON, snap.seq)
+        if cached is not None:
+            return cached
+
+        started = time.perf_counter()
+        result = find_best_path(req, db, user_id)
+        # 계산 중에 스냅샷이 교체됐으면 저장하지 않음 (이전 스냅샷 키로 넣어 봐야 다시 쓰이지 않음)
+        if snapshots.is_latest(snap):
+            route_cache.put(
+                req,
+                result,
+                bbox=bbox_for_points([(req.start_lat, req.start_lng), (req.end_lat, req.end_lng)]),
+                compute_ms=(time.perf_counter() - started) * 1000.0,
+                snapshot_seq=snap.seq,
+            )
+    return result
 
 
 # ---------------------------------------------------------
 # 2) 사용자가 선택한 경로 저장
 # ---------------------------------------------------------
-def save_route(req, db: Session, user_id: int) -> RouteResult:
+async def save_route(req, db: AsyncSession, user_id: int) -> RouteResult:
     try:
         # avoided 리스트를 문자열로 변환 (빈 리스트 처리)
         avoided_str = ",".join(req.avoided) if req.avoided else ""
@@ -31,48 +64,109 @@ def save_route(req, db: Session, user_id: int) -> RouteResult:
             start_lng=req.start_lng,
             end_lat=req.end_lat,
             end_lng=req.end_lng,
-            route_points=req.route_points,  # JSON 컬럼이므로 자동 직렬화됨
+            route_points=req.route_points,  # encoded polyline으로 저장됨
             distance_m=req.distance_m,
             avoided=avoided_str,
         )
 
         db.add(route_obj)
-        db.commit()
-        db.refresh(route_obj)
+        await db.commit()
+        await db.refresh(route_obj)
         return route_obj
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise e
 
 
 # ---------------------------------------------------------
 # 3) 저장된 경로 삭제
 # ---------------------------------------------------------
-def delete_route(route_id: int, db: Session, user_id: int):
-    route = (
-        db.query(RouteResult)
-        .filter(RouteResult.id == route_id, RouteResult.user_id == user_id)
-        .first()
+async def delete_route(route_id: int, db: AsyncSession, user_id: int):
+    # 행을 불러오지 않고 바로 삭제 (경로 좌표 JSON을 읽지 않음)
+    result = await db.execute(
+        delete(RouteResult)
+        .where(RouteResult.id == route_id, RouteResult.user_id == user_id)
     )
+    await db.commit()
 
-    if not route:
+    if result.rowcount == 0:
         return None
-
-    db.delete(route)
-    db.commit()
     return True
 
 
 # ---------------------------------------------------------
-# 4) 저장된 경로 목록 조회
+# 4) 저장된 경로 목록 조회 (keyset 페이지, 기본은 좌표 제외 요약)
 # ---------------------------------------------------------
-def get_my_routes(db: Session, user_id: int):
-    return (
-        db.query(RouteResult)
-        .filter(RouteResult.user_id == user_id)
-        .order_by(RouteResult.created_at.desc())
-        .all()
+_SUMMARY_COLUMNS = (
+    RouteResult.id, RouteResult.start_lat, RouteResult.start_lng, RouteResult.end_lat, RouteResult.end_lng,
+    RouteResult.distance_m, RouteResult.avoided, RouteResult.created_at,
+)
+
+
+def encode_cursor(created_at: datetime, route_id: int) -> str:
+    """마지막 항목의 (created_at, id) → 불투명 커서 문자열"""
+    raw = f"{created_at.isoformat()}|{route_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """encode_cursor의 역변환. 형식이 잘못되면 ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, route_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(route_id)
+    except Exception:
+        raise ValueError("잘못된 커서입니다.")
+
+
+async def get_my_routes(db: AsyncSession, user_id: int, limit: int = MY_ROUTES_PAGE_DEFAULT,
+                        cursor: str = None, include_geometry: bool = False):
+    """
+    최신순 한 페이지 + 다음 페이지 커서 (없으면 None).
+    (user_id, created_at, id) 인덱스에서 커서 위치부터 limit개만 읽으므로 페이지 위치와 무관하게 일정한 비용.
+    """
+    limit = max(1, min(limit, MY_ROUTES_PAGE_MAX))
+    geometry_columns = (RouteResult.route_polyline, RouteResult.route_points_json)
+    columns = _SUMMARY_COLUMNS + (geometry_columns if include_geometry else ())
+    stmt = (
+        select(RouteResult)
+        .options(load_only(*columns))
+        .where(RouteResult.user_id == user_id)
+        .order_by(RouteResult.created_at.desc(), RouteResult.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor:
+        created_at, route_id = decode_cursor(cursor)
+        stmt = stmt.where(tuple_(RouteResult.created_at, RouteResult.id) < (created_at, route_id))
+
+    result = await db.execute(stmt)
+    routes = list(result.scalars().all())
+    next_cursor = None
+    if len(routes) > limit:
+        routes = routes[:limit]
+        next_cursor = encode_cursor(routes[-1].created_at, routes[-1].id)
+    return routes, next_cursor
+
+
+async def get_route_geometries(db: AsyncSession, user_id: int, route_ids: List[int],
+                               as_polyline: bool = False) -> Dict[int, object]:
+    """
+    여러 저장 경로의 좌표를 한 번에 조회 (본인 경로만) → {id: route_points}
+    as_polyline=True면 디코딩하지 않고 encoded polyline 문자열 그대로 반환 (응답 크기 축소)
+    """
+    if not route_ids:
+        return {}
+    result = await db.execute(
+        select(RouteResult.id, RouteResult.route_polyline, RouteResult.route_points_json)
+        .where(RouteResult.user_id == user_id, RouteResult.id.in_(route_ids))
     )
+    geometries = {}
+    for route_id, polyline, points_json in result.all():
+        if as_polyline:
+            geometries[route_id] = polyline if polyline is not None else encode_polyline(points_json or [])
+        else:
+            geometries[route_id] = route_points_from(polyline, points_json)
+    return geometries
 
 
 # ---------------------------------------------------------
@@ -86,9 +180,8 @@ def get_all_obstacles(db: Session):
 # 5-1) 장애물 존재 여부 확인
 # ---------------------------------------------------------
 def has_obstacles(db: Session) -> bool:
-    """DB에 장애물이 하나라도 있는지 확인"""
-    count = db.query(Obstacle).count()
-    return count > 0
+    """DB에 장애물이 하나라도 있는지 확인 (전체 count 대신 한 행만 조회)"""
+    return db.query(Obstacle.id).first() is not None
 
 
 # ---------------------------------------------------------
@@ -130,22 +223,28 @@ def calculate_stats_for_route(
         east = max(lngs) + margin_deg
         west = min(lngs) - margin_deg
 
-    # 원래 선택한 모든 타입의 장애물 조회
-    obstacles = (
-        db.query(Obstacle)
-        .filter(Obstacle.type.in_(original_avoid_types))
-        .filter(Obstacle.lat >= south, Obstacle.lat <= north)
-        .filter(Obstacle.lng >= west, Obstacle.lng <= east)
-        .all()
-    )
+    # 원래 선택한 모든 타입의 장애물 조회 (경로 계산과 같은 스냅샷)
+    obstacles = snapshots.current().obstacles_in_bbox(original_avoid_types, (south, north, west, east))
+
+    return route_hit_stats(route_coords, obstacles, original_avoid_types, radius_m)
+
 
+def route_hit_stats(
+    route_coords: List[Tuple[float, float]],
+    obs_list: List[Tuple[float, float, str]],
+    original_avoid_types: List[str],
+    radius_m: float,
+) -> Dict[str, Dict[str, int]]:
+    """
+    이미 조회된 (lat, lng, type) 장애물 목록으로 경로 통계 계산 (DB 조회 없음).
+    노드 사이 세그먼트의 중간점까지 검사.
+    """
     # 통계 계산
     type_total = defaultdict(int)
     type_failed = defaultdict(int)
     type_success = defaultdict(int)
 
-    for obs in obstacles:
-        obs_type = obs.type
+    for obs_lat, obs_lng, obs_type in obs_list:
         type_total[obs_type] += 1
         hit = False
 
@@ -153,7 +252,7 @@ def calculate_stats_for_route(
         # 노드뿐만 아니라 노드 사이의 경로(edge)도 고려
         for i in range(len(route_coords)):
             route_lat, route_lng = route_coords[i]
-            d = haversine_m(route_lat, route_lng, obs.lat, obs.lng)
+            d = haversine_m(route_lat, route_lng, obs_lat, obs_lng)
             if d <= radius_m:
                 hit = True
                 break
@@ -166,7 +265,7 @@ def calculate_stats_for_route(
                 for j in range(1, 4):  # 3개의 중간점 체크
                     mid_lat = route_lat + (next_lat - route_lat) * (j / 4.0)
                     mid_lng = route_lng + (next_lng - route_lng) * (j / 4.0)
-                    d_mid = haversine_m(mid_lat, mid_lng, obs.lat, obs.lng)
+                    d_mid = haversine_m(mid_lat, mid_lng, obs_lat, obs_lng)
                     if d_mid <= radius_m:
                         hit = True
                         break
@@ -195,6 +294,14 @@ def find_best_path(req, db, user_id):
     current_avoid = list(req.avoid_types)
     original_avoid_types = list(req.avoid_types)  # 원래 선택한 타입 저장
 
+    # 마감 시간 설정: 요청 시점 기준 절대 시각(time.monotonic)으로 변환
+    epsilon = req.epsilon
+    deadline = None
+    if req.deadline_ms:
+        deadline = time.monotonic() + req.deadline_ms / 1000.0
+        if epsilon is None:
+            epsilon = DEFAULT_ROUTE_EPSILON
+
     while True:
         # 1) 경로 계산
         res = astar_path_with_penalty(
@@ -204,12 +311,17 @@ def find_best_path(req, db, user_id):
             avoid_types=current_avoid,
             radius_m=req.radius_m,
             penalties=req.penalties,
+            epsilon=epsilon,
+            deadline=deadline,
         )
 
         failed = res["risk_factors"]
 
+        # 마감 초과 시 회피 타입을 줄여가며 재탐색하지 않고 현재 경로를 그대로 사용
+        deadline_exceeded = deadline is not None and time.monotonic() >= deadline
+
         # 2) 모든 회피 성공 → 최종 경로에 대해 원래 선택한 모든 타입의 통계 계산
-        if not failed:
+        if not failed or deadline_exceeded:
             # 최종 경로에 대해 원래 선택한 모든 타입의 통계를 다시 계산
             final_stats = calculate_stats_for_route(
                 route_coords=res["route"],
@@ -230,8 +342,11 @@ def find_best_path(req, db, user_id):
                 "route": res["route"],
                 "distance_m": res["distance_m"],
                 "risk_factors": final_risk_factors,
-                "avoided_final": current_avoid,
-                "obstacle_stats": final_stats  # 원래 선택한 모든 타입의 통계
+                "avoided_final": [t for t in current_avoid if t not in failed],
+                "obstacle_stats": final_stats,  # 원래 선택한 모든 타입의 통계
+                "suboptimality_bound": res["suboptimality_bound"],
+                "deadline_exceeded": deadline_exceeded,
+                "instructions": res["build_instructions"](),
             }
 
         # 3) 실패한 회피 제거
@@ -247,7 +362,9 @@ def find_best_path(req, db, user_id):
                 db=db,
                 avoid_types=[],
                 radius_m=req.radius_m,
-                penalties=req.penalties
+                penalties=req.penalties,
+                epsilon=epsilon,
+                deadline=deadline,
             )
 
             # 최종 경로에 대해 원래 선택한 모든 타입의 통계 계산
@@ -271,5 +388,8 @@ def find_best_path(req, db, user_id):
                 "distance_m": final["distance_m"],
                 "risk_factors": final_risk_factors,
                 "avoided_final": [],
-                "obstacle_stats": final_stats  # 원래 선택한 모든 타입의 통계
+                "obstacle_stats": final_stats,  # 원래 선택한 모든 타입의 통계
+                "suboptimality_bound": final["suboptimality_bound"],
+                "deadline_exceeded": deadline is not None and time.monotonic() >= deadline,
+                "instructions": final["build_instructions"](),
             }
@@ -0,0 +1,432 @@
+# backend/app/route/snapshots.py
+
+"""
+버전이 붙은 불변 경로 탐색 스냅샷 (그래프 세대 + 장애물 인덱스) 교체.
+
+- 스냅샷 = (버전, 그래프 세대 번호, 장애물 컬럼 인덱스, 장애물 데이터 버전)
+  edge weight는 요청마다 스냅샷의 그래프 + 장애물 인덱스로 계산하므로 함께 고정됨
+- 요청은 시작할 때 현재 스냅샷을 잡고(use) 끝날 때까지 같은 스냅샷만 사용
+- 새 스냅샷은 백그라운드에서 미리 만든 뒤 포인터만 바꿈(atomic swap)
+  → 진행 중인 요청은 이전 스냅샷으로 끝나고, 새 요청부터 새 스냅샷 사용
+- 그래프 재로딩(reload_graphs)은 새 세대로 현재 캐시된 타일/지역 그래프를 미리 다시 받아 둔 뒤 교체
+  → 교체 직후에도 캐시가 따뜻함 (지연 급증 없음)
+- 이전 세대 그래프는 그 세대를 쓰는 요청이 모두 끝나면 캐시에서 제거
+
+장애물 인덱스는 워커별 컬럼 배열(ObstacleColumns: numpy 위도/경도/타입 코드 + 6자리 셀 구간)
+→ 경로 계산 중 장애물 조회는 DB 없이 메모리에서 처리
+
+여러 워커 동기화: routing_snapshot_state.target_version과 obstacle_dataset_state.version(DB)을
+SNAPSHOT_POLL_S 간격으로 확인 (데이터 버전만 오르면 장애물 인덱스만 다시 만듦),
+각 워커는 routing_workers 테이블에 자기 버전/상태를 기록
+"""
+
+import itertools
+import os
+import socket
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.route import crud, geohash, graph_store, obstacle_changes, regions
+from app.route.cache_governor import governor
+from app.route.models import RoutingSnapshotState, RoutingWorker
+
+SNAPSHOT_POLL_S = float(os.getenv("SNAPSHOT_POLL_S", "10"))
+# 장애물 인덱스 셀 자릿수 (6 → 약 1.2km x 0.6km)
+SNAPSHOT_CELL_PRECISION = 6
+
+NS_SNAPSHOT_OBSTACLES = "snapshot_obstacles"
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+class ObstacleColumns:
+    """
+    장애물 컬럼 배열 (스냅샷마다 하나, 생성 후 변경 금지).
+    6자리 셀 순으로 정렬해 두고 셀별 [시작, 끝) 구간을 cell_ranges에 기록 → bbox 조회는 셀 구간만 잘라 벡터 연산
+    """
+
+    __slots__ = ("lat", "lng", "type_code", "type_names", "type_ids", "cell_ranges")
+
+    def __init__(self, points: List[Tuple[float, float, str, str]]):
+        # (6자리 셀, 타입) 순 정렬
+        points = sorted(points, key=lambda p: (p[3][:SNAPSHOT_CELL_PRECISION], p[2]))
+        self.type_names = tuple(sorted({p[2] for p in points}))
+        self.type_ids = {t: i for i, t in enumerate(self.type_names)}
+        self.lat = np.fromiter((p[0] for p in points), dtype=np.float64, count=len(points))
+        self.lng = np.fromiter((p[1] for p in points), dtype=np.float64, count=len(points))
+        self.type_code = np.fromiter((self.type_ids[p[2]] for p in points), dtype=np.int16, count=len(points))
+
+        self.cell_ranges = {}
+        start = 0
+        for i in range(1, len(points) + 1):
+            if i == len(points) or points[i][3][:SNAPSHOT_CELL_PRECISION] != points[start][3][:SNAPSHOT_CELL_PRECISION]:
+                self.cell_ranges[points[start][3][:SNAPSHOT_CELL_PRECISION]] = (start, i)
+                start = i
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    def select(self, types: Optional[List[str]],
+               bbox: Tuple[float, float, float, float]) -> np.ndarray:
+        """bbox 안(types가 주어지면 해당 타입만) 장애물의 행 번호"""
+        south, north, west, east = bbox
+        ranges = [
+            self.cell_ranges[cell]
+            for cell in geohash.cells_for_bbox(south, north, west, east, SNAPSHOT_CELL_PRECISION)
+            if cell in self.cell_ranges
+        ]
+        if not ranges:
+            return np.empty(0, dtype=np.int64)
+        rows = np.concatenate([np.arange(start, end) for start, end in ranges])
+        lat = self.lat[rows]
+        lng = self.lng[rows]
+        mask = (lat >= south) & (lat <= north) & (lng >= west) & (lng <= east)
+        if types is not None:
+            codes = [self.type_ids[t] for t in set(types) if t in self.type_ids]
+            mask &= np.isin(self.type_code[rows], codes)
+        return rows[mask]
+
+    def points(self, rows: Optional[np.ndarray] = None) -> List[Tuple[float, float, str]]:
+        """행 번호(생략 시 전체) → (lat, lng, type) 목록"""
+        if rows is None:
+            lat, lng, codes = self.lat, self.lng, self.type_code
+        else:
+            lat, lng, codes = self.lat[rows], self.lng[rows], self.type_code[rows]
+        names = self.type_names
+        return [(a, b, names[c]) for a, b, c in zip(lat.tolist(), lng.tolist(), codes.tolist())]
+
+
+class RoutingSnapshot:
+    """불변 스냅샷 (생성 후 속성 변경 금지)"""
+
+    __slots__ = ("seq", "version", "graph_gen", "dataset_version", "created_at", "obstacles", "obstacle_count", "_refs")
+
+    def __init__(self, version: int, graph_gen: int, obstacles: ObstacleColumns, dataset_version: int = 0):
+        # 이 워커에서 만든 순번 (같은 버전을 장애물만 바꿔 다시 만들 수 있으므로 캐시 키는 seq 사용)
+        self.seq = next(_seq)
+        self.version = version
+        self.graph_gen = graph_gen
+        # 장애물 인덱스를 읽기 직전의 obstacle_changes 데이터 버전 (이 버전까지의 변경은 모두 포함)
+        self.dataset_version = dataset_version
+        self.created_at = datetime.utcnow()
+        self.obstacles = obstacles
+        self.obstacle_count = len(obstacles)
+        self._refs = 0
+
+    def obstacles_in_bbox(self, types: Optional[List[str]],
+                          bbox: Tuple[float, float, float, float]) -> List[Tuple[float, float, str]]:
+        """bbox 안의 선택 타입 장애물 (lat, lng, type), types=None이면 전체 타입"""
+        if types is not None and not types:
+            return []
+        return self.obstacles.points(self.obstacles.select(types, bbox))
+
+
+_seq = itertools.count(1)
+_lock = threading.Lock()
+_build_lock = threading.Lock()
+_current: Optional[RoutingSnapshot] = None
+_retired: List[RoutingSnapshot] = []
+_active: ContextVar[Optional[RoutingSnapshot]] = ContextVar("routing_snapshot", default=None)
+
+_poller_started = False
+_wakeup = threading.Event()
+_status = {"state": "ready", "last_error": None, "last_build_ms": 0.0, "built_at": None, "swaps": 0}
+
+
+# --- 조회 ---
+
+def current() -> RoutingSnapshot:
+    """
+    이 요청이 사용할 스냅샷.
+    use() 블록 안이면 그 블록이 잡은 스냅샷, 밖이면 최신 스냅샷.
+    """
+    snap = _active.get()
+    if snap is not None:
+        return snap
+    if _current is None:
+        _initialize()
+    return _current
+
+
+def is_latest(snap: RoutingSnapshot) -> bool:
+    """snap이 아직 최신 스냅샷인지 (use() 블록 안에서도 교체 여부 확인용)"""
+    return _current is snap
+
+
+@contextmanager
+def use():
+    """요청 하나가 끝날 때까지 같은 스냅샷 사용 (중첩 호출 시 바깥 스냅샷 유지)"""
+    outer = _active.get()
+    if outer is not None:
+        yield outer
+        return
+
+    if _current is None:
+        _initialize()
+    # 최신 스냅샷 읽기와 참조 증가를 한 잠금 안에서 (그 사이 교체 + 정리로 세대가 해제되지 않도록)
+    with _lock:
+        snap = _current
+        snap._refs += 1
+    token = _active.set(snap)
+    try:
+        yield snap
+    finally:
+        _active.reset(token)
+        with _lock:
+            snap._refs -= 1
+        _release_retired()
+
+
+# --- 구축 / 교체 ---
+
+def _load_obstacle_index(db: Session) -> ObstacleColumns:
+    return ObstacleColumns(crud.get_obstacle_points(db))
+
+
+def _prewarm_generation(old_gen: int, new_gen: int) -> None:
+    """이전 세대에 캐시돼 있던 타일/지역 그래프를 새 세대로 미리 로딩"""
+    for gen, key in graph_store.cached_tile_keys():
+        if gen == old_gen:
+            graph_store.ensure_tile(key, gen=new_gen)
+
+    regions.reload_regions()
+    for region in regions.load_regions():
+        if regions.is_region_loaded(region["id"], gen=old_gen):
+            regions.get_region_graph(region, gen=new_gen)
+
+
+def build(version: int, reload_graphs: bool = False) -> RoutingSnapshot:
+    """새 스냅샷을 만들어 교체 (같은 워커에서 동시에 하나만)"""
+    global _current
+
+    with _build_lock:
+        db = SessionLocal()
+        try:
+            dataset_version = obstacle_changes.get_version(db)
+        finally:
+            db.close()
+        # 같은 버전 재요청이라도 장애물 데이터가 바뀌었으면 장애물 인덱스만 새로 만들어 교체
+        if (_current is not None and _current.version >= version and not reload_graphs
+                and _current.dataset_version >= dataset_version):
+            return _current
+        if _current is not None:
+            version = max(version, _current.version)
+
+        started = time.perf_counter()
+        _status["state"] = "building"
+        _report_status()
+        try:
+            db = SessionLocal()
+            try:
+                obstacles = _load_obstacle_index(db)
+            finally:
+                db.close()
+
+            old = _current
+            graph_gen = old.graph_gen if old is not None else 0
+            if reload_graphs and old is not None:
+                graph_gen = graph_store.new_generation()
+                _prewarm_generation(old.graph_gen, graph_gen)
+
+            snap = RoutingSnapshot(version=version, graph_gen=graph_gen, obstacles=obstacles,
+                                   dataset_version=dataset_version)
+            governor.put(NS_SNAPSHOT_OBSTACLES, snap.seq, obstacles, pinned=True)
+
+            # 포인터 교체 (이후 새 요청은 새 스냅샷 사용)
+            with _lock:
+                _current = snap
+                if old is not None:
+                    _retired.append(old)
+            _release_retired()
+
+            _status.update(
+                state="ready",
+                last_error=None,
+                last_build_ms=(time.perf_counter() - started) * 1000.0,
+                built_at=snap.created_at,
+                swaps=_status["swaps"] + 1,
+            )
+            print(f"🔁 경로 스냅샷 교체: v{version} (그래프 세대 {graph_gen}, 장애물 {snap.obstacle_count}개, 데이터 버전 {dataset_version})")
+            return snap
+        except Exception as e:
+            _status.update(state="failed", last_error=str(e))
+            traceback.print_exc()
+            raise
+        finally:
+            _report_status()
+
+
+def _release_retired() -> None:
+    """더 이상 쓰는 요청이 없는 이전 스냅샷 정리 (현재 세대와 다른 그래프 세대는 캐시에서 제거)"""
+    with _lock:
+        done = [s for s in _retired if s._refs == 0]
+        if not done:
+            return
+        _retired[:] = [s for s in _retired if s._refs > 0]
+        live_gens = {s.graph_gen for s in _retired}
+        if _current is not None:
+            live_gens.add(_current.graph_gen)
+    from app.route import obstacle_tiles, route_cache, viewport_clusters
+
+    for s in done:
+        governor.remove(NS_SNAPSHOT_OBSTACLES, s.seq)
+        viewport_clusters.drop_snapshot(s.seq)
+        obstacle_tiles.drop_snapshot(s.seq)
+        route_cache.drop_snapshot(s.seq)
+        if s.graph_gen not in live_gens:
+            graph_store.drop_generation(s.graph_gen)
+            regions.drop_generation(s.graph_gen)
+
+
+def _initialize() -> None:
+    """첫 요청: DB 목표 버전으로 스냅샷을 동기 구축 (장애물만 로딩, 그래프는 lazy)"""
+    _start_poller()
+    if _current is not None:
+        return
+    build(_read_target()[0])
+
+
+# --- 워커 간 동기화 ---
+
+def _read_target() -> Tuple[int, bool, int]:
+    """(목표 스냅샷 버전, 그래프 재로딩 여부, 장애물 데이터 버전) — 단일 행 두 개만 읽는 가벼운 조회"""
+    db = SessionLocal()
+    try:
+        dataset_version = obstacle_changes.get_version(db)
+        state = db.get(RoutingSnapshotState, 1)
+        if state is None:
+            return 0, False, dataset_version
+        return state.target_version, bool(state.reload_graphs), dataset_version
+    except Exception as e:
+        print(f"⚠️ 스냅샷 목표 버전 조회 실패: {str(e)}")
+        if _current is None:
+            return 0, False, 0
+        return _current.version, False, _current.dataset_version
+    finally:
+        db.close()
+
+
+def _report_status() -> None:
+    """routing_workers에 이 워커의 버전/상태 기록"""
+    db = SessionLocal()
+    try:
+        row = db.get(RoutingWorker, WORKER_ID)
+        if row is None:
+            row = RoutingWorker(worker_id=WORKER_ID)
+            db.add(row)
+        snap = _current
+        row.snapshot_version = snap.version if snap is not None else 0
+        row.graph_generation = snap.graph_gen if snap is not None else 0
+        row.status = _status["state"]
+        row.last_error = _status["last_error"]
+        row.built_at = _status["built_at"]
+        row.heartbeat_at = datetime.utcnow()
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"⚠️ 워커 상태 기록 실패: {str(e)}")
+    finally:
+        db.close()
+
+
+def _poll_loop() -> None:
+    while True:
+        _wakeup.wait(timeout=SNAPSHOT_POLL_S)
+        _wakeup.clear()
+        try:
+            target, reload_graphs, dataset_version = _read_target()
+            if _current is None or target > _current.version:
+                build(target, reload_graphs=reload_graphs)
+            elif dataset_version > _current.dataset_version:
+                # 다른 워커/프로세스가 장애물을 바꿈 → 장애물 인덱스만 새로 (그래프 세대 유지)
+                build(_current.version)
+            else:
+                _report_status()
+        except Exception as e:
+            print(f"⚠️ 스냅샷 동기화 실패: {str(e)}")
+
+
+def _start_poller() -> None:
+    global _poller_started
+    with _lock:
+        if _poller_started:
+            return
+        _poller_started = True
+    threading.Thread(target=_poll_loop, name="snapshot-poller", daemon=True).start()
+
+
+def request_rebuild(db: Session, reload_graphs: bool = False, wait: bool = False) -> int:
+    """
+    새 스냅샷 버전 요청 (모든 워커 대상).
+    - 목표 버전을 DB에 기록 → 다른 워커는 다음 확인 주기에 재구축
+    - 이 워커는 즉시 재구축 (wait=True면 끝날 때까지 대기, 아니면 백그라운드)
+    반환: 새 목표 버전
+    """
+    state = db.get(RoutingSnapshotState, 1)
+    if state is None:
+        state = RoutingSnapshotState(id=1, target_version=0)
+        db.add(state)
+    state.target_version = (state.target_version or 0) + 1
+    state.reload_graphs = reload_graphs
+    state.requested_at = datetime.utcnow()
+    try:
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    target = state.target_version
+
+    _start_poller()
+    if wait:
+        build(target, reload_graphs=reload_graphs)
+    else:
+        _wakeup.set()
+    return target
+
+
+def list_workers(db: Session) -> List[dict]:
+    state = db.get(RoutingSnapshotState, 1)
+    target = state.target_version if state is not None else 0
+    rows = db.query(RoutingWorker).order_by(RoutingWorker.worker_id).all()
+    return [
+        {
+            "worker_id": r.worker_id,
+            "snapshot_version": r.snapshot_version,
+            "graph_generation": r.graph_generation,
+            "status": r.status,
+            "up_to_date": r.snapshot_version >= target,
+            "last_error": r.last_error,
+            "built_at": r.built_at.isoformat() if r.built_at else None,
+            "heartbeat_at": r.heartbeat_at.isoformat() if r.heartbeat_at else None,
+        }
+        for r in rows
+    ]
+
+
+def stats() -> dict:
+    snap = _current
+    with _lock:
+        retired = [{"version": s.version, "in_flight": s._refs} for s in _retired]
+        in_flight = snap._refs if snap is not None else 0
+    return {
+        "worker_id": WORKER_ID,
+        "version": snap.version if snap is not None else None,
+        "graph_generation": snap.graph_gen if snap is not None else None,
+        "dataset_version": snap.dataset_version if snap is not None else None,
+        "obstacles": snap.obstacle_count if snap is not None else 0,
+        "in_flight": in_flight,
+        "retired": retired,
+        "state": _status["state"],
+        "last_error": _status["last_error"],
+        "last_build_ms": _status["last_build_ms"],
+        "swaps": _status["swaps"],
+    }
@@ -5,6 +5,8 @@
 나중에 osmnx, networkx, haversine 등을 이곳에 구현할 예정.
 """
 
+import math
+
 def compute_distance(point1: tuple, point2: tuple) -> float:
     """
     두 GPS 좌표 간의 단순 유클리드 거리 계산 (임시).
@@ -13,3 +15,92 @@ def compute_distance(point1: tuple, point2: tuple) -> float:
     lat1, lon1 = point1
     lat2, lon2 = point2
     return ((lat1 - lat2)**2 + (lon1 - lon2)**2) ** 0.5
+
+
+# --- 거리 계산 (meter) ---
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    위도/경도 두 점 사이의 거리(m)를 계산.
+    """
+    R = 6371000  # 지구 반지름(m)
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = math.radians(lat2 - lat1)
+    dlambda = math.radians(lon2 - lon1)
+
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * R * math.asin(math.sqrt(a))
+
+
+# --- 표시용 포맷 (보행 안내문 / 지도 길찾기 응답 공용) ---
+
+def format_distance(meters: int) -> str:
+    """거리를 포맷팅"""
+    if meters < 1000:
+        return f"{meters}m"
+    else:
+        return f"{meters/1000:.1f}km"
+
+
+def format_duration(seconds: int) -> str:
+    """시간을 포맷팅"""
+    minutes = seconds // 60
+    if minutes < 60:
+        return f"{minutes}분"
+    else:
+        hours = minutes // 60
+        remaining_minutes = minutes % 60
+        return f"{hours}시간 {remaining_minutes}분"
+
+
+# -------------------------------------------------------------
+# 경로 좌표 압축: Google encoded polyline
+# -------------------------------------------------------------
+def encode_polyline(points, precision: int = 6) -> str:
+    """
+    (lat, lng) 좌표 리스트를 Google encoded polyline 문자열로 인코딩.
+    precision=6 → 1e-6도(약 0.1m) 단위.
+    """
+    factor = 10 ** precision
+    result = []
+    prev_lat = prev_lng = 0
+
+    for lat, lng in points:
+        ilat = int(round(lat * factor))
+        ilng = int(round(lng * factor))
+        for delta in (ilat - prev_lat, ilng - prev_lng):
+            value = ~(delta << 1) if delta < 0 else (delta << 1)
+            while value >= 0x20:
+                result.append(chr((0x20 | (value & 0x1F)) + 63))
+                value >>= 5
+            result.append(chr(value + 63))
+        prev_lat, prev_lng = ilat, ilng
+
+    return "".join(result)
+
+
+def decode_polyline(encoded: str, precision: int = 6):
+    """encode_polyline의 역변환: [(lat, lng), ...] 반환"""
+    factor = 10 ** precision
+    points = []
+    index = lat = lng = 0
+    length = len(encoded)
+
+    while index < length:
+        deltas = []
+        for _ in range(2):
+            shift = value = 0
+            while True:
+                b = ord(encoded[index]) - 63
+                index += 1
+                value |= (b & 0x1F) << shift
+                shift += 5
+                if b < 0x20:
+                    break
+            deltas.append(~(value >> 1) if value & 1 else (value >> 1))
+        lat += deltas[0]
+        lng += deltas[1]
+        points.append((lat / factor, lng / factor))
+
+    return points
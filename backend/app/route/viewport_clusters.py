@@ -0,0 +1,131 @@
+# backend/app/route/viewport_clusters.py
+
+"""
+지도 줌 단계별 장애물 클러스터 (GET /route/obstacles?zoom=).
+
+- 줌 z의 격자 한 칸 = OBSTACLE_CLUSTER_CELL_PX 픽셀 (256px 타일 기준, 경도 방향)
+  → 화면 한 장에 나오는 클러스터 수는 화면 해상도로 제한되고, 장애물 수와는 무관
+- 격자는 줌이 하나 낮아질 때마다 두 배로 커지고 원점이 같음 → 상위 칸 = (iy // 2, ix // 2)
+  가장 세밀한 줌만 장애물에서 만들고 나머지는 한 단계씩 합쳐 계층 구성
+- 경로 스냅샷의 장애물 인덱스로 만들고 스냅샷별(seq)로 cache_governor에 캐시
+  (스냅샷이 바뀌면 다시 만들고, 이전 것은 스냅샷 정리 시 제거)
+- OBSTACLE_CLUSTER_MAX_ZOOM 이상에서는 클러스터 대신 개별 장애물 반환 (api에서 DB 조회)
+"""
+
+import math
+import os
+import threading
+import time
+from typing import Dict, Tuple
+
+from app.route import snapshots
+from app.route.cache_governor import governor
+
+# 이 줌 이상이면 개별 장애물
+OBSTACLE_CLUSTER_MAX_ZOOM = int(os.getenv("OBSTACLE_CLUSTER_MAX_ZOOM", "17"))
+# 클러스터 격자 한 칸의 화면 크기 (픽셀)
+OBSTACLE_CLUSTER_CELL_PX = int(os.getenv("OBSTACLE_CLUSTER_CELL_PX", "64"))
+
+NS_OBSTACLE_CLUSTERS = "obstacle_clusters"
+
+_build_lock = threading.Lock()
+
+
+def cell_size_deg(zoom: int) -> float:
+    """줌 z 격자 한 칸의 크기 (도)"""
+    return OBSTACLE_CLUSTER_CELL_PX * 360.0 / (256.0 * (1 << zoom))
+
+
+def _cell_index(lat: float, lng: float, size: float) -> Tuple[int, int]:
+    return int(math.floor((lat + 90.0) / size)), int(math.floor((lng + 180.0) / size))
+
+
+def _build_levels(snap) -> Dict[int, dict]:
+    """
+    줌별 {(iy, ix): [개수, 위도 합, 경도 합, {타입: 개수}]}
+    가장 세밀한 줌(OBSTACLE_CLUSTER_MAX_ZOOM - 1)부터 만들고 위로 합침
+    """
+    finest = OBSTACLE_CLUSTER_MAX_ZOOM - 1
+    size = cell_size_deg(finest)
+    level = {}
+    for lat, lng, t in snap.obstacles.points():
+        key = _cell_index(lat, lng, size)
+        agg = level.get(key)
+        if agg is None:
+            agg = level[key] = [0, 0.0, 0.0, {}]
+        agg[0] += 1
+        agg[1] += lat
+        agg[2] += lng
+        agg[3][t] = agg[3].get(t, 0) + 1
+
+    levels = {finest: level}
+    for zoom in range(finest - 1, -1, -1):
+        parent = {}
+        for (iy, ix), (count, sum_lat, sum_lng, by_type) in levels[zoom + 1].items():
+            agg = parent.get((iy // 2, ix // 2))
+            if agg is None:
+                agg = parent[(iy // 2, ix // 2)] = [0, 0.0, 0.0, {}]
+            agg[0] += count
+            agg[1] += sum_lat
+            agg[2] += sum_lng
+            for t, n in by_type.items():
+                agg[3][t] = agg[3].get(t, 0) + n
+        levels[zoom] = parent
+    return levels
+
+
+def _levels_for(snap) -> Dict[int, dict]:
+    levels = governor.get(NS_OBSTACLE_CLUSTERS, snap.seq)
+    if levels is not None:
+        return levels
+    with _build_lock:
+        levels = governor.peek(NS_OBSTACLE_CLUSTERS, snap.seq)
+        if levels is not None:
+            return levels
+        started = time.perf_counter()
+        levels = _build_levels(snap)
+        build_ms = (time.perf_counter() - started) * 1000.0
+        governor.put(NS_OBSTACLE_CLUSTERS, snap.seq, levels, cost=build_ms)
+        print(f"🗺️ 장애물 클러스터 계층 구축: 스냅샷 v{snap.version} ({build_ms:.0f}ms)")
+        return levels
+
+
+def clusters_in_bbox(south: float, north: float, west: float, east: float, zoom: int) -> dict:
+    """bbox 안의 줌 z 클러스터 (칸 안 장애물의 평균 위치, 개수, 타입별 개수)"""
+    snap = snapshots.current()
+    zoom = max(0, min(zoom, OBSTACLE_CLUSTER_MAX_ZOOM - 1))
+    level = _levels_for(snap)[zoom]
+    size = cell_size_deg(zoom)
+    iy0, ix0 = _cell_index(south, west, size)
+    iy1, ix1 = _cell_index(north, east, size)
+
+    # 정상적인 화면 영역이면 칸 범위를 훑고, 범위가 비정상적으로 크면 비어 있지 않은 칸만 확인
+    span = (iy1 - iy0 + 1) * (ix1 - ix0 + 1)
+    if span <= len(level):
+        keys = ((iy, ix) for iy in range(iy0, iy1 + 1) for ix in range(ix0, ix1 + 1))
+    else:
+        keys = (k for k in level if iy0 <= k[0] <= iy1 and ix0 <= k[1] <= ix1)
+
+    clusters = []
+    for key in keys:
+        agg = level.get(key)
+        if agg is None:
+            continue
+        count, sum_lat, sum_lng, by_type = agg
+        clusters.append({
+            "lat": sum_lat / count,
+            "lng": sum_lng / count,
+            "count": count,
+            "by_type": dict(by_type),
+        })
+    return {
+        "mode": "clusters",
+        "zoom": zoom,
+        "version": snap.version,
+        "dataset_version": snap.dataset_version,
+        "clusters": clusters,
+    }
+
+
+def drop_snapshot(seq: int) -> None:
+    governor.remove(NS_OBSTACLE_CLUSTERS, seq)
@@ -0,0 +1,209 @@
+# backend/benchmarks/bench_serialization.py
+
+"""
+무거운 경로/장애물 응답의 JSON 직렬화 벤치마크.
+
+- 이전: dict 그대로 반환 → jsonable_encoder (순수 파이썬 재귀) + 표준 json (JSONResponse)
+- 이후: response_model(pydantic-core 검증/직렬화) + ORJSONResponse
+- 같은 payload로 (1) 직렬화 단계만, (2) TestClient 요청 전체 시간을 재고
+  요청 시간 중 직렬화 비중을 출력 (DB / 경로 탐색 없이 응답 경로만 측정)
+
+실행 (backend 디렉터리에서):
+    python -m benchmarks.bench_serialization
+    python -m benchmarks.bench_serialization --points 5000 --repeat 50
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from datetime import datetime
+from typing import Callable, List, Union
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import APIRoute, serialize_response
+from fastapi.testclient import TestClient
+
+from app.route import schemas
+
+
+# --- payload (실제 응답과 같은 형태) ---
+
+def route_find_payload(points: int) -> dict:
+    lat, lng = 37.5665, 126.9780
+    route = []
+    for _ in range(points):
+        lat += random.uniform(-1e-4, 1e-4)
+        lng += random.uniform(-1e-4, 1e-4)
+        route.append((lat, lng))
+    instructions = [
+        {
+            "instruction": "좌회전 후 보행로 50m 이동",
+            "distance": "50m",
+            "duration": "1분",
+            "icon": "⬅️",
+            "warning": "",
+            "distance_m": 50.0,
+            "duration_s": 38.5,
+            "lat": route[i][0],
+            "lng": route[i][1],
+        }
+        for i in range(0, points, 25)
+    ]
+    return {
+        "route": route,
+        "distance_m": 1234.5,
+        "risk_factors": ["pole"],
+        "avoided_final": ["bollard"],
+        "obstacle_stats": {
+            "pole": {"total": 12, "success": 10, "failed": 2},
+            "bollard": {"total": 4, "success": 4, "failed": 0},
+        },
+        "suboptimality_bound": 1.0,
+        "deadline_exceeded": False,
+        "instructions": instructions,
+    }
+
+
+def my_routes_payload(items: int, points: int) -> dict:
+    created = datetime.utcnow().isoformat()
+    return {
+        "items": [
+            {
+                "id": i,
+                "start_lat": 37.5665,
+                "start_lng": 126.9780,
+                "end_lat": 37.5700,
+                "end_lng": 126.9820,
+                "distance_m": 812.3,
+                "avoided": "pole,bollard",
+                "created_at": created,
+                "route_points": route_find_payload(points)["route"],
+            }
+            for i in range(items)
+        ],
+        "next_cursor": "MjAyNS0wMS0wMVQwMDowMDowMHwxMjM",
+    }
+
+
+def obstacles_payload(count: int) -> dict:
+    detected = datetime.utcnow().isoformat()
+    return {
+        "mode": "points",
+        "zoom": 18,
+        "dataset_version": 42,
+        "obstacles": [
+            {
+                "id": i,
+                "type": random.choice(["pole", "bollard", "cone", "kickboard"]),
+                "lat": 37.5665 + random.uniform(-0.005, 0.005),
+                "lng": 126.9780 + random.uniform(-0.005, 0.005),
+                "confidence": random.uniform(0.5, 1.0),
+                "detection_count": random.randint(1, 20),
+                "detected_at": detected,
+            }
+            for i in range(count)
+        ],
+    }
+
+
+# --- 측정 ---
+
+def _median_ms(fn: Callable[[], object], repeat: int) -> float:
+    fn()  # 워밍업
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000.0)
+    return statistics.median(samples)
+
+
+def _build_app(payload: dict, response_model, exclude_unset: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/legacy")
+    async def legacy():
+        return payload
+
+    @app.get(
+        "/typed",
+        response_model=response_model,
+        response_model_exclude_unset=exclude_unset,
+        response_class=ORJSONResponse,
+    )
+    async def typed():
+        return payload
+
+    return app
+
+
+def _route(app: FastAPI, path: str) -> APIRoute:
+    return next(r for r in app.routes if isinstance(r, APIRoute) and r.path == path)
+
+
+def bench_case(name: str, payload: dict, response_model, repeat: int, exclude_unset: bool = False) -> None:
+    app = _build_app(payload, response_model, exclude_unset)
+    typed_route = _route(app, "/typed")
+    loop = asyncio.new_event_loop()
+
+    def legacy_serialize():
+        content = loop.run_until_complete(serialize_response(response_content=payload))
+        return JSONResponse(content).body
+
+    def typed_serialize():
+        content = loop.run_until_complete(serialize_response(
+            field=typed_route.response_field,
+            response_content=payload,
+            exclude_unset=exclude_unset,
+        ))
+        return ORJSONResponse(content).body
+
+    # 두 경로의 결과가 같은 내용인지 먼저 확인 (응답 모델은 기본값 필드(message 등)가 추가될 수 있음)
+    legacy_body, typed_body = json.loads(legacy_serialize()), json.loads(typed_serialize())
+    assert {k: typed_body[k] for k in legacy_body} == legacy_body, f"{name}: 응답 내용이 다름"
+
+    results = []
+    with TestClient(app) as client:
+        for label, serialize, path in (
+            ("이전 (jsonable_encoder + json)", legacy_serialize, "/legacy"),
+            ("이후 (response_model + orjson)", typed_serialize, "/typed"),
+        ):
+            serialize_ms = _median_ms(serialize, repeat)
+            request_ms = _median_ms(lambda: client.get(path), repeat)
+            size_kb = len(serialize()) / 1024.0
+            results.append((label, serialize_ms, request_ms, size_kb))
+    loop.close()
+
+    print(f"\n📦 {name}")
+    print(f"  {'':32} {'직렬화(ms)':>10} {'요청 전체(ms)':>13} {'비중':>6} {'크기(KB)':>9}")
+    for label, serialize_ms, request_ms, size_kb in results:
+        share = serialize_ms / request_ms * 100.0 if request_ms else 0.0
+        print(f"  {label:32} {serialize_ms:10.2f} {request_ms:13.2f} {share:5.0f}% {size_kb:9.1f}")
+    before, after = results[0][1], results[1][1]
+    print(f"  → 직렬화 {before / after:.1f}배 빠름")
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="경로/장애물 응답 직렬화 벤치마크")
+    parser.add_argument("--points", type=int, default=1000, help="/route/find 경로 좌표 수")
+    parser.add_argument("--obstacles", type=int, default=2000, help="/route/obstacles 장애물 수")
+    parser.add_argument("--routes", type=int, default=20, help="/route/my 한 페이지 경로 수 (좌표 포함)")
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args(argv)
+
+    random.seed(0)
+    bench_case(f"/route/find ({args.points} points)", route_find_payload(args.points),
+               schemas.RouteResponse, args.repeat)
+    bench_case(f"/route/my?include_geometry=true ({args.routes} routes × 200 points)",
+               my_routes_payload(args.routes, 200), schemas.MyRoutesPage, args.repeat, exclude_unset=True)
+    bench_case(f"/route/obstacles?zoom=18 ({args.obstacles} obstacles)", obstacles_payload(args.obstacles),
+               Union[List[schemas.ObstacleResponse], schemas.ObstacleClustersResponse,
+                     schemas.ObstaclePointsResponse], args.repeat)
+
+
+if __name__ == "__main__":
+    main()
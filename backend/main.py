@@ -3,10 +3,17 @@
 from fastapi import FastAPI
 from app.auth import models
 from app import database
+from app import db_metrics
 from app.auth import api
+from app.auth.utils import auth_cache_stats
+from app.auth import hashing
 from app.route import api as route_api
 from app.route import models as route_models
+from app.route import crud as route_crud
 from app.map import api as map_api
+from app.route.admission import route_admission
+from app.route import graph_store, osm_changes, prefetch, regions, snapshots
+from app.route.cache_governor import governor
 
 # FastAPI 인스턴스
 app = FastAPI()
@@ -98,6 +105,11 @@ app.add_middleware(CustomCORSMiddleware)
 # DB 테이블 생성
 models.Base.metadata.create_all(bind=database.engine)
 route_models.Base.metadata.create_all(bind=database.engine)
+route_crud.ensure_obstacle_spatial_index(database.engine)
+route_crud.ensure_route_geometry_columns(database.engine)
+route_crud.ensure_route_indexes(database.engine)
+route_crud.ensure_poi_route_columns(database.engine)
+route_crud.ensure_obstacle_change_columns(database.engine)
 
 
 # 라우터 등록
@@ -111,4 +123,26 @@ def root():
 
 @app.get("/health")
 def health():
-    return {"ok": True}
\ No newline at end of file
+    return {"ok": True}
+
+# 워커별 운영 지표 (async: 경로 계산 폭주 중에도 스레드풀을 기다리지 않음)
+@app.get("/metrics")
+async def metrics():
+    return {
+        "route_admission": route_admission.stats(),
+        "graph_cache": graph_store.stats(),
+        "prefetch": prefetch.stats(),
+        "regions": regions.stats(),
+        "cache": governor.stats(),
+        "osm_changes": osm_changes.stats(),
+        "snapshots": snapshots.stats(),
+        "db": db_metrics.stats(),
+        "auth_cache": auth_cache_stats(),
+        "password_hashing": hashing.stats(),
+    }
+
+
+# 캐시 메모리 점유 현황 (항목별 크기/고정 여부, detail=true면 항목 목록 포함)
+@app.get("/metrics/cache")
+async def cache_metrics(detail: bool = False):
+    return governor.stats(detail=detail)
\ No newline at end of file
@@ -0,0 +1,34 @@
+# backend/tests/conftest.py
+
+"""
+테스트 공통 설정.
+
+- app.database는 import 시 DATABASE_URL로 엔진을 만들므로 앱 모듈보다 먼저 환경 변수를 설정
+  (임시 디렉토리의 SQLite 파일, .env보다 우선)
+- db: 테스트마다 테이블을 새로 만들고 끝나면 삭제하는 동기 세션
+"""
+
+import os
+import tempfile
+
+_tmp_dir = tempfile.mkdtemp(prefix="wayfriend-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp_dir, 'test.db')}"
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ["DB_ECHO"] = "false"
+
+import pytest  # noqa: E402
+
+import app.auth.models  # noqa: E402,F401  (users 테이블 등록)
+import app.route.models  # noqa: E402,F401
+from app.database import Base, SessionLocal, engine  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
@@ -0,0 +1,50 @@
+# backend/tests/test_geohash.py
+
+import pytest
+
+from app.route import geohash
+
+
+def test_encode_known_cell():
+    # 서울시청 부근
+    assert geohash.encode(37.5665, 126.9780, 6) == "wydm9q"
+    assert geohash.encode(37.5665, 126.9780).startswith("wydm9q")
+    assert len(geohash.encode(37.5665, 126.9780)) == geohash.CELL_PRECISION
+
+
+def test_cell_bbox_contains_point():
+    cell = geohash.encode(37.5665, 126.9780, 7)
+    south, north, west, east = geohash.cell_bbox(cell)
+    assert south <= 37.5665 <= north
+    assert west <= 126.9780 <= east
+
+
+def test_prefix_range_covers_only_prefixed_cells():
+    # 전체 자릿수(CELL_PRECISION) 셀 키 기준 닫힌 범위 [lo, hi]
+    lo, hi = geohash.prefix_range("wydm")
+    assert len(lo) == len(hi) == geohash.CELL_PRECISION
+    inside = [geohash.encode(37.5665, 126.9780), lo, hi]
+    outside = ["wydk" + "z" * (geohash.CELL_PRECISION - 4), "wydn" + "0" * (geohash.CELL_PRECISION - 4)]
+    assert all(lo <= cell <= hi for cell in inside)
+    assert not any(lo <= cell <= hi for cell in outside)
+
+
+def test_cells_for_bbox_covers_bbox():
+    south, north, west, east = 37.56, 37.57, 126.97, 126.99
+    cells = geohash.cells_for_bbox(south, north, west, east, 6)
+    assert len(cells) == len(set(cells))
+    assert len(cells) == geohash.count_cells_for_bbox(south, north, west, east, 6)
+    for lat, lng in ((south, west), (north, east), (37.565, 126.98)):
+        assert geohash.encode(lat, lng, 6) in cells
+
+
+def test_cells_for_bbox_single_point():
+    cells = geohash.cells_for_bbox(37.5665, 37.5665, 126.978, 126.978, 6)
+    assert cells == [geohash.encode(37.5665, 126.978, 6)]
+
+
+def test_cells_for_bbox_rejects_before_listing():
+    # 서울 전체 × 7자리 → 수만 개, 목록을 만들기 전에 거절
+    with pytest.raises(ValueError):
+        geohash.cells_for_bbox(37.4, 37.7, 126.8, 127.2, 7, max_cells=256)
+    assert geohash.count_cells_for_bbox(37.4, 37.7, 126.8, 127.2, 7) > 256
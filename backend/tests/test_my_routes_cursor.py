@@ -0,0 +1,58 @@
+# backend/tests/test_my_routes_cursor.py
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import database
+from app.auth.models import User
+from app.route import service
+from app.route.models import RouteResult
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2025, 3, 1, 12, 30, 45, 123456)
+    cursor = service.encode_cursor(created_at, 42)
+    assert "=" not in cursor
+    assert service.decode_cursor(cursor) == (created_at, 42)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", "MjAyNS0wMS0wMQ", "!!!"])
+def test_cursor_invalid(cursor):
+    with pytest.raises(ValueError):
+        service.decode_cursor(cursor)
+
+
+def _all_pages(user_id: int, limit: int):
+    async def run():
+        pages, cursor = [], None
+        try:
+            while True:
+                async with database.AsyncSessionLocal() as session:
+                    routes, cursor = await service.get_my_routes(session, user_id, limit=limit, cursor=cursor)
+                pages.append([r.id for r in routes])
+                if cursor is None:
+                    return pages
+        finally:
+            await database.async_engine.dispose()
+
+    return asyncio.run(run())
+
+
+def test_pages_are_ordered_and_complete_with_ties(db):
+    # 같은 created_at이 여러 개여도 (created_at, id) 순으로 빠짐/중복 없이 이어짐
+    db.add_all([User(id=1, email="a@example.com"), User(id=2, email="b@example.com")])
+    base = datetime(2025, 1, 1)
+    stamps = [base, base, base, base + timedelta(seconds=1), base + timedelta(seconds=1), base - timedelta(days=1)]
+    for i, created_at in enumerate(stamps, start=1):
+        route = RouteResult(id=i, user_id=1, start_lat=0, start_lng=0, end_lat=0, end_lng=0, created_at=created_at)
+        route.route_points = [[0.0, 0.0]]
+        db.add(route)
+    other = RouteResult(id=99, user_id=2, start_lat=0, start_lng=0, end_lat=0, end_lng=0, created_at=base)
+    other.route_points = [[0.0, 0.0]]
+    db.add(other)
+    db.commit()
+
+    pages = _all_pages(user_id=1, limit=2)
+    assert pages == [[5, 4], [3, 2], [1, 6]]
@@ -0,0 +1,79 @@
+# backend/tests/test_obstacle_changes.py
+
+from app.route import obstacle_changes
+
+BBOX = (37.0, 37.1, 127.0, 127.1)
+INSIDE = (37.05, 127.05)
+OUTSIDE = (37.5, 127.5)
+
+
+def _change(op, obstacle_id, at, prev=None, count=1):
+    return {"op": op, "obstacle_id": obstacle_id, "type": "pole", "lat": at[0], "lng": at[1],
+            "detection_count": count,
+            "prev_lat": prev[0] if prev else None, "prev_lng": prev[1] if prev else None}
+
+
+def _record(db, *changes):
+    version = obstacle_changes.record_changes(db, list(changes))
+    db.commit()
+    return version
+
+
+def _by_id(result):
+    return {c["id"]: c for c in result["changes"]}
+
+
+def test_no_changes_since_current(db):
+    v = _record(db, _change("insert", 1, INSIDE))
+    result = obstacle_changes.get_changes(db, v)
+    assert result == {"version": v, "since": v, "reset": False, "changes": []}
+
+
+def test_coalesces_to_last_state(db):
+    v0 = _record(db, _change("insert", 9, INSIDE))
+    _record(db, _change("insert", 1, INSIDE), _change("update", 9, INSIDE, count=2))
+    _record(db, _change("update", 1, INSIDE, count=3), _change("insert", 2, INSIDE))
+    v3 = _record(db, _change("delete", 2, INSIDE))
+
+    result = obstacle_changes.get_changes(db, v0)
+    changes = _by_id(result)
+    assert result["version"] == v3 and not result["reset"]
+    assert len(result["changes"]) == 3
+    # 구간 안에서 생긴 장애물의 update는 insert로 유지
+    assert changes[1]["op"] == "insert" and changes[1]["detection_count"] == 3
+    # 구간 전부터 있던 장애물은 update
+    assert changes[9]["op"] == "update" and changes[9]["detection_count"] == 2
+    assert changes[2]["op"] == "delete"
+
+
+def test_bbox_reports_moved_out_as_delete(db):
+    v0 = _record(db, _change("insert", 1, INSIDE), _change("insert", 2, OUTSIDE))
+    _record(db, _change("update", 1, OUTSIDE, prev=INSIDE), _change("update", 2, INSIDE, prev=OUTSIDE))
+
+    changes = _by_id(obstacle_changes.get_changes(db, v0, BBOX))
+    assert changes[1]["op"] == "delete"  # 영역 밖으로 옮겨짐
+    assert changes[2]["op"] == "update"  # 영역 안으로 옮겨짐
+
+
+def test_bbox_skips_unrelated_changes(db):
+    v0 = _record(db, _change("insert", 1, INSIDE))
+    _record(db, _change("insert", 2, OUTSIDE), _change("update", 3, OUTSIDE, prev=OUTSIDE))
+    assert obstacle_changes.get_changes(db, v0, BBOX)["changes"] == []
+
+
+def test_reset_when_history_is_gone(db, monkeypatch):
+    monkeypatch.setattr(obstacle_changes, "OBSTACLE_CHANGELOG_KEEP", 2)
+    for i in range(5):
+        _record(db, _change("insert", i, INSIDE))
+    current = obstacle_changes.get_version(db)
+
+    assert obstacle_changes.get_changes(db, 1)["reset"]
+    assert obstacle_changes.get_changes(db, current + 1)["reset"]
+    recent = obstacle_changes.get_changes(db, current - 1)
+    assert not recent["reset"] and [c["id"] for c in recent["changes"]] == [4]
+
+
+def test_reset_when_too_many_changes(db, monkeypatch):
+    monkeypatch.setattr(obstacle_changes, "OBSTACLE_CHANGES_MAX", 2)
+    _record(db, *(_change("insert", i, INSIDE) for i in range(3)))
+    assert obstacle_changes.get_changes(db, 0)["reset"]
@@ -0,0 +1,82 @@
+# backend/tests/test_obstacle_clusters.py
+
+from datetime import datetime
+
+import pytest
+
+from app.route import obstacle_changes
+from app.route.models import Obstacle, ObstacleChange
+from app.route.obstacle_clusters import OBSTACLE_MERGE_RADIUS_M, merge_detections
+from app.route.utils import haversine_m
+
+LAT, LNG = 37.5665, 126.9780
+M_PER_DEG_LAT = 111320.0
+
+
+def _detection(dlat_m: float, obstacle_type: str = "bollard", confidence: float = 0.5, **extra) -> dict:
+    return {"type": obstacle_type, "lat": LAT + dlat_m / M_PER_DEG_LAT, "lng": LNG,
+            "confidence": confidence, "detected_at": datetime(2025, 1, 1), **extra}
+
+
+def _obstacles(db):
+    return db.query(Obstacle).order_by(Obstacle.id).all()
+
+
+def test_nearby_detections_become_one_obstacle(db):
+    rows = [_detection(0.0, confidence=0.4), _detection(1.0, confidence=0.9), _detection(2.0, confidence=0.6)]
+    summary = merge_detections(db, rows)
+
+    assert summary["inserted"] == 1 and summary["updated"] == 0 and summary["removed"] == 0
+    (obs,) = _obstacles(db)
+    assert obs.detection_count == 3
+    assert obs.confidence == 0.9
+    assert obs.lat == pytest.approx(LAT + 1.0 / M_PER_DEG_LAT)  # 가중 평균
+    assert obs.cell is not None
+
+
+def test_types_are_merged_separately(db):
+    merge_detections(db, [_detection(0.0, "bollard"), _detection(0.5, "pole")])
+    assert sorted(o.type for o in _obstacles(db)) == ["bollard", "pole"]
+
+
+def test_long_chain_is_not_collapsed(db):
+    # 4m 간격 볼라드 6개 (20m) — DBSCAN으로는 한 묶음이지만 합친 감지끼리는 모두 반경 이내여야 함
+    rows = [_detection(4.0 * i) for i in range(6)]
+    merge_detections(db, rows)
+
+    obstacles = _obstacles(db)
+    assert len(obstacles) >= 3
+    assert sum(o.detection_count for o in obstacles) == 6
+    for obs in obstacles:
+        nearest = min(haversine_m(obs.lat, obs.lng, r["lat"], r["lng"]) for r in rows)
+        assert nearest <= OBSTACLE_MERGE_RADIUS_M
+
+
+def test_incremental_merge_updates_existing(db):
+    merge_detections(db, [_detection(0.0)])
+    (first,) = _obstacles(db)
+
+    summary = merge_detections(db, [_detection(2.0), _detection(20.0)])
+    assert summary["updated"] == 1 and summary["inserted"] == 1
+
+    obstacles = _obstacles(db)
+    assert obstacles[0].id == first.id
+    assert obstacles[0].detection_count == 2
+    assert obstacles[1].detection_count == 1
+
+
+def test_changes_recorded_with_new_version(db):
+    first = merge_detections(db, [_detection(0.0)])
+    second = merge_detections(db, [_detection(1.0)])
+    assert (first["version"], second["version"]) == (1, 2)
+    assert obstacle_changes.get_version(db) == 2
+
+    update = db.query(ObstacleChange).filter(ObstacleChange.version == 2).one()
+    assert update.op == "update"
+    assert update.prev_lat == LAT
+    assert update.detection_count == 2
+
+
+def test_empty_batch_is_noop(db):
+    assert merge_detections(db, [])["version"] is None
+    assert _obstacles(db) == []
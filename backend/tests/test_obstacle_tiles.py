@@ -0,0 +1,99 @@
+# backend/tests/test_obstacle_tiles.py
+
+import struct
+
+import pytest
+
+from app.route import geohash, obstacle_tiles, snapshots
+
+Z = 16
+LAT, LNG = 37.5665, 126.9780
+
+
+def _snapshot(points, dataset_version=1):
+    columns = snapshots.ObstacleColumns([(lat, lng, t, geohash.encode(lat, lng)) for lat, lng, t in points])
+    return snapshots.RoutingSnapshot(version=1, graph_gen=0, obstacles=columns, dataset_version=dataset_version)
+
+
+def _tile_xy():
+    wx, wy = obstacle_tiles._world_xy(LAT, LNG, Z)
+    return int(wx), int(wy)
+
+
+def _decode(data: bytes) -> dict:
+    magic, fmt, z, extent, dataset_version = obstacle_tiles._HEADER.unpack_from(data)
+    offset = obstacle_tiles._HEADER.size
+    (type_count,) = struct.unpack_from("<B", data, offset)
+    offset += 1
+    types = []
+    for _ in range(type_count):
+        (length,) = struct.unpack_from("<B", data, offset)
+        types.append(data[offset + 1:offset + 1 + length].decode("utf-8"))
+        offset += 1 + length
+    (n,) = struct.unpack_from("<I", data, offset)
+    offset += 4
+    xs = struct.unpack_from(f"<{n}H", data, offset)
+    ys = struct.unpack_from(f"<{n}H", data, offset + 2 * n)
+    codes = struct.unpack_from(f"<{n}B", data, offset + 4 * n)
+    counts = struct.unpack_from(f"<{n}H", data, offset + 5 * n)
+    assert offset + 7 * n == len(data)
+    return {
+        "magic": magic, "format": fmt, "z": z, "extent": extent, "dataset_version": dataset_version,
+        "points": sorted(zip(xs, ys, (types[c] for c in codes), counts)),
+    }
+
+
+def _get_tile(monkeypatch, snap):
+    monkeypatch.setattr(snapshots, "current", lambda: snap)
+    x, y = _tile_xy()
+    return obstacle_tiles.get_tile(Z, x, y)
+
+
+def test_encode_layout():
+    snap = _snapshot([(LAT, LNG, "pole"), (LAT, LNG, "pole"), (LAT + 1e-4, LNG, "bollard"), (38.0, 127.5, "pole")],
+                     dataset_version=7)
+    tile = _decode(obstacle_tiles._encode(snap, Z, *_tile_xy()))
+
+    assert tile["magic"] == b"WFOT"
+    assert (tile["format"], tile["z"], tile["extent"]) == (obstacle_tiles.TILE_FORMAT_VERSION, Z, obstacle_tiles.TILE_EXTENT)
+    assert tile["dataset_version"] == 7
+    # 같은 격자 점 + 같은 타입은 개수와 함께 하나로, 타일 밖 장애물은 제외
+    assert sorted((t, c) for _, _, t, c in tile["points"]) == [("bollard", 1), ("pole", 2)]
+    assert all(0 <= px < obstacle_tiles.TILE_EXTENT and 0 <= py < obstacle_tiles.TILE_EXTENT
+               for px, py, _, _ in tile["points"])
+
+
+def test_empty_tile():
+    tile = _decode(obstacle_tiles._encode(_snapshot([]), Z, *_tile_xy()))
+    assert tile["points"] == []
+
+
+def test_etag_is_weak_and_stable_across_unrelated_changes(monkeypatch):
+    # 다른 곳의 장애물만 바뀌어 데이터 버전이 올라가도 이 타일의 ETag는 그대로
+    before = _snapshot([(LAT, LNG, "pole")], dataset_version=1)
+    after = _snapshot([(LAT, LNG, "pole"), (38.0, 127.5, "pole")], dataset_version=2)
+    data1, etag1 = _get_tile(monkeypatch, before)
+    data2, etag2 = _get_tile(monkeypatch, after)
+
+    assert data1 != data2  # 헤더의 데이터 버전이 다름
+    assert etag1 == etag2
+    assert etag1.startswith('W/"') and etag1.endswith('"')
+
+
+def test_etag_changes_with_tile_content(monkeypatch):
+    _, etag1 = _get_tile(monkeypatch, _snapshot([(LAT, LNG, "pole")]))
+    _, etag2 = _get_tile(monkeypatch, _snapshot([(LAT, LNG, "pole"), (LAT, LNG, "pole")]))
+    assert etag1 != etag2
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, False),
+    ("", False),
+    ('W/"abc"', True),
+    ('"abc"', True),
+    ('"xyz", W/"abc"', True),
+    ("*", True),
+    ('"xyz"', False),
+])
+def test_etag_matches(header, expected):
+    assert obstacle_tiles.etag_matches(header, 'W/"abc"') is expected
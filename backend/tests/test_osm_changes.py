@@ -0,0 +1,121 @@
+# backend/tests/test_osm_changes.py
+
+import networkx as nx
+import pytest
+
+from app.route import osm_changes
+
+BBOX = (37.0, 38.0, 126.0, 128.0)
+
+OSC = """<?xml version="1.0" encoding="UTF-8"?>
+<osmChange version="0.6">
+  <create>
+    <node id="10" lat="37.5" lon="127.0"><tag k="barrier" v="bollard"/></node>
+  </create>
+  <modify>
+    <way id="100">
+      <nd ref="1"/><nd ref="2"/>
+      <tag k="highway" v="footway"/><tag k="name" v="새 이름"/>
+    </way>
+    <relation id="5"><member type="way" ref="100" role=""/></relation>
+  </modify>
+  <delete>
+    <node id="11"/>
+  </delete>
+</osmChange>
+"""
+
+
+def _graph():
+    G = nx.MultiDiGraph()
+    G.add_node(1, y=37.50, x=127.00)
+    G.add_node(2, y=37.50, x=127.001)
+    G.add_node(3, y=37.501, x=127.001)
+    for u, v, osmid in ((1, 2, 100), (2, 1, 100), (2, 3, 200), (3, 2, 200)):
+        G.add_edge(u, v, osmid=osmid, highway="footway", name="옛 이름", length=88.0)
+    return G
+
+
+def _edges(G, osmid):
+    return sorted((u, v) for u, v, data in G.edges(data=True) if data.get("osmid") == osmid)
+
+
+def test_parse_osc(tmp_path):
+    path = tmp_path / "change.osc"
+    path.write_text(OSC, encoding="utf-8")
+    ops = osm_changes.parse_osc(str(path))
+    assert [(op["action"], op["kind"], op["id"]) for op in ops] == [
+        ("create", "node", 10), ("modify", "way", 100), ("delete", "node", 11),
+    ]
+    assert ops[0]["lat"] == 37.5 and ops[0]["lng"] == 127.0
+    assert ops[0]["tags"] == {"barrier": "bollard"}
+    assert ops[1]["nodes"] == [1, 2]
+    assert ops[1]["tags"]["name"] == "새 이름"
+    assert ops[2]["lat"] is None
+
+
+def test_move_node_recomputes_lengths():
+    G = _graph()
+    op = {"action": "modify", "kind": "node", "id": 2, "lat": 37.5005, "lng": 127.001, "tags": {}}
+    changed = osm_changes.apply_ops_to_graph(G, [op], BBOX)
+    assert (37.50, 127.001) in changed and (37.5005, 127.001) in changed
+    assert G.nodes[2]["y"] == 37.5005
+    assert G.edges[1, 2, 0]["length"] == pytest.approx(
+        osm_changes.haversine_m(37.50, 127.00, 37.5005, 127.001)
+    )
+
+
+def test_delete_way_removes_edges():
+    G = _graph()
+    op = {"action": "delete", "kind": "way", "id": 200, "tags": {}, "nodes": []}
+    assert osm_changes.apply_ops_to_graph(G, [op], BBOX)
+    assert _edges(G, 200) == []
+    assert _edges(G, 100) == [(1, 2), (2, 1)]
+
+
+def test_not_walkable_way_removes_edges():
+    G = _graph()
+    op = {"action": "modify", "kind": "way", "id": 200, "tags": {"highway": "construction"}, "nodes": [2, 3]}
+    osm_changes.apply_ops_to_graph(G, [op], BBOX)
+    assert _edges(G, 200) == []
+
+
+def test_tag_only_modify_keeps_edges():
+    # 좌표를 모르는 노드(단순화로 빠진 중간 노드)가 있으면 간선은 유지하고 태그만 갱신
+    G = _graph()
+    op = {"action": "modify", "kind": "way", "id": 100,
+          "tags": {"highway": "footway", "name": "새 이름"}, "nodes": [1, 999, 2]}
+    changed = osm_changes.apply_ops_to_graph(G, [op], BBOX)
+    assert changed
+    assert _edges(G, 100) == [(1, 2), (2, 1)]
+    assert G.edges[1, 2, 0]["name"] == "새 이름"
+
+
+def test_create_way_adds_both_directions():
+    G = _graph()
+    op = {"action": "create", "kind": "way", "id": 300, "tags": {"highway": "footway"}, "nodes": [1, 3]}
+    osm_changes.apply_ops_to_graph(G, [op], BBOX)
+    assert _edges(G, 300) == [(1, 3), (3, 1)]
+
+
+def test_way_outside_bbox_is_ignored():
+    G = _graph()
+    op = {"action": "create", "kind": "way", "id": 300, "tags": {"highway": "footway"}, "nodes": [1, 3]}
+    assert osm_changes.apply_ops_to_graph(G, [op], (0.0, 1.0, 0.0, 1.0)) == set()
+    assert _edges(G, 300) == []
+
+
+def test_sync_changes_journals_bad_file(tmp_path, monkeypatch):
+    (tmp_path / "1_bad_id.osc").write_text(
+        '<osmChange><create><node id="x" lat="1" lon="2"/></create></osmChange>', encoding="utf-8"
+    )
+    (tmp_path / "2_not_xml.osc").write_text("not xml", encoding="utf-8")
+    monkeypatch.setattr(osm_changes, "OSM_CHANGE_DIR", str(tmp_path))
+    monkeypatch.setattr(osm_changes, "_journal", [])
+    monkeypatch.setattr(osm_changes, "_stats", dict(osm_changes._stats))
+
+    assert osm_changes.sync_changes(force=True) == []
+    assert osm_changes._journal == [("1_bad_id.osc", []), ("2_not_xml.osc", [])]
+    # 다시 확인해도 같은 파일을 재시도하지 않음
+    assert osm_changes.sync_changes(force=True) == []
+    assert len(osm_changes._journal) == 2
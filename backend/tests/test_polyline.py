@@ -0,0 +1,92 @@
+# backend/tests/test_polyline.py
+
+import random
+
+import pytest
+
+from app.route.models import RouteResult, route_points_from
+from app.route.utils import decode_polyline, encode_polyline
+
+
+def test_google_reference_example():
+    # Google 문서 예시 (precision 5)
+    points = [(38.5, -120.2), (40.7, -120.95), (43.252, -126.453)]
+    encoded = "_p~iF~ps|U_ulLnnqC_mqNvxq`@"
+    assert encode_polyline(points, precision=5) == encoded
+    assert decode_polyline(encoded, precision=5) == points
+
+
+def test_round_trip_precision_6():
+    rng = random.Random(0)
+    lat, lng = 37.5665, 126.9780
+    points = []
+    for _ in range(500):
+        lat += rng.uniform(-1e-3, 1e-3)
+        lng += rng.uniform(-1e-3, 1e-3)
+        points.append((lat, lng))
+    decoded = decode_polyline(encode_polyline(points))
+    assert len(decoded) == len(points)
+    for (a, b), (c, d) in zip(points, decoded):
+        assert c == pytest.approx(a, abs=5e-7)
+        assert d == pytest.approx(b, abs=5e-7)
+
+
+def test_round_trip_negative_and_empty():
+    points = [(-33.8688, 151.2093), (0.0, 0.0), (51.5074, -0.1278)]
+    assert decode_polyline(encode_polyline(points)) == points
+    assert encode_polyline([]) == ""
+    assert decode_polyline("") == []
+
+
+def test_route_points_property():
+    route = RouteResult()
+    route.route_points = [[37.5665, 126.978], [37.57, 126.982]]
+    assert route.route_points_json is None
+    assert route.route_points == [[37.5665, 126.978], [37.57, 126.982]]
+
+
+def test_route_points_from_legacy_json():
+    # 아직 polyline으로 옮기지 않은 행은 JSON 그대로
+    assert route_points_from(None, [[1.0, 2.0]]) == [[1.0, 2.0]]
+    assert route_points_from(None, None) == []
+
+
+def test_sqlite_routes_table_relaxes_not_null(tmp_path):
+    # 이전 버전 routes (route_points NOT NULL, route_polyline 없음) → 재생성 후 polyline만으로 저장 가능
+    from sqlalchemy import create_engine, inspect, text
+    from sqlalchemy.orm import Session
+
+    from app.database import Base
+    from app.route import crud
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE users (id INTEGER PRIMARY KEY, email VARCHAR)"))
+        conn.execute(text("INSERT INTO users (id, email) VALUES (1, 'a@example.com')"))
+        conn.execute(text(
+            "CREATE TABLE routes (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL REFERENCES users(id), "
+            "start_lat FLOAT NOT NULL, start_lng FLOAT NOT NULL, end_lat FLOAT NOT NULL, end_lng FLOAT NOT NULL, "
+            "route_points JSON NOT NULL, distance_m FLOAT, avoided VARCHAR(200), created_at DATETIME)"
+        ))
+        conn.execute(text(
+            "INSERT INTO routes (id, user_id, start_lat, start_lng, end_lat, end_lng, route_points) "
+            "VALUES (1, 1, 37.0, 127.0, 37.1, 127.1, '[[37.0, 127.0], [37.1, 127.1]]')"
+        ))
+    Base.metadata.create_all(bind=engine)
+
+    crud.ensure_route_geometry_columns(engine)
+    crud.ensure_route_geometry_columns(engine)  # 두 번째 호출은 아무것도 하지 않음
+
+    columns = {c["name"]: c for c in inspect(engine).get_columns("routes")}
+    assert columns["route_points"]["nullable"]
+    assert "route_polyline" in columns
+    with Session(engine) as session:
+        route = RouteResult(user_id=1, start_lat=1.0, start_lng=2.0, end_lat=3.0, end_lng=4.0)
+        route.route_points = [[1.0, 2.0], [3.0, 4.0]]
+        session.add(route)
+        session.commit()
+        assert [r.route_points for r in session.query(RouteResult).order_by(RouteResult.id)] == [
+            [[37.0, 127.0], [37.1, 127.1]],
+            [[1.0, 2.0], [3.0, 4.0]],
+        ]
+    engine.dispose()
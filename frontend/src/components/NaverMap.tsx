@@ -1,6 +1,7 @@
 import React, { useEffect, useRef, useState } from 'react';
 import { getNaverClientId } from '../utils/naverMapApi';
 import { getApiUrl } from '../utils/apiConfig';
+import { fetchObstacleTiles, OBSTACLE_TILE_MIN_ZOOM } from '../utils/obstacleTiles';
 
 declare global {
   interface Window {
@@ -9,12 +10,21 @@ declare global {
 }
 
 interface Obstacle {
-  id: number;
+  id?: number;
   type: string;
   lat: number;
   lng: number;
   confidence?: number;
   detected_at?: string;
+  count?: number;  // 타일 응답: 같은 위치 + 같은 타입 장애물 수
+}
+
+// 낮은 줌에서 서버가 보내는 장애물 클러스터 (격자 칸 안 장애물의 평균 위치)
+interface ObstacleCluster {
+  lat: number;
+  lng: number;
+  count: number;
+  by_type: Record<string, number>;
 }
 
 interface NaverMapProps {
@@ -54,6 +64,7 @@ const NaverMap: React.FC<NaverMapProps> = ({
   const [error, setError] = useState<string | null>(null);
   const [naverClientId, setNaverClientId] = useState<string | null>(null);
   const [obstacles, setObstacles] = useState<Obstacle[]>([]);
+  const [obstacleClusters, setObstacleClusters] = useState<ObstacleCluster[]>([]);
 
   useEffect(() => {
     const loadNaverMapSdk = async () => {
@@ -845,8 +856,19 @@ const NaverMap: React.FC<NaverMapProps> = ({
 
         const token = localStorage.getItem('token') || sessionStorage.getItem('token');
 
+        const zoom = Math.round(mapInstanceRef.current.getZoom());
+
+        // 확대한 지도는 바이너리 타일로 조회 (겹치는 타일은 브라우저 캐시 재사용)
+        if (zoom >= OBSTACLE_TILE_MIN_ZOOM) {
+          const tileObstacles = await fetchObstacleTiles(sw.lat(), ne.lat(), sw.lng(), ne.lng(), zoom);
+          setObstacles(tileObstacles);
+          setObstacleClusters([]);
+          return;
+        }
+
+        // zoom을 보내면 낮은 줌에서는 서버가 클러스터로 묶어서 응답 (응답 크기가 화면 크기로 제한됨)
         const response = await fetch(
-          `${getApiUrl('/route/obstacles')}?south=${sw.lat()}&north=${ne.lat()}&west=${sw.lng()}&east=${ne.lng()}`,
+          `${getApiUrl('/route/obstacles')}?south=${sw.lat()}&north=${ne.lat()}&west=${sw.lng()}&east=${ne.lng()}&zoom=${zoom}`,
           {
             headers: {
               ...(token && { Authorization: `Bearer ${token}` })
@@ -856,7 +878,13 @@ const NaverMap: React.FC<NaverMapProps> = ({
 
         if (response.ok) {
           const data = await response.json();
-          setObstacles(data);
+          if (data.mode === 'clusters') {
+            setObstacles([]);
+            setObstacleClusters(data.clusters);
+          } else {
+            setObstacles(data.obstacles);
+            setObstacleClusters([]);
+          }
         }
       } catch (err) {
         console.error('[NaverMap] 장애물 조회 실패:', err);
@@ -882,7 +910,7 @@ const NaverMap: React.FC<NaverMapProps> = ({
 
   // 장애물 마커 표시
   useEffect(() => {
-    if (!showObstacles || !isInitializedRef.current || !mapInstanceRef.current || !window.naver || obstacles.length === 0) {
+    if (!showObstacles || !isInitializedRef.current || !mapInstanceRef.current || !window.naver || (obstacles.length === 0 && obstacleClusters.length === 0)) {
       // 기존 장애물 마커 제거
       obstacleMarkersRef.current.forEach(marker => {
         marker.setMap(null);
@@ -906,7 +934,7 @@ const NaverMap: React.FC<NaverMapProps> = ({
           content: getObstacleIcon(obstacle.type),
           anchor: new window.naver.maps.Point(14, 14)
         },
-        title: `${getObstacleLabel(obstacle.type)}${obstacle.confidence ? ` (${Math.round(obstacle.confidence * 100)}%)` : ''}`
+        title: `${getObstacleLabel(obstacle.type)}${obstacle.confidence ? ` (${Math.round(obstacle.confidence * 100)}%)` : ''}${obstacle.count && obstacle.count > 1 ? ` x${obstacle.count}` : ''}`
       });
 
       // 정보창 추가
@@ -926,13 +954,57 @@ const NaverMap: React.FC<NaverMapProps> = ({
       obstacleMarkersRef.current.push(marker);
     });
 
+    // 클러스터 마커 추가 (개수 표시, 정보창에 타입별 개수)
+    obstacleClusters.forEach(cluster => {
+      const diameter = Math.min(56, 28 + Math.round(Math.log10(cluster.count + 1) * 10));
+      const marker = new window.naver.maps.Marker({
+        position: new window.naver.maps.LatLng(cluster.lat, cluster.lng),
+        map: mapInstanceRef.current,
+        icon: {
+          content: `
+            <div style="
+              background-color: rgba(220, 38, 38, 0.85);
+              width: ${diameter}px;
+              height: ${diameter}px;
+              border-radius: 50%;
+              border: 2px solid white;
+              box-shadow: 0 2px 4px rgba(0,0,0,0.3);
+              display: flex;
+              align-items: center;
+              justify-content: center;
+              color: white;
+              font-size: 12px;
+              font-weight: bold;
+            ">${cluster.count}</div>
+          `,
+          anchor: new window.naver.maps.Point(diameter / 2, diameter / 2)
+        },
+        title: `장애물 ${cluster.count}개`
+      });
+
+      const infoWindow = new window.naver.maps.InfoWindow({
+        content: `
+          <div style="padding: 8px; font-size: 14px;">
+            <div style="font-weight: bold; margin-bottom: 4px;">장애물 ${cluster.count}개</div>
+            ${Object.entries(cluster.by_type).map(([type, n]) => `<div style="color: #666; font-size: 12px;">${getObstacleLabel(type)}: ${n}</div>`).join('')}
+          </div>
+        `
+      });
+
+      window.naver.maps.Event.addListener(marker, 'click', () => {
+        infoWindow.open(mapInstanceRef.current, marker);
+      });
+
+      obstacleMarkersRef.current.push(marker);
+    });
+
     return () => {
       obstacleMarkersRef.current.forEach(marker => {
         marker.setMap(null);
       });
       obstacleMarkersRef.current = [];
     };
-  }, [obstacles, showObstacles, isInitializedRef.current]);
+  }, [obstacles, obstacleClusters, showObstacles, isInitializedRef.current]);
 
   // 윈도우 리사이즈 시 지도 리사이즈
   useEffect(() => {
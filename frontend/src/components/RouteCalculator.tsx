@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { getToken } from '../services/authService';
 import { getApiUrl } from '../utils/apiConfig';
+import { prefetchRouteArea } from '../utils/naverMapApi';
 
 export interface RouteStep {
   instruction: string;
@@ -51,6 +52,15 @@ const RouteCalculator: React.FC<RouteCalculatorProps> = ({
     }
   }, [startLocation, endLocation]);
 
+  // 출발지/도착지가 정해지면 경로 계산 전에 주변 그래프를 미리 로딩
+  useEffect(() => {
+    if (startLocation) prefetchRouteArea(startLocation.lat, startLocation.lng);
+  }, [startLocation?.lat, startLocation?.lng]);
+
+  useEffect(() => {
+    if (endLocation) prefetchRouteArea(endLocation.lat, endLocation.lng);
+  }, [endLocation?.lat, endLocation?.lng]);
+
   const calculateRoute = async () => {
     if (!startLocation || !endLocation) return;
 
@@ -135,6 +145,7 @@ const RouteCalculator: React.FC<RouteCalculatorProps> = ({
       risk_factors: string[];
       avoided_final: string[];
       obstacle_stats?: Record<string, { total: number; success: number; failed: number }>;
+      instructions?: { instruction: string; distance: string; icon: string; warning?: string; distance_m: number }[];
     },
     startLoc: { lat: number; lng: number; name: string },
     endLoc: { lat: number; lng: number; name: string },
@@ -155,7 +166,18 @@ const RouteCalculator: React.FC<RouteCalculatorProps> = ({
 
     // 경로 좌표를 단계로 변환
     const steps: RouteStep[] = [];
-    if (route.length > 0) {
+    if (backendData.instructions && backendData.instructions.length > 0) {
+      // 백엔드가 실제 경로로 생성한 보행 안내문 사용 (소요 시간은 이동 수단 속도로 다시 계산)
+      backendData.instructions.forEach((step) => {
+        steps.push({
+          instruction: step.instruction,
+          distance: step.distance,
+          duration: `${Math.round((step.distance_m / 1000) / speedKmh * 60)}분`,
+          icon: step.icon,
+          ...(step.warning && { warning: step.warning, warningType: 'caution' as const })
+        });
+      });
+    } else if (route.length > 0) {
       // 경로를 여러 구간으로 나누어 단계 생성
       const numSteps = Math.min(route.length - 1, 5); // 최대 5단계
       const stepSize = Math.max(1, Math.floor((route.length - 1) / numSteps));
@@ -3,6 +3,7 @@ import RouteDetailModal from '../components/RouteDetailModal';
 import { getToken } from '../services/authService';
 import { reverseGeocode } from '../utils/naverMapApi';
 import { getApiUrl } from '../utils/apiConfig';
+import { decodePolyline } from '../utils/helpers';
 
 // 저장된 경로 데이터 타입 정의
 interface SavedRoute {
@@ -77,15 +78,79 @@ const MOCK_ROUTES: SavedRoute[] = [
   }
 ];
 
+// 한 번에 불러오는 저장 경로 수
+const PAGE_SIZE = 20;
+
 const SavedRoutes: React.FC<SavedRoutesProps> = ({ onNavigateToRoute }) => {
   const [savedRoutes, setSavedRoutes] = useState<SavedRoute[]>([]);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [error, setError] = useState<string | null>(null);
   const [selectedRoute, setSelectedRoute] = useState<SavedRoute | null>(null);
 
-  // 저장된 경로 목록 가져오기
-  const fetchSavedRoutes = async () => {
-    setLoading(true);
+  // 저장된 경로 한 페이지 가져오기 (목록은 좌표 없는 요약 → 페이지의 경로 좌표는 한 번에 따로 조회)
+  const fetchRoutePage = async (token: string, cursor: string | null) => {
+    const headers = {
+      'Content-Type': 'application/json',
+      Authorization: `Bearer ${token}`
+    };
+    const params = new URLSearchParams({ limit: String(PAGE_SIZE) });
+    if (cursor) {
+      params.set('cursor', cursor);
+    }
+
+    const response = await fetch(getApiUrl(`/route/my?${params.toString()}`), {
+      method: 'GET',
+      headers,
+      credentials: 'include',  // 세션/쿠키 사용시 필요
+    });
+
+    if (!response.ok) {
+      const errorData = await response.json().catch(() => ({}));
+      throw new Error(errorData.detail || errorData.message || `API 오류: ${response.status}`);
+    }
+
+    const page = await response.json();
+    console.log('✅ 저장된 경로 목록:', page);
+
+    // 페이지 경로들의 좌표 일괄 조회 (썸네일/상세 보기용, encoded polyline으로 받아 디코딩)
+    const geometry: Record<number, [number, number][]> = {};
+    if (page.items.length > 0) {
+      const idParams = new URLSearchParams({ encoding: 'polyline' });
+      page.items.forEach((route: any) => idParams.append('ids', String(route.id)));
+      try {
+        const geometryResponse = await fetch(getApiUrl(`/route/my/geometry?${idParams.toString()}`), {
+          method: 'GET',
+          headers,
+          credentials: 'include',
+        });
+        if (geometryResponse.ok) {
+          const geometryData = await geometryResponse.json();
+          geometryData.routes.forEach((item: any) => {
+            geometry[item.id] = decodePolyline(item.route_polyline);
+          });
+        }
+      } catch (err) {
+        console.error('경로 좌표 조회 실패:', err);
+      }
+    }
+
+    const backendRoutes = page.items.map((route: any) => ({
+      ...route,
+      route_points: geometry[route.id] || []
+    }));
+
+    return { backendRoutes, nextCursor: page.next_cursor as string | null };
+  };
+
+  // 저장된 경로 목록 가져오기 (cursor가 있으면 다음 페이지를 이어 붙임)
+  const fetchSavedRoutes = async (cursor: string | null = null) => {
+    if (cursor) {
+      setLoadingMore(true);
+    } else {
+      setLoading(true);
+    }
     setError(null);
 
     try {
@@ -98,22 +163,7 @@ const SavedRoutes: React.FC<SavedRoutesProps> = ({ onNavigateToRoute }) => {
         return;
       }
 
-      const response = await fetch(getApiUrl('/route/my'), {
-        method: 'GET',
-        headers: {
-          'Content-Type': 'application/json',
-          ...(token && { Authorization: `Bearer ${token}` })
-        },
-        credentials: 'include',  // 세션/쿠키 사용시 필요
-      });
-
-      if (!response.ok) {
-        const errorData = await response.json().catch(() => ({}));
-        throw new Error(errorData.detail || errorData.message || `API 오류: ${response.status}`);
-      }
-
-      const backendRoutes = await response.json();
-      console.log('✅ 저장된 경로 목록:', backendRoutes);
+      const { backendRoutes, nextCursor: newCursor } = await fetchRoutePage(token, cursor);
 
       // 백엔드 응답을 프론트엔드 형식으로 변환 (주소 변환 포함)
       const convertedRoutesPromises = backendRoutes.map(async (route: any) => {
@@ -224,17 +274,20 @@ const SavedRoutes: React.FC<SavedRoutesProps> = ({ onNavigateToRoute }) => {
         }
       });
 
-      const convertedRoutes = await Promise.all(convertedRoutesPromises);
+      const convertedRoutes: SavedRoute[] = await Promise.all(convertedRoutesPromises);
 
-      setSavedRoutes(convertedRoutes);
+      setSavedRoutes((prev) => (cursor ? [...prev, ...convertedRoutes] : convertedRoutes));
+      setNextCursor(newCursor);
 
     } catch (err) {
       console.error('❌ 저장된 경로 조회 실패:', err);
       setError(err instanceof Error ? err.message : '저장된 경로를 불러오는데 실패했습니다.');
       // 오류 발생 시 빈 배열로 설정
       setSavedRoutes([]);
+      setNextCursor(null);
     } finally {
       setLoading(false);
+      setLoadingMore(false);
     }
   };
 
@@ -332,7 +385,7 @@ const SavedRoutes: React.FC<SavedRoutesProps> = ({ onNavigateToRoute }) => {
           <div className="text-center py-12">
             <p className="text-red-500 mb-4">{error}</p>
             <button
-              onClick={fetchSavedRoutes}
+              onClick={() => fetchSavedRoutes()}
               className="bg-[var(--primary-color)] text-white px-4 py-2 rounded-md hover:bg-blue-700 transition-colors"
             >
               다시 시도
@@ -394,6 +447,17 @@ const SavedRoutes: React.FC<SavedRoutesProps> = ({ onNavigateToRoute }) => {
             </div>
           </div>
           ))}
+          {nextCursor && (
+            <div className="text-center pt-2">
+              <button
+                onClick={() => fetchSavedRoutes(nextCursor)}
+                disabled={loadingMore}
+                className="px-4 py-2 rounded-md border border-gray-300 text-sm text-gray-700 hover:bg-gray-50 disabled:opacity-50 transition-colors"
+              >
+                {loadingMore ? '불러오는 중...' : '더 보기'}
+              </button>
+            </div>
+          )}
         </div>
       )}
 
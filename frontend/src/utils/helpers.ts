@@ -65,4 +65,34 @@ export const getEmailFromToken = (token: string): string | null => {
     console.error('토큰 디코딩 실패:', error);
     return null;
   }
-};
\ No newline at end of file
+};
+/**
+ * Google encoded polyline 문자열을 [lat, lng] 좌표 배열로 변환 (백엔드 저장 경로: 1e-6 정밀도)
+ */
+export const decodePolyline = (encoded: string, precision: number = 6): [number, number][] => {
+  const factor = Math.pow(10, precision);
+  const points: [number, number][] = [];
+  let index = 0;
+  let lat = 0;
+  let lng = 0;
+
+  while (index < encoded.length) {
+    const deltas: number[] = [];
+    for (let k = 0; k < 2; k++) {
+      let shift = 0;
+      let value = 0;
+      let b: number;
+      do {
+        b = encoded.charCodeAt(index++) - 63;
+        value += (b & 0x1f) * Math.pow(2, shift);
+        shift += 5;
+      } while (b >= 0x20);
+      deltas.push(value % 2 === 1 ? -(value + 1) / 2 : value / 2);
+    }
+    lat += deltas[0];
+    lng += deltas[1];
+    points.push([lat / factor, lng / factor]);
+  }
+
+  return points;
+};
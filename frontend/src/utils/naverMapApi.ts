@@ -1,6 +1,7 @@
 // 백엔드 API를 통한 네이버 지도 서비스
 
 import { API_BASE_URL, getApiUrl } from './apiConfig';
+import { getToken } from '../services/authService';
 
 // Window 타입 확장
 declare global {
@@ -304,6 +305,23 @@ export const reverseGeocode = async (lat: number, lng: number): Promise<string>
   }
 };
 
+// 경로 그래프 선로딩 요청 (출발지/도착지/현재 위치 선택 직후) - 로그인한 경우만, 실패해도 무시
+export const prefetchRouteArea = (lat: number, lng: number): void => {
+  const token = getToken();
+  if (!token) return;
+  fetch(getApiUrl('/route/prefetch'), {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      Authorization: `Bearer ${token}`,
+    },
+    credentials: 'include',
+    body: JSON.stringify({ lat, lng }),
+  }).catch((error) => {
+    console.warn('[prefetch] 선로딩 요청 실패:', error);
+  });
+};
+
 // API 키 유효성 검사 (백엔드에서 처리하므로 항상 true 반환)
 export const validateApiKeys = (): boolean => {
    console.log('🔍 백엔드 API를 통한 네이버 지도 서비스 사용');
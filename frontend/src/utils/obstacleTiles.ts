@@ -0,0 +1,103 @@
+// 장애물 바이너리 타일 (백엔드 /route/obstacles/tiles/{z}/{x}/{y}.bin) 조회/디코딩
+// 타일은 ETag + Cache-Control로 응답되므로 지도 이동 시 겹치는 타일은 브라우저 캐시에서 재사용됨
+
+import { getApiUrl } from './apiConfig';
+
+// 이 줌 이상에서 타일 사용 (그 아래는 서버 클러스터 응답 사용)
+export const OBSTACLE_TILE_MIN_ZOOM = 17;
+// 백엔드가 제공하는 최대 타일 줌 (더 확대해도 이 줌 타일을 사용)
+const OBSTACLE_TILE_MAX_ZOOM = 18;
+
+export interface TileObstacle {
+  type: string;
+  lat: number;
+  lng: number;
+  count: number;
+}
+
+const lngToTileX = (lng: number, z: number) => ((lng + 180) / 360) * Math.pow(2, z);
+
+const latToTileY = (lat: number, z: number) => {
+  const rad = (lat * Math.PI) / 180;
+  return ((1 - Math.log(Math.tan(rad) + 1 / Math.cos(rad)) / Math.PI) / 2) * Math.pow(2, z);
+};
+
+const tileYToLat = (y: number, z: number) => {
+  const n = Math.PI - (2 * Math.PI * y) / Math.pow(2, z);
+  return (180 / Math.PI) * Math.atan(0.5 * (Math.exp(n) - Math.exp(-n)));
+};
+
+const tileXToLng = (x: number, z: number) => (x / Math.pow(2, z)) * 360 - 180;
+
+// 타일 바이너리 → 장애물 목록 (형식은 backend/app/route/obstacle_tiles.py 참고)
+const decodeTile = (buffer: ArrayBuffer, x: number, y: number): TileObstacle[] => {
+  const view = new DataView(buffer);
+  const z = view.getUint8(5);
+  const extent = view.getUint16(6, true);
+  let offset = 12;
+
+  const typeCount = view.getUint8(offset);
+  offset += 1;
+  const decoder = new TextDecoder();
+  const types: string[] = [];
+  for (let i = 0; i < typeCount; i++) {
+    const length = view.getUint8(offset);
+    types.push(decoder.decode(new Uint8Array(buffer, offset + 1, length)));
+    offset += 1 + length;
+  }
+
+  const n = view.getUint32(offset, true);
+  offset += 4;
+  const xsOffset = offset;
+  const ysOffset = xsOffset + 2 * n;
+  const typesOffset = ysOffset + 2 * n;
+  const countsOffset = typesOffset + n;
+
+  const obstacles: TileObstacle[] = [];
+  for (let i = 0; i < n; i++) {
+    // 격자 칸 중심 좌표로 복원
+    const px = view.getUint16(xsOffset + 2 * i, true) + 0.5;
+    const py = view.getUint16(ysOffset + 2 * i, true) + 0.5;
+    obstacles.push({
+      type: types[view.getUint8(typesOffset + i)],
+      lat: tileYToLat(y + py / extent, z),
+      lng: tileXToLng(x + px / extent, z),
+      count: view.getUint16(countsOffset + 2 * i, true),
+    });
+  }
+  return obstacles;
+};
+
+// 지도 영역을 덮는 타일을 모두 받아 장애물 목록으로 합침
+export const fetchObstacleTiles = async (
+  south: number,
+  north: number,
+  west: number,
+  east: number,
+  zoom: number
+): Promise<TileObstacle[]> => {
+  const z = Math.min(OBSTACLE_TILE_MAX_ZOOM, Math.floor(zoom));
+  const x0 = Math.floor(lngToTileX(west, z));
+  const x1 = Math.floor(lngToTileX(east, z));
+  const y0 = Math.floor(latToTileY(north, z));
+  const y1 = Math.floor(latToTileY(south, z));
+
+  const requests: Promise<TileObstacle[]>[] = [];
+  for (let x = x0; x <= x1; x++) {
+    for (let y = y0; y <= y1; y++) {
+      requests.push(
+        fetch(getApiUrl(`/route/obstacles/tiles/${z}/${x}/${y}.bin`))
+          .then(async (response) => {
+            if (!response.ok) {
+              return [];
+            }
+            return decodeTile(await response.arrayBuffer(), x, y);
+          })
+          .catch(() => [])
+      );
+    }
+  }
+
+  const tiles = await Promise.all(requests);
+  return tiles.flat();
+};